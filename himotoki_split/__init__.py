@@ -16,7 +16,14 @@ Basic Usage:
 import time
 import unicodedata
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Any
+from typing import Iterable, List, Optional, Tuple, Any
+
+from himotoki_split.cancellation import (
+    AnalysisTimeoutError,
+    CancelToken,
+    OperationCancelledError,
+)
+from himotoki_split.dictionary import DEFAULT_LOOKUP_CACHE_SIZE
 
 __version__ = "0.1.0"
 
@@ -49,13 +56,25 @@ class Token:
     
     def __repr__(self) -> str:
         return f"Token({self.surface!r}, base={self.base_form!r}, pos={self.pos!r})"
+    
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dict of the token fields."""
+        return {
+            "surface": self.surface,
+            "reading": self.reading,
+            "pos": self.pos,
+            "base_form": self.base_form,
+            "base_form_id": self.base_form_id,
+            "start": self.start,
+            "end": self.end,
+        }
 
 
 # =============================================================================
 # Main API
 # =============================================================================
 
-def tokenize(text: str) -> List[Token]:
+def tokenize(text: str, dictionary: Optional[Any] = None) -> List[Token]:
     """
     Tokenize Japanese text into morphemes.
     
@@ -63,12 +82,16 @@ def tokenize(text: str) -> List[Token]:
     
     Args:
         text: Japanese text to tokenize (must be non-empty)
+        dictionary: A ``himotoki_split.dictionary.Dictionary`` to use
+            instead of the process-wide default
         
     Returns:
         List of Token objects
         
     Raises:
         ValueError: If text is empty or whitespace-only
+        TextTooLongError: If text is longer than the configured
+            ``max_text_length`` (see ``configure_limits``)
         
     Example:
         >>> import himotoki_split
@@ -80,25 +103,81 @@ def tokenize(text: str) -> List[Token]:
     """
     if not text or not text.strip():
         raise ValueError("text must be non-empty and not whitespace-only")
+    _check_length(text)
     
     # Unicode normalization
     text = unicodedata.normalize('NFC', text)
     
     from himotoki_split.tokenizer import tokenize_text
-    return tokenize_text(text)
+    return tokenize_text(text, dictionary)
 
 
-def analyze(text: str, limit: int = 1) -> List[Tuple[List[Token], float]]:
+def segment(
+    text: str,
+    dictionary: Optional[Any] = None,
+    postprocess: bool = True,
+) -> List[Tuple[int, int]]:
+    """
+    Get word boundaries as (start, end) offsets, without building tokens.
+    
+    For callers that only need boundaries (search indexing, word counts).
+    With ``postprocess=False`` readings, base forms and POS names are never
+    looked up and the merge/suffix-splitting passes are skipped, so the
+    spans follow the raw dictionary segmentation; this is the fast path.
+    With ``postprocess=True`` the spans match ``tokenize`` exactly.
+    
+    Args:
+        text: Japanese text to segment (must be non-empty)
+        dictionary: A ``himotoki_split.dictionary.Dictionary`` to use
+            instead of the process-wide default
+        postprocess: Apply tokenize's post-processing passes
+        
+    Returns:
+        List of (start, end) offsets into the NFC-normalized text
+        
+    Raises:
+        ValueError: If text is empty or whitespace-only
+        TextTooLongError: If text is longer than the configured
+            ``max_text_length`` (see ``configure_limits``)
+        
+    Example:
+        >>> himotoki_split.segment("食べました", postprocess=False)
+        [(0, 2), (2, 5)]
+    """
+    if not text or not text.strip():
+        raise ValueError("text must be non-empty and not whitespace-only")
+    _check_length(text)
+    
+    text = unicodedata.normalize('NFC', text)
+    
+    from himotoki_split.tokenizer import segment_text
+    return segment_text(text, dictionary, postprocess)
+
+
+def analyze(
+    text: str,
+    limit: int = 1,
+    dictionary: Optional[Any] = None,
+) -> List[Tuple[List[Token], float]]:
     """
     Analyze Japanese text and return multiple segmentation candidates.
     
     Args:
         text: Japanese text to analyze
         limit: Maximum number of results to return
+        dictionary: A ``himotoki_split.dictionary.Dictionary`` to use
+            instead of the process-wide default
         
     Returns:
         List of (tokens, score) tuples, sorted by score descending
         
+    Raises:
+        ValueError: If text is empty or limit < 1
+        TextTooLongError: If text is longer than the configured
+            ``max_text_length`` or ``max_analyze_length`` (1024 characters
+            by default; see ``configure_limits``). Use ``tokenize`` for
+            long texts.
+        
     Example:
         >>> results = himotoki_split.analyze("今日は", limit=3)
         >>> for tokens, score in results:
@@ -108,11 +187,12 @@ def analyze(text: str, limit: int = 1) -> List[Tuple[List[Token], float]]:
         raise ValueError("text must be non-empty and not whitespace-only")
     if limit < 1:
         raise ValueError("limit must be >= 1")
+    _check_length(text, _max_analyze_length)
     
     text = unicodedata.normalize('NFC', text)
     
     from himotoki_split.tokenizer import analyze_text
-    return analyze_text(text, limit=limit)
+    return analyze_text(text, limit=limit, dictionary=dictionary)
 
 
 def warm_up(verbose: bool = False) -> Tuple[float, dict]:
@@ -194,6 +274,171 @@ def romanize(text: str) -> str:
     return romanize_word(text)
 
 
+def romanize_many(texts: Iterable[str]) -> List[str]:
+    """
+    Convert a batch of kana texts to romaji.
+    
+    Args:
+        texts: Kana texts to romanize
+        
+    Returns:
+        List of romanized texts, in input order
+        
+    Example:
+        >>> himotoki_split.romanize_many(["きょう", "がっこう"])
+        ["kyou", "gakkou"]
+    """
+    from himotoki_split.characters import romanize_many as _romanize_many
+    return _romanize_many(texts)
+
+
+# =============================================================================
+# Dictionary Cache
+# =============================================================================
+
+def lookup_cache_info():
+    """
+    Get hit/miss statistics for the dictionary lookup cache.
+    
+    Returns:
+        A ``functools`` CacheInfo tuple of (hits, misses, maxsize, currsize)
+    """
+    from himotoki_split.dictionary import lookup_cache_info as _info
+    return _info()
+
+
+def configure_lookup_cache(maxsize: Optional[int] = DEFAULT_LOOKUP_CACHE_SIZE) -> None:
+    """
+    Resize the dictionary lookup cache, discarding its current contents.
+    
+    Args:
+        maxsize: Maximum number of cached surface forms. 0 disables
+            caching; None makes the cache unbounded.
+    """
+    from himotoki_split.dictionary import configure_lookup_cache as _configure
+    _configure(maxsize)
+
+
+# =============================================================================
+# Segment Cache
+# =============================================================================
+
+def configure_segment_cache(maxsize: int = 0) -> None:
+    """
+    Enable, resize or disable the segment result cache.
+    
+    When enabled, the tokens of each punctuation-delimited segment are
+    cached by segment text, so repeated utterances (chat logs, subtitles)
+    skip the lattice search and post-processing. Disabled by default.
+    
+    Args:
+        maxsize: Maximum number of segments to keep. 0 disables caching.
+    """
+    from himotoki_split.segment_cache import configure_segment_cache as _configure
+    _configure(maxsize)
+
+
+def segment_cache_info():
+    """
+    Get segment cache statistics.
+    
+    Returns:
+        A SegmentCacheInfo tuple of (hits, misses, maxsize, currsize)
+        with a ``hit_ratio`` property
+    """
+    from himotoki_split.segment_cache import segment_cache_info as _info
+    return _info()
+
+
+# =============================================================================
+# Input Limits
+# =============================================================================
+
+class TextTooLongError(Exception):
+    """Raised when input text exceeds maximum length."""
+    pass
+
+
+# Default longest text accepted by analyze. analyze enumerates candidates
+# over one lattice of the whole text, without the sentence splitting and
+# chunking tokenize uses, so its input is capped by default.
+DEFAULT_MAX_ANALYZE_LENGTH = 1024
+
+# Longest text accepted by tokenize/analyze (None = unlimited)
+_max_text_length: Optional[int] = None
+
+# Longest text accepted by analyze (None = unlimited)
+_max_analyze_length: Optional[int] = DEFAULT_MAX_ANALYZE_LENGTH
+
+# Default for configure_limits arguments that were not passed
+_UNCHANGED = object()
+
+
+def _check_length(text: str, maximum: Optional[int] = None) -> None:
+    """Raise TextTooLongError if text exceeds the configured maximum."""
+    for limit in (_max_text_length, maximum):
+        if limit is not None and len(text) > limit:
+            raise TextTooLongError(
+                f"text is {len(text)} characters long; the maximum is {limit}"
+            )
+
+
+def _is_int(value: Any) -> bool:
+    """Check for an int limit (bool is rejected)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def configure_limits(
+    max_text_length: Any = _UNCHANGED,
+    max_segment_length: Any = _UNCHANGED,
+    max_analyze_length: Any = _UNCHANGED,
+) -> None:
+    """
+    Set input size limits. Limits that are not passed keep their values.
+    
+    Tokenization cost grows linearly with the input: runs without
+    punctuation longer than ``max_segment_length`` are tokenized in
+    overlapping windows rather than as one lattice. ``analyze`` searches
+    one lattice over the whole text, so it has its own cap.
+    
+    Args:
+        max_text_length: Longest text tokenize/analyze accept; longer
+            texts raise TextTooLongError. None means unlimited (default),
+            so the check is opt-in.
+        max_segment_length: Longest punctuation-free run searched as a
+            single lattice (default 256). Must be an int.
+        max_analyze_length: Longest text analyze accepts. None means
+            unlimited. Default DEFAULT_MAX_ANALYZE_LENGTH (1024).
+    
+    Raises:
+        ValueError: If a limit is not an int in range (or None, where
+            allowed)
+    """
+    global _max_text_length, _max_analyze_length
+    from himotoki_split import tokenizer
+    
+    for name, value in (('max_text_length', max_text_length),
+                        ('max_analyze_length', max_analyze_length)):
+        if value is _UNCHANGED or value is None:
+            continue
+        if not _is_int(value) or value < 1:
+            raise ValueError(f"{name} must be an int >= 1 or None")
+    if max_segment_length is not _UNCHANGED and not (
+        _is_int(max_segment_length)
+        and max_segment_length > 2 * tokenizer.CHUNK_OVERLAP
+    ):
+        raise ValueError(
+            f"max_segment_length must be an int > {2 * tokenizer.CHUNK_OVERLAP}"
+        )
+    
+    if max_text_length is not _UNCHANGED:
+        _max_text_length = max_text_length
+    if max_analyze_length is not _UNCHANGED:
+        _max_analyze_length = max_analyze_length
+    if max_segment_length is not _UNCHANGED:
+        tokenizer.MAX_SEGMENT_LENGTH = max_segment_length
+
+
 # =============================================================================
 # Async API
 # =============================================================================
@@ -218,19 +463,34 @@ def _get_executor():
     return _executor
 
 
-class AnalysisTimeoutError(Exception):
-    """Raised when async analysis times out."""
-    pass
-
-
-class TextTooLongError(Exception):
-    """Raised when input text exceeds maximum length."""
-    pass
+async def _run_async(func, args: tuple, timeout: float, message: str):
+    """
+    Run ``func(*args)`` in the thread pool under a CancelToken.
+    
+    The token's deadline stops the worker even if nobody is awaiting it
+    any more, and it is cancelled outright when the awaiting task is.
+    """
+    import asyncio
+    from himotoki_split.cancellation import run_cancellable
+    
+    loop = asyncio.get_running_loop()
+    token = CancelToken(timeout)
+    future = loop.run_in_executor(_get_executor(), run_cancellable, token, func, *args)
+    
+    try:
+        return await asyncio.wait_for(future, timeout=timeout)
+    except asyncio.TimeoutError:
+        token.cancel()
+        raise AnalysisTimeoutError(message)
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
 
 
 async def tokenize_async(
     text: str,
     timeout: float = 30.0,
+    dictionary: Optional[Any] = None,
 ) -> List[Token]:
     """
     Tokenize Japanese text asynchronously.
@@ -238,10 +498,14 @@ async def tokenize_async(
     Args:
         text: Japanese text to tokenize
         timeout: Maximum time in seconds (default 30s)
+        dictionary: Dictionary to use instead of the process-wide default
         
     Returns:
         List of Token objects
         
+    On timeout or cancellation of the awaiting task, the worker thread
+    stops at its next checkpoint instead of running to completion.
+    
     Raises:
         AnalysisTimeoutError: If tokenization exceeds timeout
         ValueError: If text is empty
@@ -250,22 +514,16 @@ async def tokenize_async(
         >>> import asyncio
         >>> tokens = asyncio.run(himotoki_split.tokenize_async("今日は"))
     """
-    import asyncio
-    
-    loop = asyncio.get_event_loop()
-    executor = _get_executor()
-    
-    try:
-        future = loop.run_in_executor(executor, tokenize, text)
-        return await asyncio.wait_for(future, timeout=timeout)
-    except asyncio.TimeoutError:
-        raise AnalysisTimeoutError(f"Tokenization timed out after {timeout}s")
+    return await _run_async(
+        tokenize, (text, dictionary), timeout, f"Tokenization timed out after {timeout}s"
+    )
 
 
 async def analyze_async(
     text: str,
     limit: int = 1,
     timeout: float = 30.0,
+    dictionary: Optional[Any] = None,
 ) -> List[Tuple[List[Token], float]]:
     """
     Analyze Japanese text asynchronously.
@@ -274,10 +532,14 @@ async def analyze_async(
         text: Japanese text to analyze
         limit: Maximum number of results
         timeout: Maximum time in seconds (default 30s)
+        dictionary: Dictionary to use instead of the process-wide default
         
     Returns:
         List of (tokens, score) tuples
         
+    On timeout or cancellation of the awaiting task, the worker thread
+    stops at its next checkpoint instead of running to completion.
+    
     Raises:
         AnalysisTimeoutError: If analysis exceeds timeout
         
@@ -285,16 +547,9 @@ async def analyze_async(
         >>> import asyncio
         >>> results = asyncio.run(himotoki_split.analyze_async("今日は", limit=3))
     """
-    import asyncio
-    
-    loop = asyncio.get_event_loop()
-    executor = _get_executor()
-    
-    try:
-        future = loop.run_in_executor(executor, lambda: analyze(text, limit))
-        return await asyncio.wait_for(future, timeout=timeout)
-    except asyncio.TimeoutError:
-        raise AnalysisTimeoutError(f"Analysis timed out after {timeout}s")
+    return await _run_async(
+        analyze, (text, limit, dictionary), timeout, f"Analysis timed out after {timeout}s"
+    )
 
 
 def shutdown():
@@ -310,6 +565,118 @@ def shutdown():
         _executor = None
 
 
+# =============================================================================
+# Batch Processing
+# =============================================================================
+
+def tokenize_batch(
+    texts,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    dictionary: Optional[Any] = None,
+    cache: Optional[Any] = None,
+) -> List[List[Token]]:
+    """
+    Tokenize many texts in parallel worker processes.
+    
+    Each worker memory-maps the same dictionary once at startup. Results
+    are returned in input order; blank texts give an empty token list.
+    For streaming over very large inputs use
+    ``himotoki_split.parallel.TokenizerPool.imap``.
+    
+    Args:
+        texts: Iterable of texts
+        workers: Number of worker processes (default: CPU count)
+        chunksize: Number of texts sent to a worker per task
+        dictionary: Dictionary handle or .dic path (default dictionary if None)
+        cache: A DiskCache (see ``open_disk_cache``); only texts missing
+            from it are tokenized
+        
+    Returns:
+        List of token lists, one per input text
+        
+    Example:
+        >>> results = himotoki_split.tokenize_batch(sentences, workers=8)
+    """
+    from himotoki_split.parallel import tokenize_batch as _tokenize_batch
+    return _tokenize_batch(
+        texts, workers=workers, chunksize=chunksize, dictionary=dictionary, cache=cache
+    )
+
+
+def tokenize_stream(source, dictionary: Optional[Any] = None, cache: Optional[Any] = None):
+    """
+    Tokenize a string, text file or iterable of text chunks lazily.
+    
+    Input is split into sentences as it is read, so memory use stays
+    bounded and tokens are yielded as soon as each sentence is complete.
+    Token positions are offsets into the whole input.
+    
+    Args:
+        source: A string, a text file, or an iterable of text chunks
+        dictionary: Dictionary to use instead of the process-wide default
+        cache: A DiskCache to reuse and fill, sentence by sentence
+        
+    Yields:
+        Token objects in input order
+        
+    Example:
+        >>> with open("corpus.txt", encoding="utf-8") as f:
+        ...     for token in himotoki_split.tokenize_stream(f):
+        ...         print(token.surface)
+    """
+    from himotoki_split.streaming import tokenize_stream as _tokenize_stream
+    return _tokenize_stream(source, dictionary, cache=cache)
+
+
+def tokenize_columnar(texts, dictionary: Optional[Any] = None, strings: bool = True):
+    """
+    Tokenize texts into a columnar TokenBatch.
+    
+    Offsets, sequence ids and POS ids are kept in ``array('i')`` columns
+    and surfaces are sliced from the text on demand, which avoids a Token
+    object per token for large corpora.
+    
+    Args:
+        texts: A text or an iterable of texts
+        dictionary: Dictionary to use instead of the process-wide default
+        strings: Keep readings and base forms (False keeps only ids and spans)
+        
+    Returns:
+        TokenBatch with ``to_numpy()`` and ``to_arrow()`` conversions
+        
+    Example:
+        >>> batch = himotoki_split.tokenize_columnar(sentences, strings=False)
+        >>> columns = batch.to_numpy()
+    """
+    from himotoki_split.columnar import tokenize_columnar as _tokenize_columnar
+    return _tokenize_columnar(texts, dictionary, strings=strings)
+
+
+def open_disk_cache(path, dictionary: Optional[Any] = None):
+    """
+    Open a persistent tokenization cache directory.
+    
+    Cached results are keyed by the text together with the dictionary
+    build, the library version and the tokenizer sources, so they are
+    invalidated automatically when any of those change.
+    
+    Args:
+        path: Cache directory (created if missing)
+        dictionary: Dictionary the cached tokens come from (default
+            dictionary if None)
+        
+    Returns:
+        A ``himotoki_split.disk_cache.DiskCache``; close it when done
+        
+    Example:
+        >>> with himotoki_split.open_disk_cache(".himotoki-cache") as cache:
+        ...     results = himotoki_split.tokenize_batch(lines, cache=cache)
+    """
+    from himotoki_split.disk_cache import DiskCache
+    return DiskCache(path, dictionary)
+
+
 # =============================================================================
 # Session Context (for batch processing)
 # =============================================================================
@@ -350,20 +717,37 @@ __all__ = [
     "Token",
     # Sync API
     "tokenize", 
+    "segment",
     "analyze",
     "warm_up",
     "get_version",
     "get_conjugation_hint",
     "romanize",
+    "romanize_many",
+    # Dictionary cache
+    "lookup_cache_info",
+    "configure_lookup_cache",
+    # Segment cache
+    "configure_segment_cache",
+    "segment_cache_info",
+    # Input limits
+    "configure_limits",
     # Async API
     "tokenize_async",
     "analyze_async",
     "shutdown",
     # Batch processing
+    "tokenize_batch",
+    "tokenize_stream",
+    "tokenize_columnar",
+    "open_disk_cache",
     "session_context",
     # Exceptions
     "AnalysisTimeoutError",
+    "OperationCancelledError",
     "TextTooLongError",
+    # Cancellation
+    "CancelToken",
     # Version
     "__version__",
 ]
\ No newline at end of file
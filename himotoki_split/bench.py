@@ -0,0 +1,418 @@
+"""
+Benchmark suite for himotoki-split.
+
+Measures tokenizer performance on the categorized test sentences and on
+synthetic long documents, and writes the results as JSON so releases can
+be compared against a stored baseline.
+
+Reported metrics:
+    - import time and first-call latency (measured in a fresh process)
+    - sentences/sec and p50/p95/p99 latency per sentence category
+    - characters/sec on long documents
+    - peak RSS of the benchmark process
+
+Usage:
+    python -m himotoki_split.bench
+    python -m himotoki_split.bench --quick
+    python -m himotoki_split.bench --output benchmarks/current.json
+    python -m himotoki_split.bench --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from himotoki_split import __version__
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Relative slowdown (or memory growth) reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+# Synthetic document sizes, in characters
+DOCUMENT_SIZES = (1_000, 10_000, 50_000)
+
+# Metrics where a larger value is better; all others are lower-is-better
+HIGHER_IS_BETTER = ("sentences_per_sec", "chars_per_sec")
+
+
+# =============================================================================
+# Inputs
+# =============================================================================
+
+def load_categorized_sentences(quick: bool = False) -> Dict[str, List[str]]:
+    """
+    Load the categorized test sentences from ``scripts/test_sentences.py``.
+
+    Args:
+        quick: Use the 50 quick sentences as a single category
+
+    Returns:
+        Dict mapping category name to its sentences
+    """
+    scripts_dir = PROJECT_ROOT / "scripts"
+    if str(scripts_dir) not in sys.path:
+        sys.path.append(str(scripts_dir))
+    try:
+        import test_sentences
+    except ImportError:
+        raise FileNotFoundError(
+            f"Test sentences not found in {scripts_dir}. "
+            "Run the benchmark from a source checkout or pass --sentences FILE."
+        )
+
+    if quick:
+        return {"quick": test_sentences.get_quick_sentences()}
+    return test_sentences.get_categorized_sentences()
+
+
+def load_sentence_file(path: Path) -> Dict[str, List[str]]:
+    """Load one sentence per non-blank line as a single category."""
+    with open(path, encoding="utf-8") as f:
+        sentences = [line.strip() for line in f if line.strip()]
+    return {path.stem: sentences}
+
+
+def make_document(sentences: List[str], size: int) -> str:
+    """Build a synthetic document of about ``size`` characters."""
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        sentence = sentences[i % len(sentences)].rstrip("。") + "。"
+        parts.append(sentence)
+        length += len(sentence)
+        i += 1
+    return "".join(parts)[:size]
+
+
+# =============================================================================
+# Measurements
+# =============================================================================
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * fraction
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB, if available."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def measure_startup(dictionary_path: Optional[Path] = None) -> Dict[str, float]:
+    """
+    Measure import time and first-call latency in a fresh interpreter.
+
+    First-call latency includes opening the dictionary.
+
+    Returns:
+        Dict with ``import_ms`` and ``first_call_ms``
+    """
+    code = (
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        "import himotoki_split\n"
+        "t1 = time.perf_counter()\n"
+        "from himotoki_split.dictionary import Dictionary\n"
+        "path = sys.argv[1] or None\n"
+        "dictionary = Dictionary(path) if path else None\n"
+        "t2 = time.perf_counter()\n"
+        "himotoki_split.tokenize('今日は天気がいいですね', dictionary)\n"
+        "t3 = time.perf_counter()\n"
+        "print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_call_ms': (t3 - t2) * 1000}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(dictionary_path or "")],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=str(PROJECT_ROOT),
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_sentences(
+    sentences: List[str],
+    tokenize: Callable[[str], list],
+    repeat: int = 1,
+) -> Dict[str, float]:
+    """
+    Time tokenization of each sentence.
+
+    Args:
+        sentences: Sentences to tokenize
+        tokenize: Tokenizer function
+        repeat: Number of passes over the sentences
+
+    Returns:
+        Dict with throughput and latency percentiles (milliseconds)
+    """
+    latencies = []
+    total_start = time.perf_counter()
+    for _ in range(repeat):
+        for sentence in sentences:
+            t0 = time.perf_counter()
+            tokenize(sentence)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - total_start
+
+    latencies.sort()
+    return {
+        "sentences": len(latencies),
+        "sentences_per_sec": len(latencies) / total if total else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+def measure_document(document: str, tokenize: Callable[[str], list]) -> Dict[str, float]:
+    """Time tokenization of one long document."""
+    t0 = time.perf_counter()
+    tokens = tokenize(document)
+    elapsed = time.perf_counter() - t0
+    return {
+        "chars": len(document),
+        "tokens": len(tokens),
+        "seconds": elapsed,
+        "chars_per_sec": len(document) / elapsed if elapsed else 0.0,
+    }
+
+
+def run_benchmarks(
+    categories: Dict[str, List[str]],
+    dictionary_path: Optional[Path] = None,
+    repeat: int = 1,
+    document_sizes=DOCUMENT_SIZES,
+    startup: bool = True,
+) -> dict:
+    """
+    Run the full benchmark suite.
+
+    Args:
+        categories: Sentences by category
+        dictionary_path: .dic file to benchmark (default dictionary if None)
+        repeat: Passes over each category's sentences
+        document_sizes: Sizes of the synthetic documents, in characters
+        startup: Also measure import time and first-call latency
+
+    Returns:
+        JSON-serializable results
+    """
+    import himotoki_split
+    from himotoki_split.dictionary import Dictionary, get_default_dictionary
+
+    results = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    if startup:
+        results["startup"] = measure_startup(dictionary_path)
+
+    dictionary = Dictionary(dictionary_path) if dictionary_path else get_default_dictionary()
+    dictionary.open()
+
+    def tokenize(text: str) -> list:
+        return himotoki_split.tokenize(text, dictionary)
+
+    # Warm the lookup cache and code paths once so categories compare evenly
+    all_sentences = [s for sentences in categories.values() for s in sentences]
+    for sentence in all_sentences:
+        tokenize(sentence)
+
+    results["categories"] = {
+        name: measure_sentences(sentences, tokenize, repeat)
+        for name, sentences in categories.items()
+    }
+    results["overall"] = measure_sentences(all_sentences, tokenize, repeat)
+    results["documents"] = {
+        str(size): measure_document(make_document(all_sentences, size), tokenize)
+        for size in document_sizes
+    }
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# =============================================================================
+# Baseline Comparison
+# =============================================================================
+
+def _flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results to ``a.b.c`` keys, keeping numeric leaves."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """
+    Compare results against a baseline.
+
+    Counts (sentences, chars, tokens) are skipped; every other metric
+    present in both results is compared.
+
+    Args:
+        current: Results of this run
+        baseline: Stored baseline results
+        threshold: Relative change treated as a regression
+
+    Returns:
+        One dict per metric with the old and new values, the relative
+        change (positive is better) and whether it regressed
+    """
+    skip = ("sentences", "chars", "tokens", "seconds")
+    old = _flatten(baseline)
+    new = _flatten(current)
+
+    rows = []
+    for name in sorted(old.keys() & new.keys()):
+        if name.rsplit(".", 1)[-1] in skip or old[name] == 0:
+            continue
+        change = (new[name] - old[name]) / old[name]
+        if not name.endswith(HIGHER_IS_BETTER):
+            change = -change
+        rows.append({
+            "metric": name,
+            "baseline": old[name],
+            "current": new[name],
+            "change": change,
+            "regression": change < -threshold,
+        })
+    return rows
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+def print_results(results: dict) -> None:
+    """Print a human-readable summary."""
+    print(f"himotoki-split {results['version']} (Python {results['python']})")
+
+    startup = results.get("startup")
+    if startup:
+        print(f"  Import:      {startup['import_ms']:>9.1f}ms")
+        print(f"  First call:  {startup['first_call_ms']:>9.1f}ms")
+
+    print()
+    print(f"  {'Category':<20} {'sent/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(results["categories"].items()) + [("overall", results["overall"])]
+    for name, m in rows:
+        print(
+            f"  {name:<20} {m['sentences_per_sec']:>9.1f} "
+            f"{m['p50_ms']:>8.2f} {m['p95_ms']:>8.2f} {m['p99_ms']:>8.2f}"
+        )
+
+    print()
+    for size, m in results["documents"].items():
+        print(f"  Document {int(size):>7,} chars: {m['chars_per_sec']:>10,.0f} chars/s")
+
+    if results.get("peak_rss_mb") is not None:
+        print(f"  Peak RSS: {results['peak_rss_mb']:.1f} MiB")
+
+
+def print_comparison(rows: List[dict]) -> None:
+    """Print a baseline comparison table."""
+    print()
+    print(f"  {'Metric':<45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"  {row['metric']:<45} {row['baseline']:>12.3f} {row['current']:>12.3f} "
+            f"{row['change']:>+7.1%}{flag}"
+        )
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m himotoki_split.bench",
+        description="Benchmark himotoki-split throughput, latency and memory",
+    )
+    parser.add_argument("--quick", action="store_true", help="Use the 50 quick sentences")
+    parser.add_argument("--sentences", type=Path, metavar="FILE",
+                        help="Benchmark sentences from a file (one per line)")
+    parser.add_argument("--dictionary", type=Path, metavar="PATH",
+                        help="Benchmark a specific .dic file")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Passes over the sentences (default: 3)")
+    parser.add_argument("--no-startup", action="store_true",
+                        help="Skip the import/first-call measurement")
+    parser.add_argument("-o", "--output", type=Path, metavar="FILE",
+                        help="Write results as JSON")
+    parser.add_argument("-b", "--baseline", type=Path, metavar="FILE",
+                        help="Compare against stored baseline results")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative change counted as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1")
+
+    try:
+        if args.sentences:
+            categories = load_sentence_file(args.sentences)
+        else:
+            categories = load_categorized_sentences(args.quick)
+        results = run_benchmarks(
+            categories,
+            dictionary_path=args.dictionary,
+            repeat=args.repeat,
+            startup=not args.no_startup,
+        )
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print_results(results)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results(results, baseline, args.threshold)
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
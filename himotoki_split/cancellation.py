@@ -0,0 +1,115 @@
+"""
+Cooperative cancellation for himotoki-split.
+
+Tokenization is pure Python running in a worker thread, which cannot be
+interrupted from outside. Instead the lattice build and path search call
+``checkpoint()`` as they go; when the active CancelToken has been
+cancelled or its deadline has passed, the checkpoint raises and the
+worker stops, freeing its thread.
+
+Usage:
+    from himotoki_split.cancellation import CancelToken, cancel_scope
+
+    token = CancelToken(timeout=0.5)
+    with cancel_scope(token):
+        tokens = tokenize(text)   # raises AnalysisTimeoutError after 0.5s
+
+The async API creates a token per call and cancels it when the awaiting
+side times out or is cancelled.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class OperationCancelledError(Exception):
+    """Raised inside a tokenizer call whose CancelToken was cancelled."""
+    pass
+
+
+class AnalysisTimeoutError(OperationCancelledError):
+    """Raised when analysis runs past its timeout."""
+    pass
+
+
+class CancelToken:
+    """
+    Cancellation flag with an optional deadline.
+
+    Args:
+        timeout: Seconds from now after which checkpoints raise
+            AnalysisTimeoutError (no deadline if None)
+    """
+
+    __slots__ = ('deadline', 'timeout', '_cancelled')
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """Request cancellation; the worker stops at its next checkpoint."""
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancelled or past the deadline."""
+        return self._cancelled or (
+            self.deadline is not None and time.monotonic() >= self.deadline
+        )
+
+    def check(self) -> None:
+        """
+        Raise if cancelled or past the deadline.
+
+        Raises:
+            OperationCancelledError: If ``cancel()`` was called
+            AnalysisTimeoutError: If the deadline has passed
+        """
+        if self._cancelled:
+            raise OperationCancelledError("Tokenization was cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise AnalysisTimeoutError(f"Tokenization timed out after {self.timeout}s")
+
+
+# Token governing tokenizer calls in the current context
+_TOKEN: ContextVar[Optional[CancelToken]] = ContextVar("himotoki_cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    """Get the CancelToken active in this context, if any."""
+    return _TOKEN.get()
+
+
+def checkpoint() -> None:
+    """Raise if the active CancelToken is cancelled or expired."""
+    token = _TOKEN.get()
+    if token is not None:
+        token.check()
+
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    """Make ``token`` govern tokenizer calls made in this block."""
+    reset = _TOKEN.set(token)
+    try:
+        yield token
+    finally:
+        _TOKEN.reset(reset)
+
+
+def run_cancellable(token: CancelToken, func: Callable[..., T], *args) -> T:
+    """
+    Call ``func(*args)`` under ``token``.
+
+    Executor threads do not inherit the caller's context, so this is the
+    function to submit to an executor.
+    """
+    with cancel_scope(token):
+        token.check()
+        return func(*args)
@@ -7,8 +7,9 @@ text normalization, and basic Japanese text splitting.
 """
 
 import re
-from typing import Optional, List, Tuple, Dict, Set
+from typing import Optional, List, Tuple, Dict, Set, Iterable
 from functools import lru_cache
+from itertools import accumulate
 
 
 # ============================================================================
@@ -154,6 +155,129 @@ _HIRAGANA_RE = re.compile(f'^{HIRAGANA_PATTERN}+$')
 _KANJI_RE = re.compile(f'^{KANJI_PATTERN}+$')
 _KANA_RE = re.compile(f'^{KANA_PATTERN}+$')
 _NONWORD_RE = re.compile(f'^{NONWORD_PATTERN}+$')
+_KANJI_SEARCH_RE = re.compile(KANJI_PATTERN)
+_KANA_SEARCH_RE = re.compile(KANA_PATTERN)
+
+
+# ============================================================================
+# Character Class Table
+# ============================================================================
+
+# Class flags; a character can have several (ー is hiragana and katakana)
+HIRAGANA = 0x01
+KATAKANA = 0x02
+KANJI = 0x04
+MODIFIER = 0x08      # Small kana and long vowel mark (can't start a word)
+SOKUON = 0x10        # っ/ッ (a word can't end right after it)
+NON_MORA = 0x20      # Not counted by mora_length
+KANA = HIRAGANA | KATAKANA
+
+# Characters not counted as a mora
+NON_MORA_CHARS = "っッぁァぃィぅゥぇェぉォゃャゅュょョー"
+
+
+def _build_char_flags() -> bytes:
+    """Build the codepoint -> class flags table for the BMP."""
+    table = bytearray(0x10000)
+
+    def mark(chars, flag):
+        for char in chars:
+            table[ord(char)] |= flag
+
+    def mark_range(first, last, flag):
+        for code in range(ord(first), ord(last) + 1):
+            table[code] |= flag
+
+    # Same sets as KATAKANA_PATTERN, HIRAGANA_PATTERN and KANJI_PATTERN
+    mark_range('ァ', 'ヺ', KATAKANA)
+    mark('ヽヾー', KATAKANA)
+    mark_range('ぁ', 'ゔ', HIRAGANA)
+    mark('ゝゞー', HIRAGANA)
+    mark_range('一', '龯', KANJI)
+    mark('々ヶ〆', KANJI)
+
+    mark(''.join(MODIFIER_CHARS.values()), MODIFIER)
+    mark(SOKUON_CHARS, SOKUON)
+    mark(NON_MORA_CHARS, NON_MORA)
+    return bytes(table)
+
+
+CHAR_FLAGS = _build_char_flags()
+
+# Per-flag translation tables mapping a flags byte to 1 if set, else 0
+_FLAG_BITS: Dict[int, bytes] = {
+    flag: bytes(1 if value & flag else 0 for value in range(256))
+    for flag in (HIRAGANA, KATAKANA, KANJI, KANA, NON_MORA)
+}
+
+
+def char_flags(char: str) -> int:
+    """Get the class flags of a character (0 outside the table)."""
+    code = ord(char)
+    return CHAR_FLAGS[code] if code < 0x10000 else 0
+
+
+def text_flags(text: str) -> bytes:
+    """Get the class flags of every character of a text, one byte each."""
+    return bytes([
+        CHAR_FLAGS[code] if code < 0x10000 else 0
+        for code in map(ord, text)
+    ])
+
+
+class TextClasses:
+    """
+    Character classes of a text, indexed for substring queries.
+
+    Built once per input, this keeps running counts of each class so that
+    class tests on any substring ``text[start:end]`` are O(1) instead of
+    rescanning the slice.
+
+    Args:
+        text: The text to index
+    """
+
+    __slots__ = ('text', 'flags', '_hiragana', '_katakana', '_kanji', '_kana', '_non_mora')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.flags = flags = text_flags(text)
+        self._hiragana = self._prefix_counts(flags, HIRAGANA)
+        self._katakana = self._prefix_counts(flags, KATAKANA)
+        self._kanji = self._prefix_counts(flags, KANJI)
+        self._kana = self._prefix_counts(flags, KANA)
+        self._non_mora = self._prefix_counts(flags, NON_MORA)
+
+    @staticmethod
+    def _prefix_counts(flags: bytes, flag: int) -> List[int]:
+        return list(accumulate(flags.translate(_FLAG_BITS[flag]), initial=0))
+
+    def _all(self, counts: List[int], start: int, end: int) -> bool:
+        return end > start and counts[end] - counts[start] == end - start
+
+    def is_hiragana(self, start: int, end: int) -> bool:
+        """Check if text[start:end] is entirely hiragana."""
+        return self._all(self._hiragana, start, end)
+
+    def is_katakana(self, start: int, end: int) -> bool:
+        """Check if text[start:end] is entirely katakana."""
+        return self._all(self._katakana, start, end)
+
+    def is_kanji(self, start: int, end: int) -> bool:
+        """Check if text[start:end] contains only kanji characters."""
+        return self._all(self._kanji, start, end)
+
+    def is_kana(self, start: int, end: int) -> bool:
+        """Check if text[start:end] is entirely kana."""
+        return self._all(self._kana, start, end)
+
+    def has_kanji(self, start: int, end: int) -> bool:
+        """Check if text[start:end] contains any kanji."""
+        return self._kanji[end] > self._kanji[start]
+
+    def mora_length(self, start: int, end: int) -> int:
+        """Mora length of text[start:end] (see ``mora_length``)."""
+        return (end - start) - (self._non_mora[end] - self._non_mora[start])
 
 
 # ============================================================================
@@ -235,42 +359,45 @@ def is_kana(word: str) -> bool:
 
 def has_kanji(word: str) -> bool:
     """Check if word contains any kanji."""
-    return bool(re.search(KANJI_PATTERN, word))
+    return _KANJI_SEARCH_RE.search(word) is not None
 
 
 def has_kana(word: str) -> bool:
     """Check if word contains any kana."""
-    return bool(re.search(KANA_PATTERN, word))
+    return _KANA_SEARCH_RE.search(word) is not None
 
 
 # ============================================================================
 # Kana Conversion Functions
 # ============================================================================
 
+def _build_kana_table(index: int, sokuon: str, iteration: str, iteration_voiced: str) -> Dict[int, str]:
+    """Build a str.translate table converting kana to one script."""
+    table = {}
+    for chars in list(KANA_CHARS.values()) + list(MODIFIER_CHARS.values()):
+        for char in chars:
+            table[ord(char)] = chars[index]
+    for char in SOKUON_CHARS:
+        table[ord(char)] = sokuon
+    for char in ITERATION_CHARS:
+        table[ord(char)] = iteration
+    for char in ITERATION_VOICED_CHARS:
+        table[ord(char)] = iteration_voiced
+    # Only keep the characters that actually change
+    return {code: char for code, char in table.items() if chr(code) != char}
+
+
+# Hiragana is the first char of each pair, katakana the last
+_HIRAGANA_TABLE = _build_kana_table(0, 'っ', 'ゝ', 'ゞ')
+_KATAKANA_TABLE = _build_kana_table(-1, 'ッ', 'ヽ', 'ヾ')
+
+
 def as_hiragana(text: str) -> str:
     """
     Convert katakana to hiragana.
     Equivalent to ichiran's as-hiragana function.
     """
-    result = []
-    for char in text:
-        char_class = get_char_class(char)
-        if char_class and char_class in KANA_CHARS:
-            # Get hiragana (first char of the pair)
-            result.append(KANA_CHARS[char_class][0])
-        elif char_class and char_class in MODIFIER_CHARS:
-            result.append(MODIFIER_CHARS[char_class][0])
-        elif char == 'ッ':
-            result.append('っ')
-        elif char == 'ー':
-            result.append('ー')
-        elif char in ITERATION_CHARS:
-            result.append('ゝ')
-        elif char in ITERATION_VOICED_CHARS:
-            result.append('ゞ')
-        else:
-            result.append(char)
-    return ''.join(result)
+    return text.translate(_HIRAGANA_TABLE)
 
 
 def as_katakana(text: str) -> str:
@@ -278,25 +405,7 @@ def as_katakana(text: str) -> str:
     Convert hiragana to katakana.
     Equivalent to ichiran's as-katakana function.
     """
-    result = []
-    for char in text:
-        char_class = get_char_class(char)
-        if char_class and char_class in KANA_CHARS:
-            # Get katakana (second/last char of the pair)
-            result.append(KANA_CHARS[char_class][-1])
-        elif char_class and char_class in MODIFIER_CHARS:
-            result.append(MODIFIER_CHARS[char_class][-1])
-        elif char == 'っ':
-            result.append('ッ')
-        elif char == 'ー':
-            result.append('ー')
-        elif char in ITERATION_CHARS:
-            result.append('ヽ')
-        elif char in ITERATION_VOICED_CHARS:
-            result.append('ヾ')
-        else:
-            result.append(char)
-    return ''.join(result)
+    return text.translate(_KATAKANA_TABLE)
 
 
 # ============================================================================
@@ -416,6 +525,24 @@ def normalize_char(char: str, context: str = None) -> str:
     return char
 
 
+def _build_normalize_table(abnormal: str, normal: str) -> Dict[int, str]:
+    """Build a str.translate table with the same mapping as normalize_char."""
+    table = {}
+    for pos, char in enumerate(abnormal[:len(normal)]):
+        table.setdefault(ord(char), normal[pos])
+    return table
+
+
+_NORMALIZE_TABLE = _build_normalize_table(ABNORMAL_CHARS, NORMAL_CHARS)
+_NORMALIZE_KANA_TABLE = _build_normalize_table(HALF_WIDTH_KANA, FULL_WIDTH_KANA)
+
+# Multi-character punctuation is replaced first, then single characters
+# in one translate. No replacement produces a key, so the order of the
+# single-character replacements does not matter.
+_PUNCTUATION_SEQUENCES = [(old, new) for old, new in PUNCTUATION_MAP.items() if len(old) > 1]
+_PUNCTUATION_TABLE = str.maketrans({old: new for old, new in PUNCTUATION_MAP.items() if len(old) == 1})
+
+
 def normalize(text: str, context: str = None) -> str:
     """
     Normalize text by converting abnormal characters to normal form.
@@ -433,16 +560,33 @@ def normalize(text: str, context: str = None) -> str:
     Returns:
         Normalized text
     """
-    # Character-by-character normalization
-    chars = [normalize_char(c, context) for c in text]
-    text = ''.join(chars)
+    if context == 'kana':
+        return text.translate(_NORMALIZE_KANA_TABLE)
     
-    # Punctuation replacement (if not kana-only context)
-    if context != 'kana':
-        for old, new in PUNCTUATION_MAP.items():
+    text = text.translate(_NORMALIZE_TABLE)
+    
+    # Punctuation replacement
+    for old, new in _PUNCTUATION_SEQUENCES:
+        if old in text:
             text = text.replace(old, new)
+    return text.translate(_PUNCTUATION_TABLE)
+
+
+def normalize_many(texts: Iterable[str], context: str = None) -> List[str]:
+    """
+    Normalize a batch of texts.
     
-    return text
+    Args:
+        texts: Texts to normalize
+        context: 'kana' for kana-only context
+    
+    Returns:
+        List of normalized texts, in input order
+    """
+    if context == 'kana':
+        table = _NORMALIZE_KANA_TABLE
+        return [text.translate(table) for text in texts]
+    return [normalize(text) for text in texts]
 
 
 # ============================================================================
@@ -486,13 +630,15 @@ def basic_split(text: str) -> List[Tuple[str, str]]:
     return result
 
 
+_STRIP_NON_MORA = str.maketrans('', '', NON_MORA_CHARS)
+
+
 def mora_length(text: str) -> int:
     """
     Calculate mora length (doesn't count modifier characters).
     Equivalent to ichiran's mora-length function.
     """
-    modifiers = "っッぁァぃィぅゥぇェぉォゃャゅュょョー"
-    return sum(1 for c in text if c not in modifiers)
+    return len(text.translate(_STRIP_NON_MORA))
 
 
 # ============================================================================
@@ -595,6 +741,64 @@ ROMAJI_MAP = {
 }
 
 
+def _compile_romaji_tables():
+    """
+    Compile ROMAJI_MAP into character-level lookup tables.
+    
+    Returns:
+        (table, small, geminate, n_apostrophe) where ``table`` maps single
+        kana and kana + small kana digraphs to romaji, ``small`` maps small
+        kana to their romaji, ``geminate`` maps kana to the consonant a
+        preceding sokuon doubles, and ``n_apostrophe`` holds the kana after
+        which ん is written n'.
+    """
+    table = {}
+    small = {}
+    geminate = {}
+    n_apostrophe = set()
+    
+    for char, char_class in _CHAR_CLASS_MAP.items():
+        romaji = ROMAJI_MAP.get(char_class, char)
+        if romaji and romaji[0] not in 'aeioun':
+            geminate[char] = romaji[0]
+        if char_class.startswith(('+', 'a', 'i', 'u', 'e', 'o', 'ya', 'yu', 'yo')):
+            n_apostrophe.add(char)
+        
+        if char_class in ('sokuon', 'long_vowel'):
+            continue
+        if char_class.startswith('+'):
+            small[char] = romaji
+        else:
+            table[char] = romaji
+    
+    # A small kana after a sound ending in i replaces the i (き + ゃ → kya)
+    for char, romaji in list(table.items()):
+        if romaji.endswith('i'):
+            for small_char, small_romaji in small.items():
+                table[char + small_char] = romaji[:-1] + small_romaji
+    
+    return table, small, geminate, frozenset(n_apostrophe)
+
+
+_ROMAJI_TABLE, _SMALL_ROMAJI, _GEMINATE_CONSONANTS, _N_APOSTROPHE_NEXT = _compile_romaji_tables()
+_N_CHARS = KANA_CHARS['n']
+
+
+def _char_set_pattern(chars) -> str:
+    return '[' + ''.join(re.escape(c) for c in sorted(chars)) + ']'
+
+
+_SMALL_KANA_SET = _char_set_pattern(_SMALL_ROMAJI)
+
+_ROMAJI_TRANSLATE = str.maketrans({k: v for k, v in _ROMAJI_TABLE.items() if len(k) == 1})
+
+# Text needing the full scan: digraphs, sokuon, ー, or ん written n'
+_ROMAJI_SCAN_RE = re.compile(
+    f'[{SOKUON_CHARS}ー]|{_SMALL_KANA_SET}'
+    f'|{_char_set_pattern(_N_CHARS)}{_char_set_pattern(_N_APOSTROPHE_NEXT)}'
+)
+
+
 def romanize_word(text: str) -> str:
     """
     Convert kana text to romaji.
@@ -602,6 +806,10 @@ def romanize_word(text: str) -> str:
     This is a simplified romanization function. For full ichiran
     compatibility, a more complex system would be needed.
     
+    The text is scanned once, taking the longest match from the compiled
+    table (digraphs before single kana). Sokuon doubles the consonant of
+    the next kana and ー repeats the preceding vowel.
+    
     Args:
         text: Kana text to romanize
         
@@ -611,73 +819,82 @@ def romanize_word(text: str) -> str:
     if not text:
         return text
     
+    table = _ROMAJI_TABLE
+    
+    # Fast path: without digraphs or context rules every kana is a plain
+    # table lookup, so translate in bulk
+    if _ROMAJI_SCAN_RE.search(text) is None:
+        return text.translate(_ROMAJI_TRANSLATE)
+    
     result = []
-    prev_char_class = None
+    length = len(text)
     i = 0
     
-    while i < len(text):
-        char = text[i]
-        char_class = get_char_class(char)
-        
-        if char_class is None:
-            # Non-kana character, pass through
-            result.append(char)
-            prev_char_class = None
-            i += 1
-            continue
+    while i < length:
+        # Longest match first: kana + small kana digraph
+        if i + 1 < length:
+            romaji = table.get(text[i:i + 2])
+            if romaji is not None:
+                result.append(romaji)
+                i += 2
+                continue
         
-        # Handle sokuon (small tsu) - double next consonant
-        if char_class == 'sokuon':
-            if i + 1 < len(text):
-                next_class = get_char_class(text[i + 1])
-                if next_class and next_class in ROMAJI_MAP:
-                    romaji = ROMAJI_MAP[next_class]
-                    if romaji and romaji[0] not in 'aeioun':
-                        result.append(romaji[0])
-            prev_char_class = char_class
-            i += 1
-            continue
+        char = text[i]
+        romaji = table.get(char)
         
-        # Handle long vowel mark
-        if char_class == 'long_vowel':
-            if result:
-                # Extend the previous vowel
-                last = result[-1]
-                if last in 'aeiou':
-                    result.append(last)
-                else:
-                    result.append('ō')
-            else:
-                result.append('ō')
-            prev_char_class = char_class
-            i += 1
-            continue
+        if romaji is not None:
+            # ん before a vowel or y-sound is written n'
+            if char in _N_CHARS and i + 1 < length and text[i + 1] in _N_APOSTROPHE_NEXT:
+                romaji = "n'"
+            result.append(romaji)
         
-        # Handle small kana (ya, yu, yo)
-        if char_class.startswith('+'):
-            base_romaji = ROMAJI_MAP.get(char_class, char)
-            # Combine with previous consonant
+        elif char in _SMALL_ROMAJI:
+            # Small kana not forming a digraph: combine with a preceding i
+            romaji = _SMALL_ROMAJI[char]
             if result and result[-1].endswith('i'):
-                # Replace 'i' with small kana sound
-                result[-1] = result[-1][:-1] + base_romaji
+                result[-1] = result[-1][:-1] + romaji
             else:
-                result.append(base_romaji)
-            prev_char_class = char_class
-            i += 1
-            continue
+                result.append(romaji)
         
-        # Regular kana
-        romaji = ROMAJI_MAP.get(char_class, char)
+        elif char in SOKUON_CHARS:
+            # Sokuon (small tsu) - double next consonant
+            if i + 1 < length:
+                consonant = _GEMINATE_CONSONANTS.get(text[i + 1])
+                if consonant:
+                    result.append(consonant)
         
-        # Handle 'n' before certain sounds
-        if char_class == 'n' and i + 1 < len(text):
-            next_char = text[i + 1]
-            next_class = get_char_class(next_char)
-            if next_class and next_class.startswith(('+', 'a', 'i', 'u', 'e', 'o', 'ya', 'yu', 'yo')):
-                romaji = "n'"
+        elif char == 'ー':
+            # Long vowel mark - extend the previous vowel
+            if result and result[-1] in 'aeiou':
+                result.append(result[-1])
+            else:
+                result.append('ō')
+        
+        else:
+            # Non-kana character, pass through
+            result.append(char)
         
-        result.append(romaji)
-        prev_char_class = char_class
         i += 1
     
-    return ''.join(result)
\ No newline at end of file
+    return ''.join(result)
+
+
+def romanize_many(texts: Iterable[str]) -> List[str]:
+    """
+    Romanize a batch of kana texts.
+    
+    Args:
+        texts: Kana texts to romanize
+    
+    Returns:
+        List of romanized texts, in input order
+    """
+    # Readings repeat a lot in real text, so convert each distinct one once
+    cache = {}
+    result = []
+    for text in texts:
+        romaji = cache.get(text)
+        if romaji is None:
+            romaji = cache[text] = romanize_word(text)
+        result.append(romaji)
+    return result
@@ -5,16 +5,26 @@ Usage:
     himotoki-split "今日は天気がいいです"
     himotoki-split -d "食べたかった"
     himotoki-split --json "食べました"
+    himotoki-split --lines --format jsonl -w 4 -i corpus.txt -o tokens.jsonl
+    himotoki-split serve
+
+While a ``himotoki-split serve`` process is running, invocations are
+forwarded to it instead of loading the dictionary themselves.
 """
 
 import argparse
+import io
 import json
+import os
 import sys
-from typing import List, Optional, Tuple
+from itertools import tee
+from typing import Iterator, List, Optional
 
-from himotoki_split import tokenize, Token, __version__
-from himotoki_split.dictionary import lookup, load_dictionary, get_pos_name, get_kana_reading
+from himotoki_split import tokenize, tokenize_stream, Token, __version__
+from himotoki_split.dictionary import Dictionary, get_default_dictionary, get_pos_name
 from himotoki_split.constants import CONJ_TYPE_NAMES
+from himotoki_split.disk_cache import DiskCache
+from himotoki_split.streaming import SENTENCE_TERMINATORS
 
 
 # ============================================================================
@@ -331,185 +341,13 @@ def detect_conjugation_layers(surface: str, pos: str) -> List[dict]:
     return layers
 
 
-def get_base_form_and_reading(surface: str, pos: str, base_seq: int) -> Tuple[str, Optional[str]]:
-    """
-    Reconstruct the base form and get its reading.
-    
-    Returns (base_form, base_reading)
-    """
-    load_dictionary()
-    
-    # Get kana reading for base form from dictionary
-    base_reading = get_kana_reading(base_seq) if base_seq else None
-    
-    base_form = surface  # Default
-    
-    # Reconstruct base form based on POS and conjugation patterns
-    if pos.startswith('v1'):  # Ichidan verb
-        # Try to extract the verb stem and add る
-        stem = None
-        
-        # Causative patterns
-        if 'させ' in surface:
-            # Find stem before させ
-            idx = surface.find('させ')
-            if idx > 0:
-                stem = surface[:idx]
-        # Passive/potential patterns
-        elif 'られ' in surface:
-            idx = surface.find('られ')
-            if idx > 0:
-                stem = surface[:idx]
-        # Desiderative patterns (remove たい/たかった/たくない)
-        elif surface.endswith('たかった'):
-            stem = surface[:-4]
-        elif surface.endswith('たくない'):
-            stem = surface[:-4]
-        elif surface.endswith('たい'):
-            stem = surface[:-2]
-        # Polite patterns
-        elif surface.endswith('ませんでした'):
-            stem = surface[:-6]
-        elif surface.endswith('ません'):
-            stem = surface[:-3]
-        elif surface.endswith('ました'):
-            stem = surface[:-3]
-        elif surface.endswith('ます'):
-            stem = surface[:-2]
-        # Negative patterns
-        elif surface.endswith('なかった'):
-            stem = surface[:-4]
-        elif surface.endswith('ない'):
-            stem = surface[:-2]
-        # Progressive patterns
-        elif surface.endswith('ている'):
-            stem = surface[:-3]
-        elif surface.endswith('てる'):
-            stem = surface[:-2]
-        # Te-form
-        elif surface.endswith('て'):
-            stem = surface[:-1]
-        # Past
-        elif surface.endswith('た'):
-            stem = surface[:-1]
-        
-        if stem and not stem.endswith('る'):
-            base_form = stem + 'る'
-    
-    # Try to look up the actual base form we've reconstructed
-    # This is important for cases where the dictionary stores a conjugated form
-    if base_form != surface:
-        entries = lookup(base_form)
-        if entries:
-            actual_reading = get_kana_reading(entries[0].seq)
-            if actual_reading:
-                return base_form, actual_reading
-    
-    # Fall back to the stored base_reading if available
-    if base_reading:
-        # If base_reading is for a conjugated form (e.g., たべられる),
-        # and we've reconstructed a dictionary form (e.g., 食べる),
-        # try to derive the correct reading
-        if base_reading.endswith('られる') and base_form.endswith('る'):
-            # base_reading is potential/passive, derive dictionary form reading
-            dict_reading = base_reading[:-3] + 'る'  # たべられる -> たべる
-            return base_form, dict_reading
-        return base_form, base_reading
-    
-    return base_form, None
-
-
-def derive_surface_reading(surface: str, base_reading: Optional[str]) -> Optional[str]:
-    """
-    Derive the reading of the surface form from the base reading.
-    """
-    if not base_reading:
+def get_base_reading(token: Token, dictionary: Optional[Dictionary] = None) -> Optional[str]:
+    """Get the kana reading of a token's dictionary form."""
+    if not token.base_form_id:
         return None
-    
-    # Check patterns from longest to shortest
-    # These transformations show how the base reading changes
-    
-    # Special case: if base_reading already ends with られる (potential/passive form)
-    # and surface contains られ, we need to adjust
-    if base_reading.endswith('られる'):
-        base_stem = base_reading[:-3]  # Remove られる
-        
-        if surface.endswith('られなかった'):
-            return base_stem + 'られなかった'
-        if surface.endswith('られない'):
-            return base_stem + 'られない'
-        if surface.endswith('られた'):
-            return base_stem + 'られた'
-        if surface.endswith('られました'):
-            return base_stem + 'られました'
-        if surface.endswith('られません'):
-            return base_stem + 'られません'
-        if surface.endswith('られます'):
-            return base_stem + 'られます'
-        if surface.endswith('られる'):
-            return base_reading  # Already correct
-    
-    # Causative + polite patterns
-    if 'させません' in surface and base_reading.endswith('る'):
-        return base_reading[:-1] + 'させません'
-    if 'させました' in surface and base_reading.endswith('る'):
-        return base_reading[:-1] + 'させました'
-    if 'させます' in surface and base_reading.endswith('る'):
-        return base_reading[:-1] + 'させます'
-    if surface.endswith('させて') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'させて'
-    if surface.endswith('させる') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'させる'
-    
-    # Passive/potential patterns
-    if surface.endswith('られなかった') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'られなかった'
-    if surface.endswith('られない') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'られない'
-    if surface.endswith('られた') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'られた'
-    if surface.endswith('られる') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'られる'
-    
-    # Desiderative patterns
-    if surface.endswith('たかった') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'たかった'
-    if surface.endswith('たくない') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'たくない'
-    if surface.endswith('たい') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'たい'
-    
-    # Polite patterns
-    if surface.endswith('ませんでした') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'ませんでした'
-    if surface.endswith('ません') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'ません'
-    if surface.endswith('ました') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'ました'
-    if surface.endswith('ます') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'ます'
-    
-    # Negative patterns
-    if surface.endswith('なかった') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'なかった'
-    if surface.endswith('ない') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'ない'
-    
-    # Progressive patterns
-    if surface.endswith('ている') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'ている'
-    if surface.endswith('てる') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'てる'
-    
-    # Te-form
-    if surface.endswith('て') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'て'
-    
-    # Past
-    if surface.endswith('た') and base_reading.endswith('る'):
-        return base_reading[:-1] + 'た'
-    
-    return base_reading
+    if dictionary is None:
+        dictionary = get_default_dictionary()
+    return dictionary.get_kana_reading(token.base_form_id)
 
 
 def fix_contextual_reading(surface: str, reading: Optional[str], next_surface: Optional[str]) -> Optional[str]:
@@ -571,14 +409,13 @@ def format_default(tokens: List[Token]) -> str:
     return " | ".join(surfaces)
 
 
-def format_detailed(tokens: List[Token]) -> str:
+def format_detailed(tokens: List[Token], dictionary: Optional[Dictionary] = None) -> str:
     """
     Detailed output with conjugation breakdown.
     
     Compact vertical format showing all tokens with readings.
     """
-    load_dictionary()
-    
+
     lines = []
     
     # First, show the full split
@@ -589,16 +426,14 @@ def format_detailed(tokens: List[Token]) -> str:
     for i, t in enumerate(tokens):
         surface = t.surface
         pos = t.pos
-        base_seq = t.base_form_id
         
         # Get next token surface for context-based reading
         next_surface = tokens[i + 1].surface if i + 1 < len(tokens) else None
         
-        # Get base form and reading
-        base_form, base_reading = get_base_form_and_reading(surface, pos, base_seq)
-        
-        # Get surface reading
-        surface_reading = derive_surface_reading(surface, base_reading)
+        # Base form and readings are resolved by the tokenizer
+        base_form = t.base_form
+        base_reading = get_base_reading(t, dictionary)
+        surface_reading = t.reading
         
         # Fix contextual readings (e.g., 何 → なに/なん)
         surface_reading = fix_contextual_reading(surface, surface_reading, next_surface)
@@ -642,22 +477,20 @@ def format_detailed(tokens: List[Token]) -> str:
     return "\n".join(lines)
 
 
-def format_json(tokens: List[Token]) -> str:
+def format_json(tokens: List[Token], dictionary: Optional[Dictionary] = None) -> str:
     """Format tokens as JSON with full details."""
-    load_dictionary()
-    
+
     data = []
     for t in tokens:
-        base_form, base_reading = get_base_form_and_reading(t.surface, t.pos, t.base_form_id)
-        surface_reading = derive_surface_reading(t.surface, base_reading)
+        base_reading = get_base_reading(t, dictionary)
         layers = detect_conjugation_layers(t.surface, t.pos)
         
         data.append({
             "surface": t.surface,
-            "reading": surface_reading,
+            "reading": t.reading,
             "pos": t.pos,
             "pos_name": POS_NAMES.get(t.pos, t.pos),
-            "base_form": base_form,
+            "base_form": t.base_form,
             "base_reading": base_reading,
             "base_form_id": t.base_form_id,
             "start": t.start,
@@ -676,11 +509,184 @@ def format_simple(tokens: List[Token]) -> str:
     return "\n".join(lines)
 
 
+def stream_output(
+    source,
+    simple: bool = False,
+    dictionary: Optional[Dictionary] = None,
+    cache: Optional[DiskCache] = None,
+    out=None,
+) -> bool:
+    """
+    Tokenize a text stream and write default or simple output as it goes.
+    
+    The output is the same as formatting the whole token list at once, but
+    each sentence is written as soon as it is tokenized.
+    
+    Returns:
+        True if any tokens were written
+    """
+    out = out or sys.stdout
+    wrote = False
+    for t in tokenize_stream(source, dictionary, cache=cache):
+        if simple:
+            out.write(f"{t.surface}\t{t.base_form}\t{t.pos}\t{t.base_form_id}\n")
+        else:
+            out.write(f" | {t.surface}" if wrote else t.surface)
+        wrote = True
+        if t.surface in SENTENCE_TERMINATORS:
+            out.flush()
+    if wrote and not simple:
+        out.write("\n")
+    out.flush()
+    return wrote
+
+
+LINE_FORMATS = ("text", "tsv", "jsonl")
+
+
+def format_line(number: int, line: str, tokens: List[Token], fmt: str) -> str:
+    """
+    Format the tokens of one input line for ``--lines`` output.
+    
+    Formats:
+        text   Surfaces joined with " | ", one output line per input line
+        tsv    One row per token: line number, surface, reading, pos,
+               base form, base form id, start, end (no rows for a blank line)
+        jsonl  One {"line", "text", "tokens"} object per input line
+    
+    Returns:
+        The output for the line, including trailing newlines
+    """
+    if fmt == "jsonl":
+        record = {"line": number, "text": line, "tokens": [t.to_dict() for t in tokens]}
+        return json.dumps(record, ensure_ascii=False) + "\n"
+    if fmt == "tsv":
+        return "".join(
+            f"{number}\t{t.surface}\t{t.reading}\t{t.pos}\t{t.base_form}\t"
+            f"{t.base_form_id}\t{t.start}\t{t.end}\n"
+            for t in tokens
+        )
+    return format_default(tokens) + "\n"
+
+
+def _iter_line_tokens(
+    lines: Iterator[str],
+    workers: int,
+    dictionary: Optional[Dictionary],
+    cache: Optional[DiskCache],
+) -> Iterator[List[Token]]:
+    """Tokenize lines in order, in worker processes if ``workers`` > 1."""
+    if workers > 1:
+        from himotoki_split.parallel import TokenizerPool
+        
+        with TokenizerPool(workers, cache.dictionary if cache else dictionary) as pool:
+            yield from pool.imap(lines, cache=cache)
+        return
+    
+    for line in lines:
+        if not line.strip():
+            yield []
+        elif cache is not None:
+            yield cache.tokenize(line)
+        else:
+            yield tokenize(line, dictionary)
+
+
+def lines_output(
+    source,
+    out,
+    fmt: str = "text",
+    dictionary: Optional[Dictionary] = None,
+    cache: Optional[DiskCache] = None,
+    workers: int = 1,
+) -> None:
+    """
+    Tokenize each input line as its own text and write one record per line.
+    
+    Records are written in input order as soon as each line is tokenized.
+    Token offsets are relative to their line.
+    
+    Args:
+        source: Text file to read lines from
+        out: Text file to write to
+        fmt: "text", "tsv" or "jsonl" (see ``format_line``)
+        dictionary: Dictionary to use (default dictionary if None)
+        cache: DiskCache to reuse and fill
+        workers: Worker processes (1 tokenizes in this process)
+    """
+    lines, texts = tee(line.rstrip("\r\n") for line in source)
+    results = _iter_line_tokens(lines, workers, dictionary, cache)
+    for number, (line, tokens) in enumerate(zip(texts, results), 1):
+        out.write(format_line(number, line, tokens, fmt))
+        out.flush()
+
+
+def render(
+    text: str,
+    mode: str = "default",
+    dictionary: Optional[Dictionary] = None,
+    stream: bool = False,
+) -> str:
+    """
+    Produce the output ``main`` prints for a text.
+    
+    Used by the server to answer forwarded CLI invocations.
+    
+    Args:
+        text: Input text
+        mode: "default", "simple", "json" or "detail"
+        dictionary: Dictionary to use (default dictionary if None)
+        stream: Format sentence by sentence, as for stdin input
+            (default and simple modes only)
+    
+    Returns:
+        The output, including the trailing newline; empty if a stream
+        produced no tokens
+    """
+    if stream and mode in ("default", "simple"):
+        out = io.StringIO()
+        stream_output(io.StringIO(text), mode == "simple", dictionary, out=out)
+        return out.getvalue()
+    
+    tokens = tokenize(text, dictionary)
+    if mode == "json":
+        return format_json(tokens, dictionary) + "\n"
+    if mode == "simple":
+        return format_simple(tokens) + "\n"
+    if mode == "detail":
+        return format_detailed(tokens, dictionary) + "\n"
+    if mode == "default":
+        return format_default(tokens) + "\n"
+    raise ValueError(f"unknown output mode {mode!r}")
+
+
+def forward(client, text: str, mode: str, stream: bool) -> Optional[str]:
+    """
+    Render a text on a running server.
+    
+    Returns:
+        The output, or None if the server could not be reached
+    
+    Raises:
+        ValueError: If the server rejected the request
+    """
+    try:
+        result = client.request("/cli", {"text": text, "mode": mode, "stream": stream})
+    except OSError:
+        return None  # Stale socket or server gone; tokenize locally
+    return result["output"]
+
+
 # ============================================================================
 # Main
 # ============================================================================
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        from himotoki_split.server import main as serve_main
+        serve_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
         prog="himotoki-split",
         description="Lightweight Japanese Morphological Analyzer",
@@ -705,6 +711,50 @@ def main():
         action="store_true",
         help="Simple output format (surface, base, pos, id)",
     )
+    parser.add_argument(
+        "--lines", "-l",
+        action="store_true",
+        help="Tokenize each input line separately and write one record per line",
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=LINE_FORMATS,
+        help="Record format for --lines (default: jsonl with --json, "
+             "tsv with --simple, otherwise text)",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Worker processes for --lines (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--input", "-i",
+        metavar="PATH",
+        help="Read input from PATH instead of stdin",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        metavar="PATH",
+        help="Write output to PATH instead of stdout",
+    )
+    parser.add_argument(
+        "--dictionary",
+        metavar="PATH",
+        help="Path to a himotoki.dic build to use instead of the bundled one",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="Reuse tokenizations stored in DIR (created if missing); "
+             "results are invalidated when the dictionary or library changes",
+    )
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="Tokenize in this process even if a server is running",
+    )
     parser.add_argument(
         "--version", "-v",
         action="version",
@@ -713,6 +763,99 @@ def main():
     
     args = parser.parse_args()
     
+    if not args.lines:
+        for option, given in (("--format", args.format), ("--workers", args.workers != 1)):
+            if given:
+                parser.error(f"{option} requires --lines")
+    elif args.detail:
+        parser.error("--detail cannot be used with --lines")
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    if args.text is not None and args.input:
+        parser.error("give either a text argument or --input, not both")
+    
+    if args.input:
+        try:
+            sys.stdin = open(args.input, encoding="utf-8")
+        except OSError as e:
+            parser.error(str(e))
+    if args.output:
+        try:
+            sys.stdout = open(args.output, "w", encoding="utf-8")
+        except OSError as e:
+            parser.error(str(e))
+    
+    mode = ("json" if args.json else "simple" if args.simple
+            else "detail" if args.detail else "default")
+    
+    if args.lines:
+        fmt = args.format or {"json": "jsonl", "simple": "tsv"}.get(mode, "text")
+        source = io.StringIO(args.text) if args.text is not None else sys.stdin
+        dictionary = Dictionary(args.dictionary) if args.dictionary else None
+        cache = DiskCache(args.cache, dictionary) if args.cache else None
+        try:
+            lines_output(
+                source, sys.stdout, fmt, dictionary, cache,
+                workers=args.workers or os.cpu_count() or 1,
+            )
+        except BrokenPipeError:
+            # Downstream closed early (e.g. `| head`); stop quietly
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if cache is not None:
+                cache.close()
+        return
+    
+    # Forward to a running server unless this run needs its own
+    # dictionary or cache
+    client = None
+    if not (args.no_server or args.dictionary or args.cache):
+        from himotoki_split.server import find_server
+        client = find_server()
+    
+    if client is not None:
+        stream = args.text is None and mode in ("default", "simple")
+        text = sys.stdin.read() if args.text is None else args.text
+        if args.text is None and not stream:
+            text = text.strip()
+        if text.strip():
+            try:
+                output = forward(client, text, mode, stream)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+            if output:
+                sys.stdout.write(output)
+                return
+            if output is not None:
+                parser.print_help()
+                sys.exit(1)
+        # Server unreachable: continue locally with the input already read
+        if args.text is None:
+            sys.stdin = io.StringIO(text)
+    
+    dictionary = Dictionary(args.dictionary) if args.dictionary else None
+    cache = DiskCache(args.cache, dictionary) if args.cache else None
+    
+    if args.text is None and not (args.json or args.detail):
+        # Stream stdin sentence by sentence; JSON and detail output need
+        # the whole token list, so they read it all below
+        try:
+            if not stream_output(sys.stdin, args.simple, dictionary, cache):
+                parser.print_help()
+                sys.exit(1)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if cache is not None:
+                cache.close()
+        return
+    
     if args.text is None:
         # Read from stdin
         text = sys.stdin.read().strip()
@@ -724,14 +867,18 @@ def main():
         sys.exit(1)
     
     try:
-        tokens = tokenize(text)
+        if cache is not None:
+            tokens = cache.tokenize(text)
+            cache.close()
+        else:
+            tokens = tokenize(text, dictionary)
         
         if args.json:
-            print(format_json(tokens))
+            print(format_json(tokens, dictionary))
         elif args.simple:
             print(format_simple(tokens))
         elif args.detail:
-            print(format_detailed(tokens))
+            print(format_detailed(tokens, dictionary))
         else:
             # Default: simple splitting output
             print(format_default(tokens))
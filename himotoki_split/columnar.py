@@ -0,0 +1,272 @@
+"""
+Columnar token output for himotoki-split.
+
+A Token is a dataclass with seven fields, three of them strings that are
+usually copies of (or derived from) the surface. For millions of
+sentences that is a lot of heap objects when a feature extractor only
+needs ids and spans. A TokenBatch stores the tokens of many texts as
+struct-of-arrays instead:
+
+    starts, ends     array('i') offsets into each token's source text
+    base_form_ids    array('i') JMdict sequence ids
+    pos_ids          array('i') POS ids (see dictionary.POS_ID_MAP)
+    row_splits       array('i'); the tokens of text k are the rows
+                     row_splits[k]:row_splits[k + 1]
+
+Surfaces are sliced from the source text on demand. Readings and base
+forms are only stored for rows where they differ from the surface, and
+not at all with ``strings=False``.
+
+Usage:
+    batch = tokenize_columnar(sentences, strings=False)
+    columns = batch.to_numpy()        # zero-copy views, needs numpy
+    record_batch = batch.to_arrow()   # zero-copy buffers, needs pyarrow
+"""
+
+import unicodedata
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Union
+
+from himotoki_split.dictionary import get_pos_id, get_pos_name
+
+if TYPE_CHECKING:
+    from himotoki_split import Token
+    from himotoki_split.dictionary import Dictionary
+
+# Integer columns, in to_numpy()/to_arrow() order
+COLUMNS = ('text_index', 'start', 'end', 'base_form_id', 'pos_id')
+
+
+class TokenBatch:
+    """
+    Tokens of a sequence of texts, stored column-wise.
+
+    Args:
+        strings: Keep readings and base forms (otherwise only surfaces,
+            which are slices of the text, can be materialized)
+    """
+
+    def __init__(self, strings: bool = True):
+        self.strings = strings
+        self.texts: List[str] = []
+        self.row_splits = array('i', [0])
+        self.starts = array('i')
+        self.ends = array('i')
+        self.base_form_ids = array('i')
+        self.pos_ids = array('i')
+        # Per-row values that cannot be derived from the columns
+        self._surfaces: Dict[int, str] = {}
+        self._readings: Dict[int, str] = {}
+        self._base_forms: Dict[int, str] = {}
+        self._pos: Dict[int, str] = {}
+        self._text_index: Optional[array] = None
+
+    @classmethod
+    def from_tokens(
+        cls,
+        texts: Iterable[str],
+        token_lists: Iterable[Sequence['Token']],
+        strings: bool = True,
+    ) -> 'TokenBatch':
+        """
+        Build a batch from already tokenized texts.
+
+        Args:
+            texts: Source texts; token offsets must refer to them
+            token_lists: Tokens of each text, e.g. from ``tokenize_batch``
+            strings: Keep readings and base forms
+
+        Example:
+            >>> batch = TokenBatch.from_tokens(texts, tokenize_batch(texts, workers=8))
+        """
+        batch = cls(strings)
+        for text, tokens in zip(texts, token_lists):
+            batch.append(text, tokens)
+        return batch
+
+    def append(self, text: str, tokens: Sequence['Token']) -> None:
+        """Add a text and its tokens as the next row group."""
+        row = len(self.starts)
+        self.texts.append(text)
+        for token in tokens:
+            self.starts.append(token.start)
+            self.ends.append(token.end)
+            self.base_form_ids.append(token.base_form_id)
+            pos_id = get_pos_id(token.pos)
+            self.pos_ids.append(pos_id)
+
+            surface = token.surface
+            if text[token.start:token.end] != surface:
+                self._surfaces[row] = surface
+            if get_pos_name(pos_id) != token.pos:
+                self._pos[row] = token.pos
+            if self.strings:
+                if token.reading != surface:
+                    self._readings[row] = token.reading
+                if token.base_form != surface:
+                    self._base_forms[row] = token.base_form
+            row += 1
+        self.row_splits.append(row)
+        self._text_index = None
+
+    def __len__(self) -> int:
+        """Number of tokens."""
+        return len(self.starts)
+
+    @property
+    def num_texts(self) -> int:
+        return len(self.texts)
+
+    @property
+    def text_index(self) -> array:
+        """array('i') giving the index of each token's source text."""
+        if self._text_index is None:
+            index = array('i')
+            splits = self.row_splits
+            for k in range(len(splits) - 1):
+                index.extend([k] * (splits[k + 1] - splits[k]))
+            self._text_index = index
+        return self._text_index
+
+    # ------------------------------------------------------------------
+    # Per-row strings
+    # ------------------------------------------------------------------
+
+    def surface(self, row: int) -> str:
+        surface = self._surfaces.get(row)
+        if surface is None:
+            surface = self.texts[self.text_index[row]][self.starts[row]:self.ends[row]]
+        return surface
+
+    def reading(self, row: int) -> str:
+        self._require_strings()
+        reading = self._readings.get(row)
+        return reading if reading is not None else self.surface(row)
+
+    def base_form(self, row: int) -> str:
+        self._require_strings()
+        base_form = self._base_forms.get(row)
+        return base_form if base_form is not None else self.surface(row)
+
+    def pos(self, row: int) -> str:
+        pos = self._pos.get(row)
+        return pos if pos is not None else get_pos_name(self.pos_ids[row])
+
+    def _require_strings(self) -> None:
+        if not self.strings:
+            raise ValueError("readings and base forms were not kept (strings=False)")
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+
+    def tokens(self, k: int) -> List['Token']:
+        """Materialize the Token objects of text ``k``."""
+        from himotoki_split import Token
+
+        self._require_strings()
+        return [
+            Token(
+                surface=self.surface(row),
+                reading=self.reading(row),
+                pos=self.pos(row),
+                base_form=self.base_form(row),
+                base_form_id=self.base_form_ids[row],
+                start=self.starts[row],
+                end=self.ends[row],
+            )
+            for row in range(self.row_splits[k], self.row_splits[k + 1])
+        ]
+
+    def to_tokens(self) -> List[List['Token']]:
+        """Materialize Token lists for every text."""
+        return [self.tokens(k) for k in range(self.num_texts)]
+
+    def _columns(self) -> List[array]:
+        return [self.text_index, self.starts, self.ends, self.base_form_ids, self.pos_ids]
+
+    def to_numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """
+        Get the integer columns as int32 NumPy arrays.
+
+        The arrays share memory with the batch; appending to the batch
+        afterwards invalidates them.
+
+        Returns:
+            Dict mapping each name in COLUMNS (plus ``row_splits``) to an array
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("to_numpy() requires numpy: pip install himotoki-split[numpy]")
+
+        columns = {
+            name: np.frombuffer(column, dtype=np.int32)
+            for name, column in zip(COLUMNS, self._columns())
+        }
+        columns['row_splits'] = np.frombuffer(self.row_splits, dtype=np.int32)
+        return columns
+
+    def to_arrow(self, surfaces: bool = False) -> 'pyarrow.RecordBatch':
+        """
+        Get the tokens as an Arrow RecordBatch, one row per token.
+
+        The integer columns wrap the batch's buffers without copying.
+
+        Args:
+            surfaces: Also include a ``surface`` string column (copied)
+
+        Returns:
+            RecordBatch with the COLUMNS fields
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("to_arrow() requires pyarrow: pip install himotoki-split[arrow]")
+
+        arrays = [
+            pa.Array.from_buffers(pa.int32(), len(column), [None, pa.py_buffer(column)])
+            for column in self._columns()
+        ]
+        names = list(COLUMNS)
+        if surfaces:
+            arrays.append(pa.array([self.surface(row) for row in range(len(self))], pa.string()))
+            names.append('surface')
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def tokenize_columnar(
+    texts: Union[str, Iterable[str]],
+    dictionary: Optional['Dictionary'] = None,
+    strings: bool = True,
+) -> TokenBatch:
+    """
+    Tokenize texts into a columnar TokenBatch.
+
+    Texts are NFC-normalized as by ``tokenize``; ``batch.texts`` holds the
+    normalized texts the offsets refer to. Blank texts get no tokens.
+
+    Args:
+        texts: A text or an iterable of texts
+        dictionary: Dictionary to use (default dictionary if None)
+        strings: Keep readings and base forms
+
+    Returns:
+        TokenBatch with one row group per text
+
+    Raises:
+        TextTooLongError: If a text is longer than the configured
+            ``max_text_length`` (see ``configure_limits``)
+    """
+    from himotoki_split import _check_length
+    from himotoki_split.tokenizer import tokenize_text
+
+    if isinstance(texts, str):
+        texts = [texts]
+
+    batch = TokenBatch(strings)
+    for text in texts:
+        _check_length(text)
+        text = unicodedata.normalize('NFC', text)
+        batch.append(text, tokenize_text(text, dictionary) if text.strip() else [])
+    return batch
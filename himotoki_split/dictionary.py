@@ -10,13 +10,19 @@ The dictionary is stored as a marisa_trie.RecordTrie for efficient prefix
 matching and memory-mapped access.
 """
 
+import hashlib
 import struct
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Tuple
 
 import marisa_trie
 
+from himotoki_split.instrumentation import count_event
+from himotoki_split.string_store import StringStore
+
 # ============================================================================
 # Binary Record Schema
 # ============================================================================
@@ -26,19 +32,37 @@ import marisa_trie
 #   - pos_id: uint8 (1 byte) - Part of speech ID
 #   - conj_type: uint8 (1 byte) - Conjugation type (0 = root form)
 #   - base_seq: int32 (4 bytes) - Base form sequence ID (0 if root)
+#   - score: int32 (4 bytes) - Static segment score, fixed-point (x SCORE_SCALE)
+#
+# Total: 16 bytes per entry
+# Format string: little-endian int32, int16, uint8, uint8, int32, int32
 #
-# Total: 12 bytes per entry
-# Format string: little-endian int32, int16, uint8, uint8, int32
+# Dictionaries built before the score column was added use the 12-byte
+# LEGACY_RECORD_FORMAT; their scores are computed at runtime instead.
+
+RECORD_FORMAT = "<ihBBIi"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)  # Should be 16
+
+LEGACY_RECORD_FORMAT = "<ihBBI"
+LEGACY_RECORD_SIZE = struct.calcsize(LEGACY_RECORD_FORMAT)  # Should be 12
 
-RECORD_FORMAT = "<ihBBI"
-RECORD_SIZE = struct.calcsize(RECORD_FORMAT)  # Should be 12
+# Fixed-point scale for stored scores
+SCORE_SCALE = 100
 
 
-@dataclass(slots=True)
+def encode_score(score: float) -> int:
+    """Convert a segment score to its stored fixed-point value."""
+    return int(round(score * SCORE_SCALE))
+
+
+@dataclass(slots=True, frozen=True)
 class WordEntry:
     """
     A word entry from the binary dictionary.
     
+    Entries are immutable so that decoded records can be shared through
+    the lookup cache.
+    
     Attributes:
         surface: The surface form (text as it appears)
         seq: JMdict sequence ID
@@ -46,6 +70,8 @@ class WordEntry:
         pos_id: Part of speech ID (see POS_ID_MAP)
         conj_type: Conjugation type (0 = dictionary form)
         base_seq: Base form sequence ID (same as seq if dictionary form)
+        score: Static segment score precomputed at build time, or None for
+            dictionaries in the legacy record format
     """
     surface: str
     seq: int
@@ -53,6 +79,7 @@ class WordEntry:
     pos_id: int
     conj_type: int
     base_seq: int
+    score: Optional[float] = None
     
     @property
     def is_root(self) -> bool:
@@ -82,6 +109,8 @@ POS_ID_MAP = {
     'aux': 60, 'aux-v': 61, 'aux-adj': 62,
     'conj': 70, 'cop': 71, 'ctr': 72, 'exp': 73, 'int': 74,
     'pn': 80, 'pref': 81, 'prt': 82, 'suf': 83, 'unc': 84,
+    # Assigned at runtime to punctuation tokens, never stored in entries
+    'punc': 90,
 }
 
 # Reverse mapping for lookup
@@ -99,13 +128,10 @@ def get_pos_name(pos_id: int) -> str:
 
 
 # ============================================================================
-# Dictionary Loading
+# Dictionary Paths
 # ============================================================================
 
-# Module-level singleton
-_DICTIONARY: Optional[marisa_trie.RecordTrie] = None
-_BASE_FORMS: Optional[dict] = None  # seq -> base_form text
-_KANA_READINGS: Optional[dict] = None  # seq -> kana reading
+DEFAULT_LOOKUP_CACHE_SIZE = 8192
 
 
 def get_dictionary_path() -> Path:
@@ -123,184 +149,502 @@ def get_kana_readings_path() -> Path:
     return Path(__file__).parent / "data" / "kana_readings.bin"
 
 
-def is_dictionary_loaded() -> bool:
-    """Check if dictionary is loaded."""
-    return _DICTIONARY is not None
+def _side_store_path(dic_path: Path, name: str, default: Path) -> Path:
+    """Prefer a side store next to the dictionary file, else the default."""
+    sibling = dic_path.parent / name
+    return sibling if sibling.exists() else default
+
+
+def _detect_record_format(path: Path) -> str:
+    """Get the record format of a dictionary file from its record size."""
+    raw = marisa_trie.BytesTrie()
+    raw.mmap(str(path))
+    for _, value in raw.iteritems():
+        if len(value) == LEGACY_RECORD_SIZE:
+            return LEGACY_RECORD_FORMAT
+        break
+    return RECORD_FORMAT
+
+
+def _decode_records(surface: str, records) -> Tuple[WordEntry, ...]:
+    """Decode raw trie records for a surface form into WordEntry objects."""
+    return tuple(
+        WordEntry(
+            surface=surface,
+            seq=record[0],
+            cost=record[1],
+            pos_id=record[2],
+            conj_type=record[3],
+            base_seq=record[4],
+            score=record[5] / SCORE_SCALE if len(record) > 5 else None,
+        )
+        for record in records
+    )
 
 
-def load_dictionary(path: Optional[Path] = None) -> marisa_trie.RecordTrie:
+def _open_store(path: Path) -> StringStore:
+    """Open a string store, or an empty one if the file doesn't exist."""
+    if not path.exists():
+        return StringStore.empty()
+    return StringStore.open(path)
+
+
+# ============================================================================
+# Dictionary Handle
+# ============================================================================
+
+class Dictionary:
     """
-    Load the binary dictionary.
+    Handle on one dictionary build: the record trie and its side stores.
     
-    The dictionary is memory-mapped for instant loading and low memory usage.
+    The trie is opened lazily on first use (or explicitly with ``open``)
+    and the base form / kana reading stores on first access. Opening is
+    thread-safe. Each handle has its own lookup cache, so two builds can
+    be used side by side in one process.
+    
+    Example:
+        >>> with Dictionary(Path("build/himotoki.dic")) as dic:
+        ...     tokens = tokenize_text("食べました", dictionary=dic)
     
     Args:
-        path: Path to the .dic file. Uses default if not specified.
+        path: Path to the .dic file. Uses the packaged dictionary if not
+            specified.
+        base_forms_path: Path to base_forms.bin. Defaults to the file next
+            to the dictionary, or the packaged one.
+        kana_readings_path: Path to kana_readings.bin, resolved the same way.
+        cache_size: Lookup cache size (0 disables, None is unbounded)
+    """
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        base_forms_path: Optional[Path] = None,
+        kana_readings_path: Optional[Path] = None,
+        cache_size: Optional[int] = DEFAULT_LOOKUP_CACHE_SIZE,
+    ):
+        self.path = Path(path) if path is not None else get_dictionary_path()
+        if base_forms_path is None:
+            base_forms_path = _side_store_path(
+                self.path, "base_forms.bin", get_base_forms_path()
+            )
+        if kana_readings_path is None:
+            kana_readings_path = _side_store_path(
+                self.path, "kana_readings.bin", get_kana_readings_path()
+            )
+        self.base_forms_path = Path(base_forms_path)
+        self.kana_readings_path = Path(kana_readings_path)
         
-    Returns:
-        The loaded RecordTrie
+        self._lock = threading.RLock()
+        self._trie: Optional[marisa_trie.RecordTrie] = None
+        self._base_forms: Optional[StringStore] = None
+        self._kana_readings: Optional[StringStore] = None
+        self._build_hash: Optional[str] = None
+        self._cached_lookup = lru_cache(maxsize=cache_size)(self._lookup_uncached)
+    
+    def __repr__(self) -> str:
+        state = "open" if self.is_open else "closed"
+        return f"Dictionary({str(self.path)!r}, {state})"
+    
+    def __enter__(self) -> 'Dictionary':
+        return self.open()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    
+    @property
+    def is_open(self) -> bool:
+        """True if the trie has been loaded."""
+        return self._trie is not None
+    
+    def open(self) -> 'Dictionary':
+        """
+        Memory-map the dictionary trie. Does nothing if already open.
         
-    Raises:
-        FileNotFoundError: If dictionary file doesn't exist
-    """
-    global _DICTIONARY
+        Returns:
+            This handle, for chaining
+        
+        Raises:
+            FileNotFoundError: If dictionary file doesn't exist
+        """
+        if self._trie is not None:
+            return self
+        with self._lock:
+            if self._trie is None:
+                if not self.path.exists():
+                    raise FileNotFoundError(
+                        f"Dictionary not found at {self.path}. "
+                        "Run 'python -m himotoki_split.build' to build it."
+                    )
+                trie = marisa_trie.RecordTrie(_detect_record_format(self.path))
+                trie.mmap(str(self.path))
+                self._trie = trie
+        return self
+    
+    def close(self) -> None:
+        """
+        Release the trie, the side stores and the lookup cache.
+        
+        A closed handle reopens lazily on next use. Make sure no other
+        thread is still reading from it when closing; to replace a shared
+        dictionary, swap in the new one first (``set_default_dictionary``)
+        and close the old one once in-flight work has finished.
+        """
+        with self._lock:
+            for store in (self._base_forms, self._kana_readings):
+                if store is not None:
+                    store.close()
+            self._trie = None
+            self._base_forms = None
+            self._kana_readings = None
+            self._build_hash = None
+            self._cached_lookup.cache_clear()
     
-    if _DICTIONARY is not None:
-        return _DICTIONARY
+    @property
+    def trie(self) -> marisa_trie.RecordTrie:
+        """The underlying RecordTrie, opening it if needed."""
+        trie = self._trie
+        if trie is None:
+            trie = self.open()._trie
+        return trie
     
-    if path is None:
-        path = get_dictionary_path()
+    @property
+    def base_forms(self) -> StringStore:
+        """The seq -> base form store, opening it if needed."""
+        store = self._base_forms
+        if store is None:
+            with self._lock:
+                if self._base_forms is None:
+                    self._base_forms = _open_store(self.base_forms_path)
+                store = self._base_forms
+        return store
     
-    if not path.exists():
-        raise FileNotFoundError(
-            f"Dictionary not found at {path}. "
-            "Run 'python -m himotoki_split.build' to build it."
-        )
+    @property
+    def kana_readings(self) -> StringStore:
+        """The seq -> kana reading store, opening it if needed."""
+        store = self._kana_readings
+        if store is None:
+            with self._lock:
+                if self._kana_readings is None:
+                    self._kana_readings = _open_store(self.kana_readings_path)
+                store = self._kana_readings
+        return store
     
-    _DICTIONARY = marisa_trie.RecordTrie(RECORD_FORMAT)
-    _DICTIONARY.mmap(str(path))
+    @property
+    def build_hash(self) -> str:
+        """
+        Content hash of the dictionary and its side stores.
+        
+        Identifies the build, e.g. to invalidate cached tokenizations when
+        the dictionary is rebuilt. Computed on first access (reading the
+        files once) and kept until the handle is closed.
+        """
+        build_hash = self._build_hash
+        if build_hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for label, path in (
+                (b'dic', self.path),
+                (b'base_forms', self.base_forms_path),
+                (b'kana_readings', self.kana_readings_path),
+            ):
+                digest.update(label)
+                if path.exists():
+                    with open(path, 'rb') as f:
+                        for block in iter(lambda: f.read(1 << 20), b''):
+                            digest.update(block)
+            build_hash = self._build_hash = digest.hexdigest()
+        return build_hash
+    
+    # ------------------------------------------------------------------
+    # Lookup cache
+    # ------------------------------------------------------------------
+    # Decoded records are cached per surface form, so frequent particles
+    # and auxiliaries are decoded once instead of on every lookup.
+    # Lookups and misses are also counted into the calling tokenize call's
+    # stats; the cache's own counters are shared by every caller.
+    
+    def _lookup_uncached(self, surface: str) -> Tuple[WordEntry, ...]:
+        """Decode the records for a surface form straight from the trie."""
+        count_event('lookup_cache_misses')
+        try:
+            return _decode_records(surface, self.trie.get(surface, []))
+        except KeyError:
+            return ()
+    
+    def configure_cache(self, maxsize: Optional[int] = DEFAULT_LOOKUP_CACHE_SIZE) -> None:
+        """
+        Resize the lookup cache, discarding its current contents.
+        
+        Args:
+            maxsize: Maximum number of surface forms to keep. 0 disables
+                caching; None makes the cache unbounded.
+        """
+        self._cached_lookup = lru_cache(maxsize=maxsize)(self._lookup_uncached)
+    
+    def cache_info(self):
+        """
+        Get lookup cache statistics.
+        
+        Returns:
+            A ``functools`` CacheInfo tuple of (hits, misses, maxsize, currsize)
+        """
+        return self._cached_lookup.cache_info()
+    
+    def clear_cache(self) -> None:
+        """Drop all cached lookups and reset the hit/miss counters."""
+        self._cached_lookup.cache_clear()
+    
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    
+    def lookup(self, surface: str) -> Tuple[WordEntry, ...]:
+        """
+        Look up a surface form in the dictionary.
+        
+        Results come from a bounded LRU cache and are shared between
+        callers, so they are returned as an immutable tuple.
+        
+        Args:
+            surface: The text to look up
+            
+        Returns:
+            Tuple of matching WordEntry objects
+        """
+        count_event('dictionary_lookups')
+        return self._cached_lookup(surface)
+    
+    def lookup_prefixes(self, text: str) -> List[Tuple[str, Tuple[WordEntry, ...]]]:
+        """
+        Find every dictionary word that is a prefix of the given text.
+        
+        This runs a single common-prefix search over the trie, so the cost
+        is one traversal of ``text`` rather than one lookup per candidate
+        length. Callers that want to bound the word length should slice
+        ``text`` before calling.
+        
+        Args:
+            text: The text to match from its first character
+            
+        Returns:
+            List of (surface, entries) tuples, shortest surface first
+        """
+        cached_lookup = self._cached_lookup
+        matches = [
+            (surface, cached_lookup(surface))
+            for surface in self.trie.prefixes(text)
+        ]
+        count_event('dictionary_lookups', len(matches))
+        return matches
+    
+    def lookup_prefix(self, prefix: str) -> List[Tuple[str, WordEntry]]:
+        """
+        Look up all words starting with a prefix.
+        
+        Args:
+            prefix: The prefix to search for
+            
+        Returns:
+            List of (surface, WordEntry) tuples
+        """
+        results = []
+        
+        # items() yields one (surface, record) pair per record
+        for surface, record in self.trie.items(prefix):
+            results.extend((surface, entry) for entry in _decode_records(surface, [record]))
+        
+        return results
+    
+    def contains(self, surface: str) -> bool:
+        """Check if a surface form exists in the dictionary."""
+        return surface in self.trie
+    
+    def has_prefix(self, prefix: str) -> bool:
+        """Check if any word starts with the given prefix."""
+        try:
+            next(iter(self.trie.iterkeys(prefix)))
+            return True
+        except StopIteration:
+            return False
+    
+    def size(self) -> int:
+        """Get the number of entries in the dictionary (0 if not open)."""
+        trie = self._trie
+        return len(trie) if trie is not None else 0
     
-    return _DICTIONARY
+    def get_kana_reading(self, seq: int) -> Optional[str]:
+        """Get kana reading for a seq number."""
+        return self.kana_readings.get(seq)
+    
+    def get_base_form(self, seq: int) -> Optional[str]:
+        """Get the base form text for a seq number."""
+        return self.base_forms.get(seq)
+
 
+# ============================================================================
+# Default Dictionary
+# ============================================================================
+# The module-level functions below operate on a process-wide default
+# handle, created on first use.
 
-def lookup(surface: str) -> List[WordEntry]:
+_DEFAULT: Optional[Dictionary] = None
+_DEFAULT_LOCK = threading.Lock()
+_DEFAULT_CACHE_SIZE: Optional[int] = DEFAULT_LOOKUP_CACHE_SIZE
+
+
+def get_default_dictionary(path: Optional[Path] = None) -> Dictionary:
     """
-    Look up a surface form in the dictionary.
+    Get the process-wide default dictionary, creating it if needed.
     
     Args:
-        surface: The text to look up
-        
+        path: Dictionary path used if the default has to be created.
+            Ignored if a default already exists.
+    
     Returns:
-        List of matching WordEntry objects
+        The default Dictionary (not necessarily open yet)
     """
-    global _DICTIONARY
-    
-    if _DICTIONARY is None:
-        load_dictionary()
+    dictionary = _DEFAULT
+    if dictionary is not None:
+        return dictionary
+    return _create_default(path)
+
+
+def _create_default(path: Optional[Path]) -> Dictionary:
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = Dictionary(path, cache_size=_DEFAULT_CACHE_SIZE)
+        return _DEFAULT
+
+
+def set_default_dictionary(dictionary: Optional[Dictionary]) -> Optional[Dictionary]:
+    """
+    Replace the process-wide default dictionary.
     
-    results = []
+    The previous default is returned without being closed, so requests
+    still using it can finish; close it afterwards to release it.
     
-    try:
-        records = _DICTIONARY.get(surface, [])
-        for record in records:
-            seq, cost, pos_id, conj_type, base_seq = record
-            results.append(WordEntry(
-                surface=surface,
-                seq=seq,
-                cost=cost,
-                pos_id=pos_id,
-                conj_type=conj_type,
-                base_seq=base_seq,
-            ))
-    except KeyError:
-        pass
+    Args:
+        dictionary: The new default, or None to reset to lazy creation
     
-    return results
+    Returns:
+        The previous default, if any
+    """
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        previous = _DEFAULT
+        _DEFAULT = dictionary
+    return previous
 
 
-def lookup_prefix(prefix: str) -> List[Tuple[str, WordEntry]]:
+def is_dictionary_loaded() -> bool:
+    """Check if dictionary is loaded."""
+    dictionary = _DEFAULT
+    return dictionary is not None and dictionary.is_open
+
+
+def load_dictionary(path: Optional[Path] = None) -> marisa_trie.RecordTrie:
     """
-    Look up all words starting with a prefix.
+    Load the binary dictionary.
+    
+    The dictionary is memory-mapped for instant loading and low memory usage.
     
     Args:
-        prefix: The prefix to search for
+        path: Path to the .dic file. Uses default if not specified.
         
     Returns:
-        List of (surface, WordEntry) tuples
+        The loaded RecordTrie
+        
+    Raises:
+        FileNotFoundError: If dictionary file doesn't exist
     """
-    global _DICTIONARY
-    
-    if _DICTIONARY is None:
-        load_dictionary()
-    
-    results = []
+    return get_default_dictionary(path).trie
+
+
+def configure_lookup_cache(maxsize: Optional[int] = DEFAULT_LOOKUP_CACHE_SIZE) -> None:
+    """
+    Resize the default dictionary's lookup cache, discarding its contents.
     
-    for surface, records in _DICTIONARY.items(prefix):
-        for record in records:
-            seq, cost, pos_id, conj_type, base_seq = record
-            results.append((surface, WordEntry(
-                surface=surface,
-                seq=seq,
-                cost=cost,
-                pos_id=pos_id,
-                conj_type=conj_type,
-                base_seq=base_seq,
-            )))
+    Args:
+        maxsize: Maximum number of surface forms to keep. 0 disables
+            caching; None makes the cache unbounded.
+    """
+    global _DEFAULT_CACHE_SIZE
+    _DEFAULT_CACHE_SIZE = maxsize
+    get_default_dictionary().configure_cache(maxsize)
+
+
+def lookup_cache_info():
+    """
+    Get the default dictionary's lookup cache statistics.
     
-    return results
+    Returns:
+        A ``functools`` CacheInfo tuple of (hits, misses, maxsize, currsize)
+    """
+    return get_default_dictionary().cache_info()
+
+
+def clear_lookup_cache() -> None:
+    """Drop all cached lookups and reset the hit/miss counters."""
+    get_default_dictionary().clear_cache()
+
+
+def lookup(surface: str) -> Tuple[WordEntry, ...]:
+    """Look up a surface form in the default dictionary."""
+    return get_default_dictionary().lookup(surface)
+
+
+def lookup_prefixes(text: str) -> List[Tuple[str, Tuple[WordEntry, ...]]]:
+    """Find every default-dictionary word that is a prefix of the text."""
+    return get_default_dictionary().lookup_prefixes(text)
+
+
+def lookup_prefix(prefix: str) -> List[Tuple[str, WordEntry]]:
+    """Look up all default-dictionary words starting with a prefix."""
+    return get_default_dictionary().lookup_prefix(prefix)
 
 
 def contains(surface: str) -> bool:
     """Check if a surface form exists in the dictionary."""
-    global _DICTIONARY
-    
-    if _DICTIONARY is None:
-        load_dictionary()
-    
-    return surface in _DICTIONARY
+    return get_default_dictionary().contains(surface)
 
 
 def has_prefix(prefix: str) -> bool:
     """Check if any word starts with the given prefix."""
-    global _DICTIONARY
-    
-    if _DICTIONARY is None:
-        load_dictionary()
-    
-    try:
-        next(iter(_DICTIONARY.iterkeys(prefix)))
-        return True
-    except StopIteration:
-        return False
+    return get_default_dictionary().has_prefix(prefix)
 
 
 def get_dictionary_size() -> int:
     """Get the number of entries in the dictionary."""
-    global _DICTIONARY
-    
-    if _DICTIONARY is None:
-        return 0
-    
-    return len(_DICTIONARY)
+    dictionary = _DEFAULT
+    return dictionary.size() if dictionary is not None else 0
 
 
-def load_kana_readings() -> dict:
-    """Load kana readings from binary file."""
-    global _KANA_READINGS
-    
-    if _KANA_READINGS is not None:
-        return _KANA_READINGS
-    
-    path = get_kana_readings_path()
-    if not path.exists():
-        _KANA_READINGS = {}
-        return _KANA_READINGS
-    
-    _KANA_READINGS = {}
-    with open(path, 'rb') as f:
-        count = struct.unpack('<I', f.read(4))[0]
-        for _ in range(count):
-            seq = struct.unpack('<I', f.read(4))[0]
-            text_len = struct.unpack('<H', f.read(2))[0]
-            text = f.read(text_len).decode('utf-8')
-            _KANA_READINGS[seq] = text
-    
-    return _KANA_READINGS
+def load_kana_readings() -> StringStore:
+    """Load the memory-mapped kana readings store."""
+    return get_default_dictionary().kana_readings
 
 
 def get_kana_reading(seq: int) -> Optional[str]:
     """Get kana reading for a seq number."""
-    global _KANA_READINGS
-    
-    if _KANA_READINGS is None:
-        load_kana_readings()
-    
-    return _KANA_READINGS.get(seq)
+    return get_default_dictionary().get_kana_reading(seq)
+
+
+def load_base_forms() -> StringStore:
+    """Load the memory-mapped base forms store."""
+    return get_default_dictionary().base_forms
+
+
+def get_base_form(seq: int) -> Optional[str]:
+    """Get the base form text for a seq number."""
+    return get_default_dictionary().get_base_form(seq)
 
 
 def unload_dictionary():
-    """Unload the dictionary to free memory."""
-    global _DICTIONARY, _BASE_FORMS, _KANA_READINGS
-    _DICTIONARY = None
-    _BASE_FORMS = None
-    _KANA_READINGS = None
+    """Unload the default dictionary to free memory."""
+    previous = set_default_dictionary(None)
+    if previous is not None:
+        previous.close()
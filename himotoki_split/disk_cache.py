@@ -0,0 +1,403 @@
+"""
+Persistent tokenization cache for himotoki-split.
+
+Re-tokenizing an archived corpus gives the same tokens as last time
+unless the dictionary or the tokenizer itself changed. This module keeps
+tokenizations in a local cache directory so batch and CLI runs can reuse
+them:
+
+    tokens.log   Append-only records: 16-byte key, uint32 payload length,
+                 then the tokens as UTF-8 JSON
+    tokens.idx   Memory-mapped open-addressing hash table from key to
+                 record offset
+
+Keys are a keyed hash of the text. The hash key is a fingerprint of
+everything that determines the tokens: the dictionary build hash, the
+library version, the package sources and MAX_SEGMENT_LENGTH. When any of
+them changes, old records simply stop matching; ``clear`` reclaims their
+space.
+
+The index only ever points at complete records, and is rebuilt from the
+log if it is missing or damaged. A cache directory supports one writing
+process at a time; ``tokenize_batch`` does all cache reads and writes in
+the parent process.
+
+Usage:
+    from himotoki_split.disk_cache import DiskCache
+
+    with DiskCache(".himotoki-cache") as cache:
+        tokens = cache.tokenize("今日は天気がいいですね")
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Union
+
+if TYPE_CHECKING:
+    from himotoki_split import Token
+    from himotoki_split.dictionary import Dictionary
+
+LOG_NAME = "tokens.log"
+INDEX_NAME = "tokens.idx"
+
+FORMAT_VERSION = 1
+
+LOG_MAGIC = b'HSTL'
+INDEX_MAGIC = b'HSTI'
+
+# magic, format version
+_LOG_HEADER = struct.Struct('<4sI')
+# key, payload length
+_RECORD_HEADER = struct.Struct('<16sI')
+# magic, format version, capacity, entries, log bytes covered by the index
+_INDEX_HEADER = struct.Struct('<4sIQQQ')
+# key, record offset + 1 (0 marks an empty slot)
+_SLOT = struct.Struct('<16sQ')
+
+# Index slots when a cache is created; doubled whenever it is half full
+INITIAL_CAPACITY = 1 << 12
+
+KEY_SIZE = 16
+
+
+class DiskCacheInfo(NamedTuple):
+    """Disk cache statistics."""
+    hits: int
+    misses: int
+    entries: int
+    log_bytes: int
+
+
+@lru_cache(maxsize=1)
+def _source_hash() -> bytes:
+    """Hash of the package sources, so any change to the rules invalidates."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def cache_fingerprint(dictionary: 'Dictionary') -> bytes:
+    """
+    Fingerprint of everything besides the text that determines the tokens.
+
+    Args:
+        dictionary: Dictionary the tokens come from
+
+    Returns:
+        32-byte digest
+    """
+    from himotoki_split import __version__
+    from himotoki_split import tokenizer
+
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(f"{__version__}\0{tokenizer.MAX_SEGMENT_LENGTH}\0".encode())
+    digest.update(dictionary.build_hash.encode())
+    digest.update(_source_hash())
+    return digest.digest()
+
+
+def _encode_tokens(tokens: List['Token']) -> bytes:
+    return json.dumps(
+        [[t.surface, t.reading, t.pos, t.base_form, t.base_form_id, t.start, t.end]
+         for t in tokens],
+        ensure_ascii=False,
+        separators=(',', ':'),
+    ).encode('utf-8')
+
+
+def _decode_tokens(payload: bytes) -> List['Token']:
+    from himotoki_split import Token
+
+    return [Token(*fields) for fields in json.loads(payload)]
+
+
+# =============================================================================
+# Disk Cache
+# =============================================================================
+
+class DiskCache:
+    """
+    Persistent text -> tokens cache in a local directory.
+
+    Args:
+        path: Cache directory (created if missing)
+        dictionary: Dictionary the cached tokens come from (default
+            dictionary if None)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        dictionary: Optional['Dictionary'] = None,
+    ):
+        from himotoki_split.dictionary import get_default_dictionary
+
+        self.path = Path(path)
+        self.dictionary = dictionary if dictionary is not None else get_default_dictionary()
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._fingerprint_for = None
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.path / LOG_NAME, 'a+b')
+        self._index_file = None
+        self._index = None
+        self._open_log()
+        self._open_index()
+
+    def __enter__(self) -> 'DiskCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Flush and close the cache files."""
+        with self._lock:
+            if self._index is not None:
+                self._index.flush()
+                self._index.close()
+                self._index_file.close()
+                self._index = None
+            if not self._log.closed:
+                self._log.close()
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def get(self, text: str) -> Optional[List['Token']]:
+        """
+        Get the cached tokens for a text.
+
+        Returns:
+            Token list, or None if the text is not cached
+        """
+        key = self._key(text)
+        with self._lock:
+            offset = self._find(key)
+            payload = None if offset is None else self._read_record(offset, key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _decode_tokens(payload)
+
+    def put(self, text: str, tokens: List['Token']) -> None:
+        """Store the tokens for a text."""
+        key = self._key(text)
+        payload = _encode_tokens(tokens)
+        with self._lock:
+            offset = self._log_size
+            self._log.write(_RECORD_HEADER.pack(key, len(payload)) + payload)
+            self._log.flush()
+            self._log_size += _RECORD_HEADER.size + len(payload)
+            self._insert(key, offset)
+            self._write_index_header()
+
+    def tokenize(self, text: str) -> List['Token']:
+        """
+        Tokenize text, reusing and filling the cache.
+
+        Raises:
+            ValueError: If text is empty or whitespace-only
+        """
+        tokens = self.get(text)
+        if tokens is None:
+            from himotoki_split import tokenize
+
+            tokens = tokenize(text, self.dictionary)
+            self.put(text, tokens)
+        return tokens
+
+    def info(self) -> DiskCacheInfo:
+        """Get hit/miss counts for this handle and the cache size."""
+        with self._lock:
+            return DiskCacheInfo(self.hits, self.misses, self._count, self._log_size)
+
+    def clear(self) -> None:
+        """Delete every record, including ones no longer reachable."""
+        with self._lock:
+            self._log.truncate(_LOG_HEADER.size)
+            self._log_size = _LOG_HEADER.size
+            self._create_index(INITIAL_CAPACITY)
+            self._write_index_header()
+            self.hits = 0
+            self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def _key(self, text: str) -> bytes:
+        from himotoki_split import tokenizer
+
+        # Recomputed if chunking is reconfigured while the cache is open
+        if self._fingerprint_for != tokenizer.MAX_SEGMENT_LENGTH:
+            self._fingerprint = cache_fingerprint(self.dictionary)
+            self._fingerprint_for = tokenizer.MAX_SEGMENT_LENGTH
+        return hashlib.blake2b(
+            text.encode('utf-8'), digest_size=KEY_SIZE, key=self._fingerprint
+        ).digest()
+
+    # ------------------------------------------------------------------
+    # Log
+    # ------------------------------------------------------------------
+
+    def _open_log(self) -> None:
+        """Check the log header, starting a new log if it is missing or foreign."""
+        self._log.seek(0)
+        header = self._log.read(_LOG_HEADER.size)
+        if header != _LOG_HEADER.pack(LOG_MAGIC, FORMAT_VERSION):
+            self._log.truncate(0)
+            self._log.write(_LOG_HEADER.pack(LOG_MAGIC, FORMAT_VERSION))
+            self._log.flush()
+        self._log_size = self._log.seek(0, os.SEEK_END)
+
+    def _read_record(self, offset: int, key: bytes) -> Optional[bytes]:
+        """Read the payload of the record at ``offset`` if it holds ``key``."""
+        self._log.seek(offset)
+        header = self._log.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return None
+        record_key, length = _RECORD_HEADER.unpack(header)
+        if record_key != key:
+            return None
+        payload = self._log.read(length)
+        return payload if len(payload) == length else None
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _open_index(self) -> None:
+        """Map the index, rebuilding it if damaged, and index any unindexed records."""
+        path = self.path / INDEX_NAME
+        indexed = None
+        if path.exists() and path.stat().st_size >= _INDEX_HEADER.size:
+            self._map_index(path)
+            magic, version, capacity, count, indexed = _INDEX_HEADER.unpack_from(self._index)
+            expected_size = _INDEX_HEADER.size + capacity * _SLOT.size
+            if (magic != INDEX_MAGIC or version != FORMAT_VERSION
+                    or capacity < 1 or capacity & (capacity - 1)
+                    or len(self._index) != expected_size
+                    or not _LOG_HEADER.size <= indexed <= self._log_size):
+                indexed = None
+            else:
+                self._capacity = capacity
+                self._count = count
+
+        if indexed is None:
+            self._create_index(INITIAL_CAPACITY)
+            indexed = _LOG_HEADER.size
+        self._index_tail(indexed)
+
+    def _map_index(self, path: Path) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+        self._index_file = open(path, 'r+b')
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+
+    def _create_index(self, capacity: int, path: Optional[Path] = None) -> None:
+        """Create an empty index file and map it."""
+        final_path = self.path / INDEX_NAME
+        path = path or final_path
+        with open(path, 'wb') as f:
+            f.truncate(_INDEX_HEADER.size + capacity * _SLOT.size)
+        if path == final_path:
+            self._map_index(path)
+        self._capacity = capacity
+        self._count = 0
+
+    def _write_index_header(self) -> None:
+        _INDEX_HEADER.pack_into(
+            self._index, 0,
+            INDEX_MAGIC, FORMAT_VERSION, self._capacity, self._count, self._log_size,
+        )
+
+    def _index_tail(self, offset: int) -> None:
+        """Index the records after ``offset``, dropping a torn final record."""
+        log = self._log
+        log.seek(offset)
+        while offset < self._log_size:
+            header = log.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                break
+            key, length = _RECORD_HEADER.unpack(header)
+            end = offset + _RECORD_HEADER.size + length
+            if end > self._log_size:
+                break
+            log.seek(end)
+            self._insert(key, offset)
+            offset = end
+
+        if offset < self._log_size:
+            log.truncate(offset)
+            self._log_size = offset
+        self._write_index_header()
+
+    def _find(self, key: bytes) -> Optional[int]:
+        """Get the log offset of the record for ``key``, if indexed."""
+        index = self._index
+        mask = self._capacity - 1
+        i = int.from_bytes(key[:8], 'little') & mask
+        while True:
+            slot_key, slot_offset = _SLOT.unpack_from(index, _INDEX_HEADER.size + i * _SLOT.size)
+            if slot_offset == 0:
+                return None
+            if slot_key == key:
+                return slot_offset - 1
+            i = (i + 1) & mask
+
+    def _insert(self, key: bytes, offset: int) -> None:
+        """Point ``key`` at the record at ``offset``; the newest record wins."""
+        if (self._count + 1) * 2 > self._capacity:
+            self._grow()
+        index = self._index
+        mask = self._capacity - 1
+        i = int.from_bytes(key[:8], 'little') & mask
+        while True:
+            position = _INDEX_HEADER.size + i * _SLOT.size
+            slot_key, slot_offset = _SLOT.unpack_from(index, position)
+            if slot_offset == 0:
+                self._count += 1
+                break
+            if slot_key == key:
+                break
+            i = (i + 1) & mask
+        _SLOT.pack_into(index, position, key, offset + 1)
+
+    def _grow(self) -> None:
+        """Rehash into an index twice the size, replacing the file atomically."""
+        entries = []
+        for i in range(self._capacity):
+            slot_key, slot_offset = _SLOT.unpack_from(
+                self._index, _INDEX_HEADER.size + i * _SLOT.size
+            )
+            if slot_offset:
+                entries.append((slot_key, slot_offset - 1))
+
+        path = self.path / INDEX_NAME
+        tmp_path = path.with_suffix('.tmp')
+        self._create_index(self._capacity * 2, tmp_path)
+        self._map_index(tmp_path)
+        for slot_key, slot_offset in entries:
+            self._insert(slot_key, slot_offset)
+        self._write_index_header()
+        self._index.flush()
+        os.replace(tmp_path, path)
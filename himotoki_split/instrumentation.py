@@ -0,0 +1,222 @@
+"""
+Opt-in instrumentation for himotoki-split.
+
+Records, for each tokenize call, the wall time spent in each stage of the
+pipeline together with lattice sizes, dictionary lookups and merge-rule
+hits. Nothing is recorded unless a recorder is active or a hook is
+registered; the disabled cost is one check per call.
+
+Usage:
+    from himotoki_split.instrumentation import instrument, add_hook
+
+    # Collect stats for the calls made inside a block
+    with instrument() as recorder:
+        tokenize("今日は天気がいいですね")
+    print(recorder.calls[0].stages)
+
+    # Or receive every call's stats, from any thread (e.g. for metrics)
+    add_hook(lambda stats: metrics.observe(stats.total))
+
+Stages:
+    split        splitting the text at punctuation
+    lattice      dictionary matching and lattice construction
+    path         best-path search
+    merge_verbs  merge_compound_verbs
+    merge_multi  apply_multi_token_merges
+    postprocess  post_process_splits (suffix splits, substitutions, merges)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# =============================================================================
+# Call Statistics
+# =============================================================================
+
+@dataclass
+class CallStats:
+    """
+    Statistics for one tokenize call.
+
+    Attributes:
+        text_length: Length of the input text
+        total: Wall time of the whole call, in seconds
+        stages: Wall time per stage, in seconds
+        counters: Event counts (lattice_nodes, lattice_edges, segments,
+            dictionary_lookups, lookup_cache_hits, lookup_cache_misses,
+            segment_cache_hits, segment_cache_misses, tokens)
+        rule_hits: Number of rewrites applied per rule pass
+    """
+    text_length: int
+    total: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    rule_hits: Dict[str, int] = field(default_factory=dict)
+
+    def lap(self, stage: str, since: float) -> float:
+        """Add the time since ``since`` to a stage and return the current time."""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - since)
+        return now
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dict (times in milliseconds)."""
+        return {
+            "text_length": self.text_length,
+            "total_ms": self.total * 1000,
+            "stages_ms": {k: v * 1000 for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+            "rule_hits": dict(self.rule_hits),
+        }
+
+
+class Recorder:
+    """Collects the CallStats of every tokenize call made while it is active."""
+
+    def __init__(self):
+        self.calls: List[CallStats] = []
+
+    @property
+    def last(self) -> Optional[CallStats]:
+        """Stats of the most recent call, if any."""
+        return self.calls[-1] if self.calls else None
+
+    def summary(self) -> dict:
+        """
+        Aggregate all recorded calls.
+
+        Returns:
+            Dict with the call count, total and per-stage times in
+            milliseconds, and summed counters and rule hits
+        """
+        stages: Dict[str, float] = {}
+        counters: Dict[str, int] = {}
+        rule_hits: Dict[str, int] = {}
+        for stats in self.calls:
+            for k, v in stats.stages.items():
+                stages[k] = stages.get(k, 0.0) + v
+            for k, v in stats.counters.items():
+                counters[k] = counters.get(k, 0) + v
+            for k, v in stats.rule_hits.items():
+                rule_hits[k] = rule_hits.get(k, 0) + v
+        return {
+            "calls": len(self.calls),
+            "total_ms": sum(s.total for s in self.calls) * 1000,
+            "stages_ms": {k: v * 1000 for k, v in stages.items()},
+            "counters": counters,
+            "rule_hits": rule_hits,
+        }
+
+
+# =============================================================================
+# Activation
+# =============================================================================
+
+# Recorder for the current context (thread or asyncio task)
+_RECORDER: ContextVar[Optional[Recorder]] = ContextVar("himotoki_recorder", default=None)
+
+# Stats of the call in progress in the current context
+_CURRENT: ContextVar[Optional[CallStats]] = ContextVar("himotoki_call_stats", default=None)
+
+# Process-wide hooks; replaced rather than mutated so readers need no lock
+_HOOKS: Tuple[Callable[[CallStats], None], ...] = ()
+_HOOKS_LOCK = threading.Lock()
+
+
+@contextmanager
+def instrument() -> Iterator[Recorder]:
+    """
+    Record stats for tokenize calls made in this block.
+
+    Recording follows the current context: calls made from this thread or
+    asyncio task are recorded, calls in worker threads or processes are
+    not. Use ``add_hook`` to observe those.
+
+    Yields:
+        The Recorder collecting the calls
+    """
+    recorder = Recorder()
+    token = _RECORDER.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _RECORDER.reset(token)
+
+
+def add_hook(callback: Callable[[CallStats], None]) -> None:
+    """
+    Register a callback invoked with the CallStats of every tokenize call.
+
+    Hooks run in the thread that made the call, after it completes.
+    Exceptions raised by a hook propagate to the caller.
+    """
+    global _HOOKS
+    with _HOOKS_LOCK:
+        _HOOKS = _HOOKS + (callback,)
+
+
+def remove_hook(callback: Callable[[CallStats], None]) -> None:
+    """Unregister a hook added with ``add_hook``."""
+    global _HOOKS
+    with _HOOKS_LOCK:
+        hooks = list(_HOOKS)
+        hooks.remove(callback)
+        _HOOKS = tuple(hooks)
+
+
+def is_enabled() -> bool:
+    """Check whether calls in this context are being instrumented."""
+    return bool(_HOOKS) or _RECORDER.get() is not None
+
+
+# =============================================================================
+# Pipeline Interface
+# =============================================================================
+
+def start_call(text_length: int):
+    """
+    Begin instrumenting a call.
+
+    Returns:
+        (stats, context token) if instrumentation is enabled, else None
+    """
+    if not _HOOKS and _RECORDER.get() is None:
+        return None
+    stats = CallStats(text_length)
+    return stats, _CURRENT.set(stats)
+
+
+def finish_call(call, started: float) -> None:
+    """Finish a call begun with ``start_call`` and deliver its stats."""
+    stats, token = call
+    stats.total = time.perf_counter() - started
+    _CURRENT.reset(token)
+
+    recorder = _RECORDER.get()
+    if recorder is not None:
+        recorder.calls.append(stats)
+    for hook in _HOOKS:
+        hook(stats)
+
+
+def count_event(name: str, n: int = 1) -> None:
+    """Add to a counter of the current call, if any."""
+    stats = _CURRENT.get()
+    if stats is not None:
+        stats.counters[name] = stats.counters.get(name, 0) + n
+
+
+def count_rule_hits(rule: str, n: int) -> None:
+    """Record rewrites applied by a rule pass in the current call, if any."""
+    stats = _CURRENT.get()
+    if stats is not None:
+        stats.rule_hits[rule] = stats.rule_hits.get(rule, 0) + n
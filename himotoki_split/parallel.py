@@ -0,0 +1,236 @@
+"""
+Process-pool batch tokenization for himotoki-split.
+
+The tokenizer is pure Python, so threads cannot run it in parallel. This
+module fans batches of texts out to worker processes instead. Each worker
+memory-maps the same dictionary files once at startup, so the pages are
+shared through the OS page cache rather than copied per worker.
+
+Usage:
+    from himotoki_split.parallel import TokenizerPool
+
+    with TokenizerPool(workers=8) as pool:
+        for tokens in pool.imap(lines):
+            ...
+"""
+
+import os
+from collections import deque
+from copy import copy
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from himotoki_split.dictionary import Dictionary
+    from himotoki_split.disk_cache import DiskCache
+
+DEFAULT_CHUNKSIZE = 64
+
+# Chunks in flight per worker; bounds memory for very long inputs
+_PREFETCH_PER_WORKER = 2
+
+
+# =============================================================================
+# Worker Side
+# =============================================================================
+
+def _init_worker(paths: Tuple[Path, Path, Path]) -> None:
+    """Open the dictionary in a worker and make it the default."""
+    from himotoki_split.dictionary import Dictionary, set_default_dictionary
+
+    path, base_forms_path, kana_readings_path = paths
+    dictionary = Dictionary(path, base_forms_path, kana_readings_path)
+    dictionary.open()
+    # Map the side stores now rather than on the first task
+    dictionary.base_forms
+    dictionary.kana_readings
+    set_default_dictionary(dictionary)
+
+
+def _tokenize_chunk(texts: List[str]) -> List[list]:
+    """Tokenize a chunk of texts; blank texts give empty token lists."""
+    from himotoki_split import tokenize
+
+    return [tokenize(text) if text and text.strip() else [] for text in texts]
+
+
+def _resolve_dictionary(dictionary) -> 'Dictionary':
+    """Accept a Dictionary, a .dic path, or None for the default."""
+    from himotoki_split.dictionary import Dictionary, get_default_dictionary
+
+    if dictionary is None:
+        return get_default_dictionary()
+    if isinstance(dictionary, Dictionary):
+        return dictionary
+    return Dictionary(Path(dictionary))
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+class TokenizerPool:
+    """
+    A pool of warmed tokenizer processes.
+
+    Args:
+        workers: Number of worker processes (default: CPU count)
+        dictionary: Dictionary handle or path to a .dic file to open in
+            every worker. Uses the default dictionary if not specified.
+        chunksize: Number of texts sent to a worker per task
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        dictionary: Union[None, str, Path, 'Dictionary'] = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+    ):
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+        dictionary = _resolve_dictionary(dictionary)
+
+        # Fail fast here rather than in every worker
+        if not dictionary.path.exists():
+            raise FileNotFoundError(f"Dictionary not found at {dictionary.path}.")
+
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._paths = (
+            dictionary.path,
+            dictionary.base_forms_path,
+            dictionary.kana_readings_path,
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self._paths,),
+        )
+
+    def __enter__(self) -> 'TokenizerPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        self._executor.shutdown(wait=True)
+
+    def imap(self, texts: Iterable[str], cache: Optional['DiskCache'] = None) -> Iterator[List]:
+        """
+        Tokenize texts lazily, yielding token lists in input order.
+
+        Only a bounded number of chunks is in flight at a time, so this
+        works on inputs far larger than memory.
+
+        Args:
+            texts: Iterable of texts
+            cache: DiskCache to reuse and fill (must be for the pool's
+                dictionary); only texts missing from it reach the workers
+
+        Yields:
+            List of Token objects for each text
+        """
+        if cache is not None:
+            group_size = self.chunksize * self.workers * _PREFETCH_PER_WORKER
+            for group in _chunks(texts, group_size):
+                yield from _tokenize_batch_cached(group, cache, self.map)
+            return
+
+        pending = deque()
+        max_pending = self.workers * _PREFETCH_PER_WORKER
+
+        for chunk in _chunks(texts, self.chunksize):
+            pending.append(self._executor.submit(_tokenize_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+    def map(self, texts: Iterable[str]) -> List[List]:
+        """Tokenize texts, returning token lists in input order."""
+        return list(self.imap(texts))
+
+
+def tokenize_batch(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    dictionary: Union[None, str, Path, 'Dictionary'] = None,
+    cache: Optional['DiskCache'] = None,
+) -> List[List]:
+    """
+    Tokenize many texts in parallel worker processes.
+
+    Results are returned in input order. Blank texts give an empty token
+    list instead of raising. With ``workers=1`` the texts are tokenized in
+    this process.
+
+    Args:
+        texts: Iterable of texts
+        workers: Number of worker processes (default: CPU count)
+        chunksize: Number of texts sent to a worker per task
+        dictionary: Dictionary handle or .dic path (default dictionary if None)
+        cache: DiskCache to reuse and fill. Only texts missing from it are
+            sent to the workers; the dictionary is the cache's.
+
+    Returns:
+        List of token lists, one per input text
+    """
+    if cache is not None:
+        if dictionary is not None and dictionary is not cache.dictionary:
+            raise ValueError("dictionary must be omitted when a cache is given")
+        return _tokenize_batch_cached(
+            list(texts), cache,
+            lambda missing: tokenize_batch(missing, workers, chunksize, cache.dictionary),
+        )
+
+    if workers == 1:
+        from himotoki_split import tokenize
+
+        dictionary = _resolve_dictionary(dictionary)
+        return [
+            tokenize(text, dictionary) if text and text.strip() else []
+            for text in texts
+        ]
+
+    with TokenizerPool(workers, dictionary, chunksize) as pool:
+        return pool.map(texts)
+
+
+def _tokenize_batch_cached(
+    texts: List[str],
+    cache: 'DiskCache',
+    tokenize_many: Callable[[List[str]], List[List]],
+) -> List[List]:
+    """Tokenize texts through a disk cache, passing only misses to ``tokenize_many``."""
+    results = [cache.get(text) if text and text.strip() else [] for text in texts]
+
+    # Tokenize each missing text once, however often it repeats
+    missing = {}
+    for i, tokens in enumerate(results):
+        if tokens is None:
+            missing.setdefault(texts[i], []).append(i)
+
+    if missing:
+        computed = tokenize_many(list(missing))
+        for (text, positions), tokens in zip(missing.items(), computed):
+            cache.put(text, tokens)
+            results[positions[0]] = tokens
+            for i in positions[1:]:
+                results[i] = [copy(t) for t in tokens]
+
+    return results
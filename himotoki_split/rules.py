@@ -0,0 +1,169 @@
+"""
+Compiled token rewrite rules for himotoki-split.
+
+The post-processing passes (compound verb merging, multi-token merges,
+token substitutions and merge patterns) are tables of token-surface
+sequences. Instead of trying every pattern at every position, each table
+is compiled once into a trie over token surfaces, so finding the rule
+that applies at a position costs at most one dict lookup per token of
+the longest pattern.
+
+The rewrite drivers then apply a rule in a single left-to-right pass:
+
+- ``rewrite_once`` replaces each match and moves past it (substitutions).
+- ``rewrite_to_fixpoint`` steps back over the tokens before a merge so
+  the merged token is tried again with its neighbours, which replaces
+  re-running the whole pass until the token count stops changing.
+"""
+
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from himotoki_split.instrumentation import count_rule_hits
+
+# A rule looks at the tokens starting at a position and returns how many
+# of them to consume and what to put in their place, or None.
+RewriteRule = Callable[[Sequence[Any]], Optional[Tuple[int, List[Any]]]]
+
+# Trie key holding (priority, value) for patterns that end at a node
+_TERMINAL = None
+
+
+# =============================================================================
+# Surface Trie
+# =============================================================================
+
+class SurfaceTrie:
+    """
+    Trie over token-surface sequences.
+
+    Patterns keep the priority of their position in the input: when several
+    patterns match at the same position, the one listed first wins,
+    regardless of length. Duplicate patterns keep their first value.
+
+    Args:
+        patterns: (surfaces, value) pairs in priority order
+    """
+
+    __slots__ = ('_root', 'max_length')
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], Any]]):
+        self._root = {}
+        self.max_length = 0
+
+        for priority, (surfaces, value) in enumerate(patterns):
+            node = self._root
+            for surface in surfaces:
+                node = node.setdefault(surface, {})
+            node.setdefault(_TERMINAL, (priority, value))
+            self.max_length = max(self.max_length, len(surfaces))
+
+    def match(self, tokens: Sequence[Any]) -> Optional[Tuple[int, Any]]:
+        """
+        Find the highest-priority pattern matching a prefix of ``tokens``.
+
+        Args:
+            tokens: Tokens starting at the position to test
+
+        Returns:
+            (number of tokens matched, pattern value), or None
+        """
+        node = self._root
+        best = None
+
+        for depth, token in enumerate(tokens, 1):
+            node = node.get(token.surface)
+            if node is None:
+                break
+            hit = node.get(_TERMINAL)
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = (hit[0], depth, hit[1])
+
+        if best is None:
+            return None
+        return best[1], best[2]
+
+
+# =============================================================================
+# Rewrite Drivers
+# =============================================================================
+
+def rewrite_once(
+    tokens: List[Any],
+    rule: RewriteRule,
+    span: int,
+    name: Optional[str] = None,
+) -> List[Any]:
+    """
+    Apply a rule left to right without re-examining its output.
+
+    Args:
+        tokens: Input tokens
+        rule: Rewrite rule
+        span: Most tokens the rule looks at
+        name: Rule name for instrumentation
+
+    Returns:
+        New token list
+    """
+    result = []
+    hits = 0
+    i = 0
+
+    while i < len(tokens):
+        hit = rule(tokens[i:i + span])
+        if hit is None:
+            result.append(tokens[i])
+            i += 1
+        else:
+            consumed, replacement = hit
+            result.extend(replacement)
+            i += consumed
+            hits += 1
+
+    if hits and name:
+        count_rule_hits(name, hits)
+    return result
+
+
+def rewrite_to_fixpoint(
+    tokens: List[Any],
+    rule: RewriteRule,
+    span: int,
+    name: Optional[str] = None,
+) -> List[Any]:
+    """
+    Apply a merging rule until it no longer matches anywhere, in one pass.
+
+    After each rewrite the scan steps back ``span - 1`` tokens, so a merged
+    token is matched against the tokens before it as well as after it.
+    The rule must return fewer tokens than it consumes.
+
+    Args:
+        tokens: Input tokens
+        rule: Rewrite rule
+        span: Most tokens the rule looks at
+        name: Rule name for instrumentation
+
+    Returns:
+        New token list
+    """
+    done = []
+    hits = 0
+    todo = tokens[::-1]  # Next token is at the end
+
+    while todo:
+        hit = rule(todo[:-span - 1:-1])
+        if hit is None:
+            done.append(todo.pop())
+            continue
+
+        consumed, replacement = hit
+        del todo[-consumed:]
+        todo.extend(reversed(replacement))
+        for _ in range(min(span - 1, len(done))):
+            todo.append(done.pop())
+        hits += 1
+
+    if hits and name:
+        count_rule_hits(name, hits)
+    return done
@@ -0,0 +1,155 @@
+"""
+Segment result cache for himotoki-split.
+
+Chat logs and subtitles repeat the same short utterances over and over.
+Text is tokenized one punctuation-delimited segment at a time, and no
+post-processing rule merges a punctuation token with its neighbours
+(even 。 + しています stays split), so the final tokens of a segment
+depend only on its text and the dictionary. This
+module keeps a bounded LRU of those tokens, with offsets relative to the
+segment, so repeated segments skip the lattice and post-processing and
+only have their offsets rebased.
+
+The cache is disabled by default:
+
+    import himotoki_split
+    himotoki_split.configure_segment_cache(4096)
+    ...
+    print(himotoki_split.segment_cache_info().hit_ratio)
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+# Token fields in Token order, with start/end relative to the segment
+CachedToken = Tuple[str, str, str, str, int, int, int]
+
+
+class SegmentCacheInfo(NamedTuple):
+    """Segment cache statistics."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache (0.0 before any lookup)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SegmentCache:
+    """
+    Thread-safe LRU of tokenized segments.
+
+    Entries are keyed by the dictionary (held weakly, so a replaced
+    dictionary is not kept alive) and the segment text.
+
+    Args:
+        maxsize: Maximum number of segments to keep
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Tuple[Any, str], Tuple[CachedToken, ...]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dictionary: Any, text: str, offset: int) -> Optional[List[Any]]:
+        """
+        Get the cached tokens for a segment, rebased to ``offset``.
+
+        Returns:
+            New Token objects, or None on a miss
+        """
+        from himotoki_split import Token
+
+        key = (weakref.ref(dictionary), text)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return [
+            Token(surface, reading, pos, base_form, base_form_id, offset + start, offset + end)
+            for surface, reading, pos, base_form, base_form_id, start, end in cached
+        ]
+
+    def put(self, dictionary: Any, text: str, offset: int, tokens: List[Any]) -> None:
+        """Store the tokens of a segment that starts at ``offset``."""
+        key = (weakref.ref(dictionary), text)
+        value = tuple(
+            (t.surface, t.reading, t.pos, t.base_form, t.base_form_id,
+             t.start - offset, t.end - offset)
+            for t in tokens
+        )
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> SegmentCacheInfo:
+        """Get hit/miss counts and the current size."""
+        with self._lock:
+            return SegmentCacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# =============================================================================
+# Process-wide Cache
+# =============================================================================
+
+_CACHE: Optional[SegmentCache] = None
+
+
+def get_segment_cache() -> Optional[SegmentCache]:
+    """Get the active segment cache, or None if caching is disabled."""
+    return _CACHE
+
+
+def configure_segment_cache(maxsize: int = 0) -> None:
+    """
+    Enable, resize or disable the segment cache, discarding its contents.
+
+    Args:
+        maxsize: Maximum number of segments to keep. 0 disables caching.
+    """
+    global _CACHE
+    if maxsize < 0:
+        raise ValueError("maxsize must be >= 0")
+    _CACHE = SegmentCache(maxsize) if maxsize else None
+
+
+def segment_cache_info() -> SegmentCacheInfo:
+    """
+    Get segment cache statistics.
+
+    Returns:
+        SegmentCacheInfo of (hits, misses, maxsize, currsize), with a
+        ``hit_ratio`` property. All zero while caching is disabled.
+    """
+    cache = _CACHE
+    if cache is None:
+        return SegmentCacheInfo(0, 0, 0, 0)
+    return cache.info()
+
+
+def clear_segment_cache() -> None:
+    """Drop all cached segments and reset the hit/miss counters."""
+    cache = _CACHE
+    if cache is not None:
+        cache.clear()
@@ -0,0 +1,520 @@
+"""
+Local tokenization server for himotoki-split.
+
+Every CLI invocation pays for interpreter startup, imports and mapping
+the dictionary. ``himotoki-split serve`` keeps a warmed tokenizer (and
+optionally a worker pool) in one long-running process and answers HTTP
+requests on a Unix socket or a localhost port; the CLI forwards to it
+automatically when it is running.
+
+Usage:
+    himotoki-split serve                      # Unix socket (default path)
+    himotoki-split serve --port 8765          # http://127.0.0.1:8765
+    himotoki-split serve --workers 4          # batches use 4 processes
+
+Endpoints:
+    GET  /health     {"status": "ok", "version": ..., "build_hash": ...}
+    POST /tokenize   {"text": str}            -> {"tokens": [token, ...]}
+                     {"texts": [str, ...]}    -> {"results": [[token, ...], ...]}
+                     JSONL (Content-Type application/x-ndjson): one JSON
+                     string or {"text": str} per line -> one
+                     {"tokens": [...]} line per input line
+    POST /cli        {"text": str, "mode": "default|simple|json|detail",
+                      "stream": bool}         -> {"output": str}
+
+Tokens are objects with surface, reading, pos, base_form, base_form_id,
+start and end. Errors are returned as {"error": message} with status 400.
+
+The server address is taken from the HIMOTOKI_SPLIT_SERVER environment
+variable if set ("unix:/path/to.sock" or "host:port"), otherwise the
+default socket in a private per-user directory ($XDG_RUNTIME_DIR, or a
+0700 directory in the temp directory). The CLI only forwards to a socket
+owned by the current user, and only if the server reports the same
+library version and dictionary build as the client would use.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+SERVER_ENV = "HIMOTOKI_SPLIT_SERVER"
+
+DEFAULT_PORT = 8765
+
+JSONL_CONTENT_TYPES = frozenset(['application/x-ndjson', 'application/jsonl'])
+
+# How long the CLI waits for a forwarded request before giving up
+CLIENT_TIMEOUT = 300.0
+
+
+SOCKET_NAME = "himotoki-split.sock"
+
+
+def _runtime_dir() -> Path:
+    """Get the per-user directory that holds the default socket."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isabs(runtime_dir):
+        return Path(runtime_dir)
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return Path(tempfile.gettempdir()) / f"himotoki-split-{user}"
+
+
+def default_socket_path() -> Path:
+    """Get the per-user default socket path."""
+    return _runtime_dir() / SOCKET_NAME
+
+
+def _is_private_dir(path: Path) -> bool:
+    """Check that a directory is a real directory owned by us and closed to others."""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(info.st_mode)
+            and info.st_uid == os.getuid()
+            and not info.st_mode & 0o077)
+
+
+def _is_own_socket(path: Path) -> bool:
+    """Check that a path is a socket owned by us in a private directory."""
+    if not _is_private_dir(path.parent):
+        return False
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def _make_private_dir(path: Path) -> None:
+    """
+    Create the socket directory with mode 0700, or check an existing one.
+
+    Raises:
+        RuntimeError: If the directory exists but other users could
+            reach or replace the socket in it
+    """
+    try:
+        path.mkdir(mode=0o700, parents=True)
+    except FileExistsError:
+        pass
+    if not _is_private_dir(path):
+        raise RuntimeError(
+            f"{path} must be a directory owned by you with mode 0700; "
+            f"remove it or pass --socket"
+        )
+
+
+def _parse_address(address: str):
+    """Parse "unix:/path" or "host:port" into a socket path or (host, port)."""
+    if address.startswith('unix:'):
+        return Path(address[len('unix:'):])
+    host, _, port = address.rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+# =============================================================================
+# Request Handling
+# =============================================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the tokenizer held by ``self.server.tokenizer``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            sys.stderr.write(f"{self.command} {self.path} " + (format % args) + "\n")
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            from himotoki_split import __version__
+            self._send_json(200, {
+                "status": "ok",
+                "version": __version__,
+                "build_hash": self.server.tokenizer.dictionary.build_hash,
+            })
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip()
+
+        try:
+            if self.path == '/tokenize':
+                if content_type in JSONL_CONTENT_TYPES:
+                    self._send_jsonl(self.server.tokenizer.tokenize_jsonl(body))
+                else:
+                    self._send_json(200, self.server.tokenizer.tokenize_json(json.loads(body)))
+            elif self.path == '/cli':
+                self._send_json(200, self.server.tokenizer.run_cli(json.loads(body)))
+            else:
+                self._send_json(404, {"error": f"unknown path {self.path}"})
+        except (ValueError, TypeError, KeyError) as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        self._send(status, 'application/json', json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+    def _send_jsonl(self, lines: List[Any]) -> None:
+        body = ''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines)
+        self._send(200, 'application/x-ndjson', body.encode('utf-8'))
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _WarmTokenizer:
+    """
+    The tokenizer state kept by the server: a dictionary mapped at startup
+    and an optional process pool for batch requests.
+
+    Args:
+        dictionary: Dictionary to serve (default dictionary if None)
+        workers: Worker processes for batch requests (1 = in-process)
+    """
+
+    def __init__(self, dictionary=None, workers: int = 1):
+        from himotoki_split import tokenize
+        from himotoki_split.dictionary import get_default_dictionary
+
+        self.dictionary = dictionary if dictionary is not None else get_default_dictionary()
+        self.dictionary.open()
+        # Map the side stores and run the pipeline once before serving
+        self.dictionary.base_forms
+        self.dictionary.kana_readings
+        self.dictionary.build_hash
+        tokenize("今日は", self.dictionary)
+
+        self.pool = None
+        if workers > 1:
+            from himotoki_split.parallel import TokenizerPool
+            self.pool = TokenizerPool(workers, self.dictionary)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+
+    def tokenize(self, text: str) -> list:
+        from himotoki_split import tokenize
+        return tokenize(text, self.dictionary)
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[list]:
+        """Tokenize a batch; blank texts give empty token lists."""
+        if self.pool is not None and len(texts) > 1:
+            return self.pool.map(texts)
+        return [self.tokenize(text) if text and text.strip() else [] for text in texts]
+
+    def tokenize_json(self, request: dict) -> dict:
+        if not isinstance(request, dict):
+            raise ValueError('request must be a JSON object with "text" or "texts"')
+        if 'texts' in request:
+            texts = request['texts']
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError('"texts" must be a list of strings')
+            results = self.tokenize_many(texts)
+            return {"results": [[t.to_dict() for t in tokens] for tokens in results]}
+        return {"tokens": [t.to_dict() for t in self.tokenize(request['text'])]}
+
+    def tokenize_jsonl(self, body: bytes) -> List[dict]:
+        texts = []
+        for line in body.decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            texts.append(item['text'] if isinstance(item, dict) else item)
+        return [{"tokens": [t.to_dict() for t in tokens]}
+                for tokens in self.tokenize_many(texts)]
+
+    def run_cli(self, request: dict) -> dict:
+        from himotoki_split.cli import render
+        output = render(
+            request['text'],
+            request.get('mode', 'default'),
+            self.dictionary,
+            stream=bool(request.get('stream')),
+        )
+        return {"output": output}
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ('local', 0)
+
+
+def _server_running(path: Path) -> bool:
+    """Check whether something is accepting connections on a socket path."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def _stop(signum, frame) -> None:
+    """Shut down on SIGTERM the same way as on Ctrl-C."""
+    raise KeyboardInterrupt
+
+
+def serve(
+    socket_path: Optional[Path] = None,
+    port: Optional[int] = None,
+    host: str = '127.0.0.1',
+    workers: int = 1,
+    dictionary=None,
+    verbose: bool = False,
+) -> None:
+    """
+    Run the tokenization server until interrupted.
+
+    Args:
+        socket_path: Unix socket to listen on (default path if neither
+            this nor ``port`` is given)
+        port: TCP port to listen on instead of a Unix socket
+        host: Interface for TCP; keep it local, there is no authentication
+        workers: Worker processes for batch requests
+        dictionary: Dictionary to serve (default dictionary if None)
+        verbose: Log each request to stderr
+    """
+    tokenizer = _WarmTokenizer(dictionary, workers)
+
+    if port is None and hasattr(socket, 'AF_UNIX'):
+        if socket_path is None:
+            socket_path = default_socket_path()
+            try:
+                _make_private_dir(socket_path.parent)
+            except RuntimeError:
+                tokenizer.close()
+                raise
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            if _server_running(socket_path):
+                tokenizer.close()
+                raise RuntimeError(f"A server is already listening on {socket_path}")
+            socket_path.unlink()  # Left behind by a server that crashed
+        # Create the socket without access for other users from the start
+        umask = os.umask(0o077)
+        try:
+            server = _UnixHTTPServer(str(socket_path), _Handler)
+        finally:
+            os.umask(umask)
+        address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port or DEFAULT_PORT), _Handler)
+        server.daemon_threads = True
+        socket_path = None
+        address = f"{host}:{server.server_address[1]}"
+
+    server.tokenizer = tokenizer
+    server.verbose = verbose
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop)
+    print(f"himotoki-split serving on {address}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        tokenizer.close()
+        if socket_path is not None and socket_path.exists():
+            socket_path.unlink()
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: Path, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self._path = str(path)
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class Client:
+    """
+    Client for a running server.
+
+    Args:
+        address: "unix:/path" or "host:port"
+        timeout: Seconds to wait for a response
+    """
+
+    def __init__(self, address: str, timeout: float = CLIENT_TIMEOUT):
+        self.address = address
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        target = _parse_address(self.address)
+        if isinstance(target, Path):
+            return _UnixHTTPConnection(target, self.timeout)
+        return http.client.HTTPConnection(*target, timeout=self.timeout)
+
+    def request(self, path: str, payload: Optional[dict] = None) -> dict:
+        """
+        Send a request and return the decoded JSON response.
+
+        Raises:
+            OSError: If the server cannot be reached
+            ValueError: If the server rejects the request
+        """
+        conn = self._connection()
+        try:
+            if payload is None:
+                conn.request('GET', path)
+            else:
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                conn.request('POST', path, body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            result = json.loads(response.read())
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise ValueError(result.get('error', f"server returned {response.status}"))
+        return result
+
+    def health(self) -> dict:
+        """Get the server's status, version and dictionary build hash."""
+        return self.request('/health')
+
+    def matches(self, dictionary=None) -> bool:
+        """
+        Check that the server runs this library version with the same
+        dictionary build as ``dictionary`` (the default dictionary if None).
+
+        Returns:
+            False if they differ or the server cannot be reached
+        """
+        from himotoki_split import __version__
+        from himotoki_split.dictionary import get_default_dictionary
+
+        try:
+            health = self.health()
+        except (OSError, ValueError):
+            return False
+        if dictionary is None:
+            dictionary = get_default_dictionary()
+        return (health.get('version') == __version__
+                and health.get('build_hash') == dictionary.build_hash)
+
+    def tokenize(self, text: str) -> List[dict]:
+        """Tokenize one text, returning token dicts."""
+        return self.request('/tokenize', {"text": text})['tokens']
+
+    def tokenize_many(self, texts: List[str]) -> List[List[dict]]:
+        """Tokenize a batch of texts, returning token dicts per text."""
+        return self.request('/tokenize', {"texts": texts})['results']
+
+
+def find_server() -> Optional[Client]:
+    """
+    Get a client for a running server that can stand in for local tokenization.
+
+    Uses HIMOTOKI_SPLIT_SERVER if set, otherwise the default socket path.
+    Unix sockets are only used if they are owned by the current user and
+    sit in a directory other users cannot write to, and the server must
+    report the same library version and default dictionary build.
+    """
+    address = os.environ.get(SERVER_ENV)
+    if not address:
+        if not hasattr(socket, 'AF_UNIX'):
+            return None
+        address = f"unix:{default_socket_path()}"
+
+    try:
+        target = _parse_address(address)
+    except ValueError:
+        return None
+    if isinstance(target, Path) and not _is_own_socket(target):
+        return None
+
+    client = Client(address)
+    return client if client.matches() else None
+
+
+# =============================================================================
+# Command Line
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for ``himotoki-split serve``."""
+    parser = argparse.ArgumentParser(
+        prog="himotoki-split serve",
+        description="Serve tokenization requests from a warmed process",
+    )
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument(
+        "--socket",
+        metavar="PATH",
+        help=f"Unix socket to listen on (default: {default_socket_path()})",
+    )
+    where.add_argument(
+        "--port", "-p",
+        type=int,
+        help="Listen on http://127.0.0.1:PORT instead of a Unix socket",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Worker processes for batch requests (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--dictionary",
+        metavar="PATH",
+        help="Path to a himotoki.dic build to serve instead of the bundled one",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log requests to stderr",
+    )
+    args = parser.parse_args(argv)
+
+    from himotoki_split.dictionary import Dictionary
+    dictionary = Dictionary(args.dictionary) if args.dictionary else None
+
+    try:
+        serve(
+            socket_path=Path(args.socket) if args.socket else None,
+            port=args.port,
+            workers=args.workers,
+            dictionary=dictionary,
+            verbose=args.verbose,
+        )
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,153 @@
+"""
+Streaming tokenization for himotoki-split.
+
+Splits text from a file or iterator into sentences as it arrives and
+tokenizes them one at a time, so arbitrarily large inputs are processed
+in bounded memory and the first tokens are available immediately.
+
+Sentence boundaries are the full-width terminators 。！？ and line
+breaks. The tokenizer already splits the text at every punctuation mark,
+and no post-processing rule merges a punctuation token with its
+neighbours. Splitting after 。！？ therefore gives the same tokens and
+offsets as tokenizing the whole text. The exceptions are line breaks
+and whitespace at the start of a sentence: the stream drops them, while
+``tokenize`` keeps them in the following token. Runs cut at
+``max_buffer`` can also tokenize differently.
+"""
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO, Tuple, Union
+
+from himotoki_split.tokenizer import PUNCTUATION_SEPARATORS
+
+if TYPE_CHECKING:
+    from himotoki_split import Token
+    from himotoki_split.dictionary import Dictionary
+    from himotoki_split.disk_cache import DiskCache
+
+# Characters that end a sentence (kept with the sentence)
+SENTENCE_TERMINATORS = frozenset(['。', '！', '？'])
+
+# Line breaks also end a sentence (dropped from the sentence)
+LINE_BREAKS = frozenset(['\n', '\r'])
+
+# Characters read from a file per chunk
+READ_CHUNK_SIZE = 64 * 1024
+
+# Longest run of text held without a sentence boundary before it is cut
+DEFAULT_MAX_BUFFER = 4096
+
+
+def _iter_chunks(source: Union[str, TextIO, Iterable[str]]) -> Iterator[str]:
+    """Yield text chunks from a string, a text file, or an iterable of strings."""
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, 'read'):
+        yield from iter(lambda: source.read(READ_CHUNK_SIZE), '')
+    else:
+        yield from source
+
+
+def _emit(text: str, offset: int) -> Iterator[Tuple[str, int]]:
+    """Yield a sentence with surrounding whitespace removed, if non-empty."""
+    stripped = text.lstrip()
+    offset += len(text) - len(stripped)
+    stripped = stripped.rstrip()
+    if stripped:
+        yield stripped, offset
+
+
+def _overflow_cut(buffer: str, max_buffer: int) -> int:
+    """Pick where to cut an over-long buffer: after the last separator, if any."""
+    for i in range(max_buffer - 1, 0, -1):
+        ch = buffer[i]
+        if ch in PUNCTUATION_SEPARATORS or ch.isspace():
+            return i + 1
+    return max_buffer
+
+
+def iter_sentences(
+    source: Union[str, TextIO, Iterable[str]],
+    max_buffer: int = DEFAULT_MAX_BUFFER,
+) -> Iterator[Tuple[str, int]]:
+    """
+    Split text into sentences incrementally.
+
+    Args:
+        source: A string, a text file, or an iterable of text chunks
+        max_buffer: Maximum characters to hold without a sentence boundary.
+            Longer runs are cut after the last 、/・/whitespace, or hard cut.
+
+    Yields:
+        (sentence, offset) tuples, where offset is the position of the
+        sentence's first character in the whole input
+    """
+    if max_buffer < 1:
+        raise ValueError("max_buffer must be >= 1")
+
+    buffer = ''
+    base = 0  # Input offset of buffer[0]
+
+    for chunk in _iter_chunks(source):
+        scan_from = len(buffer)
+        buffer += chunk
+
+        start = 0
+        for i in range(scan_from, len(buffer)):
+            ch = buffer[i]
+            if ch in SENTENCE_TERMINATORS:
+                yield from _emit(buffer[start:i + 1], base + start)
+                start = i + 1
+            elif ch in LINE_BREAKS:
+                yield from _emit(buffer[start:i], base + start)
+                start = i + 1
+
+        buffer = buffer[start:]
+        base += start
+
+        while len(buffer) > max_buffer:
+            cut = _overflow_cut(buffer, max_buffer)
+            yield from _emit(buffer[:cut], base)
+            buffer = buffer[cut:]
+            base += cut
+
+    yield from _emit(buffer, base)
+
+
+def tokenize_stream(
+    source: Union[str, TextIO, Iterable[str]],
+    dictionary: Optional['Dictionary'] = None,
+    max_buffer: int = DEFAULT_MAX_BUFFER,
+    cache: Optional['DiskCache'] = None,
+) -> Iterator['Token']:
+    """
+    Tokenize a stream of text lazily, sentence by sentence.
+
+    Token start/end positions are offsets into the whole input. Whitespace
+    between sentences produces no tokens.
+
+    Args:
+        source: A string, a text file, or an iterable of text chunks
+        dictionary: Dictionary to use (default dictionary if None)
+        max_buffer: Maximum characters to hold without a sentence boundary
+        cache: DiskCache to reuse and fill, sentence by sentence (its
+            dictionary is used instead of ``dictionary``)
+
+    Yields:
+        Token objects in input order
+
+    Example:
+        >>> with open("corpus.txt", encoding="utf-8") as f:
+        ...     for token in tokenize_stream(f):
+        ...         print(token.surface)
+    """
+    from himotoki_split import tokenize
+
+    for sentence, offset in iter_sentences(source, max_buffer):
+        if cache is not None:
+            tokens = cache.tokenize(sentence)
+        else:
+            tokens = tokenize(sentence, dictionary)
+        for token in tokens:
+            token.start += offset
+            token.end += offset
+            yield token
@@ -0,0 +1,250 @@
+"""
+Memory-mapped seq -> string stores for himotoki-split.
+
+Base forms and kana readings are stored as a sorted, fixed-stride index
+over a UTF-8 string heap. Opening a store maps the file and does no
+parsing, lookups are a binary search over the seq column, and the pages
+are shared between processes that map the same file.
+
+File layout (all integers little-endian uint32):
+
+    magic   b"HSS1"
+    count   number of entries
+    seqs    count x uint32, sorted ascending
+    offsets (count + 1) x uint32, byte offsets into the heap
+    heap    concatenated UTF-8 strings
+
+The legacy layout (count, then repeated seq/len/text records) is still
+accepted and converted to the same in-memory arrays at load time.
+"""
+
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+# ============================================================================
+# Binary Layout
+# ============================================================================
+
+STORE_MAGIC = b"HSS1"
+HEADER_FORMAT = "<4sI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 8
+
+
+def write_string_store(mapping: Dict[int, str], path: Path) -> None:
+    """
+    Write a seq -> string mapping in the indexed store format.
+
+    Args:
+        mapping: Sequence IDs mapped to their strings
+        path: Output file path
+    """
+    with StringStoreWriter(path) as writer:
+        for seq, text in sorted(mapping.items()):
+            writer.add(seq, text)
+
+
+class StringStoreWriter:
+    """
+    Write a store incrementally, without holding the strings in memory.
+
+    Strings must be added in ascending seq order. The index columns are
+    kept in memory (8 bytes per entry) and the heap is spooled to a
+    temporary file; the store is written when the writer is closed, and
+    not at all if the ``with`` block raises.
+
+    Args:
+        path: Output file path
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._seqs = array('I')
+        self._offsets = array('I', [0])
+        self._heap = tempfile.TemporaryFile()
+        self._heap_size = 0
+
+    def __enter__(self) -> 'StringStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._heap.close()
+
+    def __len__(self) -> int:
+        return len(self._seqs)
+
+    def add(self, seq: int, text: str) -> None:
+        """Append the string for ``seq``, which must exceed every seq added so far."""
+        if self._seqs and seq <= self._seqs[-1]:
+            raise ValueError(f"seq {seq} added out of order (after {self._seqs[-1]})")
+        data = text.encode('utf-8')
+        self._heap.write(data)
+        self._heap_size += len(data)
+        self._seqs.append(seq)
+        self._offsets.append(self._heap_size)
+
+    def close(self) -> None:
+        """Write the store file."""
+        if self._heap.closed:
+            return
+        seqs, offsets = self._seqs, self._offsets
+        if sys.byteorder != 'little':
+            seqs.byteswap()
+            offsets.byteswap()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, STORE_MAGIC, len(seqs)))
+            f.write(seqs.tobytes())
+            f.write(offsets.tobytes())
+            self._heap.seek(0)
+            shutil.copyfileobj(self._heap, f)
+        self._heap.close()
+
+
+def _read_legacy(data) -> Tuple[array, array, bytes]:
+    """Convert a legacy count/seq/len/text file into index arrays."""
+    count = struct.unpack_from('<I', data, 0)[0]
+    records = []
+    pos = 4
+    for _ in range(count):
+        seq, text_len = struct.unpack_from('<IH', data, pos)
+        pos += 6
+        records.append((seq, bytes(data[pos:pos + text_len])))
+        pos += text_len
+    records.sort(key=lambda r: r[0])
+
+    seqs = array('I', (seq for seq, _ in records))
+    offsets = array('I', [0])
+    heap = bytearray()
+    for _, text in records:
+        heap += text
+        offsets.append(len(heap))
+    return seqs, offsets, bytes(heap)
+
+
+# ============================================================================
+# String Store
+# ============================================================================
+
+class StringStore:
+    """
+    Read-only seq -> string mapping backed by a memory-mapped file.
+
+    Supports the read side of the dict protocol (``get``, ``in``, ``[]``,
+    ``len``, ``items``) so it can stand in for the old dict tables.
+    """
+
+    __slots__ = ('_mmap', '_seqs', '_offsets', '_heap')
+
+    def __init__(self, seqs=None, offsets=None, heap=b'', mm: Optional[mmap.mmap] = None):
+        self._mmap = mm
+        self._seqs = seqs if seqs is not None else array('I')
+        self._offsets = offsets if offsets is not None else array('I', [0])
+        self._heap = heap
+
+    @classmethod
+    def empty(cls) -> 'StringStore':
+        """Create an empty store."""
+        return cls()
+
+    @classmethod
+    def open(cls, path: Path) -> 'StringStore':
+        """
+        Open a store file.
+
+        Files in the indexed format are memory-mapped; legacy files are
+        read and converted in memory.
+
+        Args:
+            path: Path to the store file
+
+        Returns:
+            The opened StringStore
+        """
+        with open(path, 'rb') as f:
+            if path.stat().st_size == 0:
+                return cls.empty()
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mm[:4] != STORE_MAGIC:
+            try:
+                seqs, offsets, heap = _read_legacy(mm)
+            finally:
+                mm.close()
+            return cls(seqs, offsets, heap)
+
+        _, count = struct.unpack_from(HEADER_FORMAT, mm, 0)
+        view = memoryview(mm)
+        seqs_end = HEADER_SIZE + 4 * count
+        offsets_end = seqs_end + 4 * (count + 1)
+
+        if sys.byteorder == 'little':
+            seqs = view[HEADER_SIZE:seqs_end].cast('I')
+            offsets = view[seqs_end:offsets_end].cast('I')
+        else:
+            seqs = array('I', view[HEADER_SIZE:seqs_end])
+            offsets = array('I', view[seqs_end:offsets_end])
+            seqs.byteswap()
+            offsets.byteswap()
+
+        return cls(seqs, offsets, view[offsets_end:], mm)
+
+    def close(self) -> None:
+        """Release the memory map, if any."""
+        mm = self._mmap
+        if mm is None:
+            return
+        for view in (self._seqs, self._offsets, self._heap):
+            if isinstance(view, memoryview):
+                view.release()
+        self._seqs = array('I')
+        self._offsets = array('I', [0])
+        self._heap = b''
+        self._mmap = None
+        mm.close()
+
+    def _index(self, seq: int) -> int:
+        """Get the row index of a seq, or -1 if absent."""
+        seqs = self._seqs
+        i = bisect_left(seqs, seq)
+        if i < len(seqs) and seqs[i] == seq:
+            return i
+        return -1
+
+    def _text(self, i: int) -> str:
+        offsets = self._offsets
+        return str(self._heap[offsets[i]:offsets[i + 1]], 'utf-8')
+
+    def get(self, seq: int, default: Optional[str] = None) -> Optional[str]:
+        """Get the string for a seq, or ``default`` if absent."""
+        i = self._index(seq)
+        if i < 0:
+            return default
+        return self._text(i)
+
+    def __getitem__(self, seq: int) -> str:
+        i = self._index(seq)
+        if i < 0:
+            raise KeyError(seq)
+        return self._text(i)
+
+    def __contains__(self, seq: int) -> bool:
+        return self._index(seq) >= 0
+
+    def __len__(self) -> int:
+        return len(self._seqs)
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        """Iterate over (seq, string) pairs in seq order."""
+        for i, seq in enumerate(self._seqs):
+            yield seq, self._text(i)
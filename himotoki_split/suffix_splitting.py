@@ -16,9 +16,14 @@ The approach uses dictionary lookups to verify that the base word exists
 before splitting.
 """
 
-from typing import List, Tuple, Optional, Set
+from typing import TYPE_CHECKING, List, Tuple, Optional, Set
 from dataclasses import dataclass
 
+from himotoki_split.rules import SurfaceTrie, rewrite_once, rewrite_to_fixpoint
+
+if TYPE_CHECKING:
+    from himotoki_split.dictionary import Dictionary
+
 # =============================================================================
 # Splitting Rules Configuration
 # =============================================================================
@@ -165,25 +170,30 @@ YOU_DA_SPLIT_WORDS = frozenset([
 # Dictionary-based validation
 # =============================================================================
 
-def word_exists_in_dict(word: str) -> bool:
-    """Check if a word exists in the dictionary."""
-    from himotoki_split.dictionary import lookup, load_dictionary
-    load_dictionary()
-    entries = lookup(word)
-    return len(entries) > 0
+def word_exists_in_dict(word: str, dictionary: Optional['Dictionary'] = None) -> bool:
+    """Check if a word exists in the dictionary (default dictionary if None)."""
+    if dictionary is None:
+        from himotoki_split.dictionary import get_default_dictionary
+        dictionary = get_default_dictionary()
+    return dictionary.contains(word)
 
 
 # =============================================================================
 # Splitting Logic
 # =============================================================================
 
-def should_split_particle(word: str, particle: str) -> bool:
+def should_split_particle(
+    word: str,
+    particle: str,
+    dictionary: Optional['Dictionary'] = None,
+) -> bool:
     """
     Determine if a particle should be split from the end of a word.
     
     Args:
         word: The full word (e.g., '何を')
         particle: The particle at the end (e.g., 'を')
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         True if the particle should be split off
@@ -209,7 +219,7 @@ def should_split_particle(word: str, particle: str) -> bool:
             return False
     
     # Verify base exists in dictionary (valid word)
-    if not word_exists_in_dict(base):
+    if not word_exists_in_dict(base, dictionary):
         return False
     
     # All checks passed - split the particle
@@ -263,12 +273,13 @@ def should_split_conditional(word: str) -> bool:
     return False
 
 
-def should_split_explanatory_n(word: str) -> bool:
+def should_split_explanatory_n(word: str, dictionary: Optional['Dictionary'] = None) -> bool:
     """
     Determine if explanatory ん should be split from the word.
     
     Args:
         word: The full word (e.g., 'いいん')
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         True if ん should be split off
@@ -287,7 +298,7 @@ def should_split_explanatory_n(word: str) -> bool:
     # Check if base ends with a valid pattern for explanatory ん
     if len(base) > 0 and base[-1] in N_SPLIT_BASE_ENDINGS:
         # Verify the base exists in dictionary
-        if word_exists_in_dict(base):
+        if word_exists_in_dict(base, dictionary):
             return True
     
     return False
@@ -324,7 +335,10 @@ COMPOUND_VERB_SPLITS = {
     'と言われている': ['と', '言われている'],
 }
 
-def should_split_prefix_particle(word: str) -> Optional[List[str]]:
+def should_split_prefix_particle(
+    word: str,
+    dictionary: Optional['Dictionary'] = None,
+) -> Optional[List[str]]:
     """
     Check if a word should be split at a prefix particle.
     
@@ -332,6 +346,7 @@ def should_split_prefix_particle(word: str) -> Optional[List[str]]:
     
     Args:
         word: The full word
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         List of parts if should split, None otherwise
@@ -342,25 +357,25 @@ def should_split_prefix_particle(word: str) -> Optional[List[str]]:
     # Check に prefix
     if word.startswith('に') and len(word) > 1:
         rest = word[1:]
-        if word_exists_in_dict(rest):
+        if word_exists_in_dict(rest, dictionary):
             return ['に', rest]
     
     # Check と prefix
     if word.startswith('と') and len(word) > 1:
         rest = word[1:]
-        if word_exists_in_dict(rest):
+        if word_exists_in_dict(rest, dictionary):
             return ['と', rest]
     
     # Check で prefix
     if word.startswith('で') and len(word) > 1:
         rest = word[1:]
-        if word_exists_in_dict(rest):
+        if word_exists_in_dict(rest, dictionary):
             return ['で', rest]
     
     # Check ん prefix
     if word.startswith('ん') and len(word) > 1:
         rest = word[1:]
-        if word_exists_in_dict(rest):
+        if word_exists_in_dict(rest, dictionary):
             return ['ん', rest]
     
     return None
@@ -379,7 +394,10 @@ NO_INTERNAL_SPLIT_COMPOUNDS = frozenset([
     # Other common を compounds that stay merged
 ])
 
-def split_internal_particles(word: str) -> Optional[List[str]]:
+def split_internal_particles(
+    word: str,
+    dictionary: Optional['Dictionary'] = None,
+) -> Optional[List[str]]:
     """
     Split a word at internal particles.
     
@@ -387,6 +405,7 @@ def split_internal_particles(word: str) -> Optional[List[str]]:
     
     Args:
         word: The full word
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         List of parts if should split, None otherwise
@@ -409,20 +428,26 @@ def split_internal_particles(word: str) -> Optional[List[str]]:
                 
                 # Both parts must exist in dictionary
                 if len(before) >= 1 and len(after) >= 2:
-                    if word_exists_in_dict(before) and word_exists_in_dict(after):
+                    if (word_exists_in_dict(before, dictionary)
+                            and word_exists_in_dict(after, dictionary)):
                         # Recursively split both parts
-                        result = split_token(before) + [particle] + split_token(after)
+                        result = (
+                            split_token(before, dictionary)
+                            + [particle]
+                            + split_token(after, dictionary)
+                        )
                         return result
     
     return None
 
 
-def split_token(surface: str) -> List[str]:
+def split_token(surface: str, dictionary: Optional['Dictionary'] = None) -> List[str]:
     """
     Split a token into components based on suffix rules.
     
     Args:
         surface: The token surface text
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         List of split components, or [surface] if no split needed
@@ -438,39 +463,39 @@ def split_token(surface: str) -> List[str]:
     
     # Priority 0: Check for PREFIX particle splitting (leftmost)
     # Patterns like につきまして → に + つきまして
-    prefix_splits = should_split_prefix_particle(remaining)
+    prefix_splits = should_split_prefix_particle(remaining, dictionary)
     if prefix_splits:
         return prefix_splits
     
     # Priority 0.5: Check for INTERNAL particle splitting
     # Patterns like 体を壊す → 体 + を + 壊す
-    internal_splits = split_internal_particles(remaining)
+    internal_splits = split_internal_particles(remaining, dictionary)
     if internal_splits:
         return internal_splits
     
     # Priority 1: Check for particle splitting (rightmost first)
     for particle in SPLIT_PARTICLES:
         if remaining.endswith(particle) and len(remaining) > len(particle):
-            if should_split_particle(remaining, particle):
+            if should_split_particle(remaining, particle, dictionary):
                 base = remaining[:-len(particle)]
                 # Recursively check if base needs further splitting
-                return split_token(base) + [particle]
+                return split_token(base, dictionary) + [particle]
     
     # Priority 2: Check for copula だ/です splitting
     should_split, copula = should_split_copula(remaining)
     if should_split:
         base = remaining[:-len(copula)]
-        return split_token(base) + [copula]
+        return split_token(base, dictionary) + [copula]
     
     # Priority 3: Check for conditional ば splitting
     if should_split_conditional(remaining):
         base = remaining[:-1]
-        return split_token(base) + ['ば']
+        return split_token(base, dictionary) + ['ば']
     
     # Priority 4: Check for explanatory ん splitting
-    if should_split_explanatory_n(remaining):
+    if should_split_explanatory_n(remaining, dictionary):
         base = remaining[:-1]
-        return split_token(base) + ['ん']
+        return split_token(base, dictionary) + ['ん']
     
     return [remaining]
 
@@ -1013,7 +1038,12 @@ SURU_FORMS = frozenset([
     'されていました', 'されていない', 'されていなかった',
 ])
 
-def post_process_splits(tokens: List) -> List:
+# Compiled forms of the pattern tables (first listed pattern wins)
+_SUBSTITUTION_RULES = SurfaceTrie(TOKEN_SUBSTITUTIONS.items())
+_MERGE_RULES = SurfaceTrie(MERGE_PATTERNS)
+
+
+def post_process_splits(tokens: List, dictionary: Optional['Dictionary'] = None) -> List:
     """
     Post-process tokens to apply suffix splitting rules.
     
@@ -1022,12 +1052,17 @@ def post_process_splits(tokens: List) -> List:
     
     Args:
         tokens: List of Token objects from the tokenizer
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         List of Token objects with suffix splitting applied
     """
     from himotoki_split import Token
-    from himotoki_split.dictionary import lookup
+    from himotoki_split.dictionary import get_default_dictionary
+    
+    if dictionary is None:
+        dictionary = get_default_dictionary()
+    lookup = dictionary.lookup
     
     result = []
     
@@ -1035,7 +1070,7 @@ def post_process_splits(tokens: List) -> List:
         surface = token.surface
         
         # Try to split the token
-        parts = split_token(surface)
+        parts = split_token(surface, dictionary)
         
         if len(parts) == 1:
             # No splitting needed
@@ -1071,117 +1106,102 @@ def post_process_splits(tokens: List) -> List:
                 current_pos += len(part)
     
     # Apply token substitutions first (fix wrong tokenizations)
-    result = apply_token_substitutions(result)
-    
-    # Apply merge patterns iteratively until no more changes
-    prev_len = -1
-    while len(result) != prev_len:
-        prev_len = len(result)
-        result = apply_merge_patterns(result)
+    result = apply_token_substitutions(result, dictionary)
     
-    return result
+    # Apply merge patterns (merged tokens are re-merged with their neighbours)
+    return apply_merge_patterns(result, dictionary)
 
 
-def apply_token_substitutions(tokens: List) -> List:
+def apply_token_substitutions(tokens: List, dictionary: Optional['Dictionary'] = None) -> List:
     """
     Apply token substitutions to fix wrong tokenizations.
     
     Args:
         tokens: List of Token objects
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         List of Token objects with substitutions applied
     """
     from himotoki_split import Token
-    from himotoki_split.dictionary import lookup
+    from himotoki_split.dictionary import get_default_dictionary
+    
+    if dictionary is None:
+        dictionary = get_default_dictionary()
+    lookup = dictionary.lookup
     
     if len(tokens) == 0:
         return tokens
     
-    result = []
-    i = 0
-    
-    while i < len(tokens):
-        substituted = False
-        
-        # Check each substitution pattern
-        for pattern, replacement in TOKEN_SUBSTITUTIONS.items():
-            pattern_len = len(pattern)
-            if i + pattern_len <= len(tokens):
-                # Check if tokens match the pattern
-                match = True
-                for j, p in enumerate(pattern):
-                    if tokens[i + j].surface != p:
-                        match = False
-                        break
-                
-                if match:
-                    # Substitute these tokens with the replacement
-                    start_pos = tokens[i].start
-                    for part in replacement:
-                        entries = lookup(part)
-                        if entries:
-                            entry = entries[0]
-                            new_token = Token(
-                                surface=part,
-                                reading=part,
-                                pos=entry.pos_name if hasattr(entry, 'pos_name') else 'unk',
-                                base_form=part,
-                                base_form_id=entry.seq if hasattr(entry, 'seq') else 0,
-                                start=start_pos,
-                                end=start_pos + len(part),
-                            )
-                        else:
-                            new_token = Token(
-                                surface=part,
-                                reading=part,
-                                pos='unk',
-                                base_form=part,
-                                base_form_id=0,
-                                start=start_pos,
-                                end=start_pos + len(part),
-                            )
-                        result.append(new_token)
-                        start_pos += len(part)
-                    i += pattern_len
-                    substituted = True
-                    break
+    def substitute(window):
+        hit = _SUBSTITUTION_RULES.match(window)
+        if hit is None:
+            return None
         
-        if not substituted:
-            result.append(tokens[i])
-            i += 1
-    
-    return result
+        # Substitute these tokens with the replacement
+        pattern_len, replacement = hit
+        start_pos = window[0].start
+        new_tokens = []
+        for part in replacement:
+            entries = lookup(part)
+            if entries:
+                entry = entries[0]
+                new_token = Token(
+                    surface=part,
+                    reading=part,
+                    pos=entry.pos_name if hasattr(entry, 'pos_name') else 'unk',
+                    base_form=part,
+                    base_form_id=entry.seq if hasattr(entry, 'seq') else 0,
+                    start=start_pos,
+                    end=start_pos + len(part),
+                )
+            else:
+                new_token = Token(
+                    surface=part,
+                    reading=part,
+                    pos='unk',
+                    base_form=part,
+                    base_form_id=0,
+                    start=start_pos,
+                    end=start_pos + len(part),
+                )
+            new_tokens.append(new_token)
+            start_pos += len(part)
+        return pattern_len, new_tokens
+    
+    return rewrite_once(
+        tokens, substitute, _SUBSTITUTION_RULES.max_length, 'token_substitutions'
+    )
 
 
-def apply_merge_patterns(tokens: List) -> List:
+def apply_merge_patterns(tokens: List, dictionary: Optional['Dictionary'] = None) -> List:
     """
     Merge consecutive tokens that should be kept together.
     
     Args:
         tokens: List of Token objects
+        dictionary: Dictionary to validate against (default if None)
     
     Returns:
         List of Token objects with merging applied
     """
     from himotoki_split import Token
-    from himotoki_split.dictionary import lookup, get_pos_name
+    from himotoki_split.dictionary import get_default_dictionary, get_pos_name
+    
+    if dictionary is None:
+        dictionary = get_default_dictionary()
+    lookup = dictionary.lookup
     
     if len(tokens) < 2:
         return tokens
     
-    result = []
-    i = 0
-    
-    while i < len(tokens):
-        merged = False
+    def merge(window):
+        current = window[0]
+        next_token = window[1] if len(window) > 1 else None
         
         # Check verb stem + たい (want to) forms
         # Verb stems have conj_type=13 (continuative), followed by たい
-        if i + 1 < len(tokens):
-            current = tokens[i]
-            next_token = tokens[i + 1]
-            
+        if len(window) > 1:
             # Check if current is a verb stem (continuative form)
             # and next is たい (adjective meaning "want to")
             if next_token.surface == 'たい':
@@ -1207,12 +1227,10 @@ def apply_merge_patterns(tokens: List) -> List:
                     end_pos = next_token.end
                     
                     # Look up base form of the verb
-                    from himotoki_split.dictionary import lookup
                     base_entries = lookup(current.surface)
-                    base_form = current.surface + 'る'  # Default for ichidan
                     base_id = base_seq
                     
-                    # Find the base form text
+                    # Find the base form id
                     for be in base_entries:
                         if be.conj_type == 13:
                             base_id = be.base_seq if be.base_seq else be.seq
@@ -1222,14 +1240,12 @@ def apply_merge_patterns(tokens: List) -> List:
                         surface=merged_form,
                         reading=merged_reading,
                         pos=verb_pos,  # Preserve the verb's POS (v1, v5k, etc.)
-                        base_form=merged_form,
+                        base_form=current.base_form,
                         base_form_id=base_id,
                         start=start_pos,
                         end=end_pos,
                     )
-                    result.append(new_token)
-                    i += 2
-                    continue
+                    return 2, [new_token]
             
             # Check for verb stem + たかった (want to + past)
             if next_token.surface == 'たかった':
@@ -1253,14 +1269,12 @@ def apply_merge_patterns(tokens: List) -> List:
                         surface=merged_form,
                         reading=merged_reading,
                         pos=verb_pos,
-                        base_form=merged_form,
+                        base_form=current.base_form,
                         base_form_id=base_id,
                         start=start_pos,
                         end=end_pos,
                     )
-                    result.append(new_token)
-                    i += 2
-                    continue
+                    return 2, [new_token]
             
             # Check for verb stem + たくない (want to + negative)
             if next_token.surface == 'たくない':
@@ -1284,25 +1298,20 @@ def apply_merge_patterns(tokens: List) -> List:
                         surface=merged_form,
                         reading=merged_reading,
                         pos=verb_pos,
-                        base_form=merged_form,
+                        base_form=current.base_form,
                         base_form_id=base_id,
                         start=start_pos,
                         end=end_pos,
                     )
-                    result.append(new_token)
-                    i += 2
-                    continue
+                    return 2, [new_token]
         
         # Check suru-verb compounds first (noun + する form)
-        if i + 1 < len(tokens):
-            current_surface = tokens[i].surface
-            next_surface = tokens[i + 1].surface
-            
-            if current_surface in SURU_COMPOUND_NOUNS and next_surface in SURU_FORMS:
+        if len(window) > 1:
+            if current.surface in SURU_COMPOUND_NOUNS and next_token.surface in SURU_FORMS:
                 # Merge suru-verb compound
-                merged_form = current_surface + next_surface
-                start_pos = tokens[i].start
-                end_pos = tokens[i + 1].end
+                merged_form = current.surface + next_token.surface
+                start_pos = current.start
+                end_pos = next_token.end
                 
                 entries = lookup(merged_form)
                 if entries:
@@ -1326,31 +1335,26 @@ def apply_merge_patterns(tokens: List) -> List:
                         start=start_pos,
                         end=end_pos,
                     )
-                result.append(new_token)
-                i += 2
-                continue
+                return 2, [new_token]
         
         # Check te-form extensions (verb ending in て + いれば/いたら etc.)
         # Only merge if it's a suru-verb compound form (e.g., 勉強して + いれば)
-        if i + 1 < len(tokens):
-            current_surface = tokens[i].surface
-            next_surface = tokens[i + 1].surface
-            
-            if current_surface.endswith('て') and next_surface in TE_FORM_EXTENSIONS:
+        if len(window) > 1:
+            if current.surface.endswith('て') and next_token.surface in TE_FORM_EXTENSIONS:
                 # Check if this is a suru-verb compound (ends in して after noun)
                 # e.g., 勉強して, 短縮して, etc.
                 is_suru_compound = False
-                if current_surface.endswith('して') and len(current_surface) > 2:
+                if current.surface.endswith('して') and len(current.surface) > 2:
                     # Check if base is a suru compound noun
-                    base = current_surface[:-2]
+                    base = current.surface[:-2]
                     if base in SURU_COMPOUND_NOUNS:
                         is_suru_compound = True
                 
                 if is_suru_compound:
                     # Merge te-form + extension
-                    merged_form = current_surface + next_surface
-                    start_pos = tokens[i].start
-                    end_pos = tokens[i + 1].end
+                    merged_form = current.surface + next_token.surface
+                    start_pos = current.start
+                    end_pos = next_token.end
                     
                     entries = lookup(merged_form)
                     if entries:
@@ -1374,55 +1378,42 @@ def apply_merge_patterns(tokens: List) -> List:
                             start=start_pos,
                             end=end_pos,
                         )
-                    result.append(new_token)
-                    i += 2
-                    continue
+                    return 2, [new_token]
         
         # Check each merge pattern
-        for pattern, merged_form in MERGE_PATTERNS:
-            pattern_len = len(pattern)
-            if i + pattern_len <= len(tokens):
-                # Check if tokens match the pattern
-                match = True
-                for j, p in enumerate(pattern):
-                    if tokens[i + j].surface != p:
-                        match = False
-                        break
-                
-                if match:
-                    # Merge these tokens
-                    start_pos = tokens[i].start
-                    end_pos = tokens[i + pattern_len - 1].end
-                    
-                    entries = lookup(merged_form)
-                    if entries:
-                        entry = entries[0]
-                        new_token = Token(
-                            surface=merged_form,
-                            reading=merged_form,
-                            pos=entry.pos_name if hasattr(entry, 'pos_name') else 'unk',
-                            base_form=merged_form,
-                            base_form_id=entry.seq if hasattr(entry, 'seq') else 0,
-                            start=start_pos,
-                            end=end_pos,
-                        )
-                    else:
-                        new_token = Token(
-                            surface=merged_form,
-                            reading=merged_form,
-                            pos='unk',
-                            base_form=merged_form,
-                            base_form_id=0,
-                            start=start_pos,
-                            end=end_pos,
-                        )
-                    result.append(new_token)
-                    i += pattern_len
-                    merged = True
-                    break
+        hit = _MERGE_RULES.match(window)
+        if hit is None:
+            return None
         
-        if not merged:
-            result.append(tokens[i])
-            i += 1
-    
-    return result
+        # Merge these tokens
+        pattern_len, merged_form = hit
+        start_pos = current.start
+        end_pos = window[pattern_len - 1].end
+        
+        entries = lookup(merged_form)
+        if entries:
+            entry = entries[0]
+            new_token = Token(
+                surface=merged_form,
+                reading=merged_form,
+                pos=entry.pos_name if hasattr(entry, 'pos_name') else 'unk',
+                base_form=merged_form,
+                base_form_id=entry.seq if hasattr(entry, 'seq') else 0,
+                start=start_pos,
+                end=end_pos,
+            )
+        else:
+            new_token = Token(
+                surface=merged_form,
+                reading=merged_form,
+                pos='unk',
+                base_form=merged_form,
+                base_form_id=0,
+                start=start_pos,
+                end=end_pos,
+            )
+        return pattern_len, [new_token]
+    
+    return rewrite_to_fixpoint(
+        tokens, merge, max(2, _MERGE_RULES.max_length), 'merge_patterns'
+    )
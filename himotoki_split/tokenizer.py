@@ -4,11 +4,14 @@ Tokenizer module for himotoki-split.
 This module implements the core tokenization logic using the binary dictionary.
 """
 
-from typing import List, Tuple, Optional, Dict, Any
+import heapq
+from time import perf_counter
+from typing import List, Tuple, Optional, Dict, Any, Callable
 from dataclasses import dataclass
 
 from himotoki_split.dictionary import (
-    load_dictionary, 
+    Dictionary,
+    get_default_dictionary,
     lookup,
     has_prefix,
     contains,
@@ -16,12 +19,16 @@ from himotoki_split.dictionary import (
     get_pos_name,
 )
 from himotoki_split.characters import (
-    is_kana, is_katakana, is_hiragana, has_kanji, as_hiragana,
-    get_char_class, KANA_CHARS, mora_length,
+    is_kana, as_hiragana, KANA_CHARS,
+    TextClasses, MODIFIER, SOKUON, KANA, KATAKANA, char_flags,
 )
 from himotoki_split.splits import (
     should_split, calculate_split_score_adjustment, get_split_score_bonus,
 )
+from himotoki_split.rules import SurfaceTrie, rewrite_to_fixpoint
+from himotoki_split.instrumentation import CallStats, start_call, finish_call
+from himotoki_split.cancellation import current_token, checkpoint
+from himotoki_split.segment_cache import get_segment_cache
 
 
 # =============================================================================
@@ -31,6 +38,14 @@ from himotoki_split.splits import (
 # Maximum word length to consider
 MAX_WORD_LENGTH = 30
 
+# Longest punctuation-free run searched as a single lattice; longer runs
+# are tokenized in overlapping windows (see _tokenize_long_run)
+MAX_SEGMENT_LENGTH = 256
+
+# Characters at the end of each window that are searched but not committed,
+# so words crossing the window edge are seen whole by the next window
+CHUNK_OVERLAP = 2 * MAX_WORD_LENGTH
+
 # Character classes that are modifiers (can't start words)
 MODIFIER_CLASSES = frozenset(['+a', '+i', '+u', '+e', '+o', '+ya', '+yu', '+yo', '+wa', 'long_vowel'])
 
@@ -47,13 +62,18 @@ class Segment:
     end: int
     entry: WordEntry
     score: float
+    dictionary: Optional[Dictionary] = None  # Source dictionary (None = default)
+    
+    def _dictionary(self) -> Dictionary:
+        dictionary = self.dictionary
+        return dictionary if dictionary is not None else get_default_dictionary()
     
     @property
     def reading(self) -> str:
-        """Get reading (for now, same as surface for kana)."""
+        """Get the kana reading of the surface form."""
         if is_kana(self.surface):
             return as_hiragana(self.surface)
-        return self.surface  # TODO: Get proper reading
+        return self._dictionary().get_kana_reading(self.entry.seq) or self.surface
     
     @property
     def pos(self) -> str:
@@ -62,17 +82,46 @@ class Segment:
     @property
     def base_form(self) -> str:
         """Get base form text."""
-        # For now, return surface if root, otherwise look up
         if self.entry.is_root:
             return self.surface
-        # TODO: Look up base form from base_forms.bin
-        return self.surface
+        return self._dictionary().get_base_form(self.entry.base_form_id) or self.surface
     
     @property
     def base_form_id(self) -> int:
         return self.entry.base_form_id
 
 
+@dataclass(slots=True)
+class Lattice:
+    """
+    Word lattice over a piece of text.
+    
+    Edges are bucketed by start offset: ``edges[i]`` holds the best-scoring
+    Segment for every dictionary span starting at position ``i``, ordered
+    by end offset. Nodes are the text positions ``0..length``.
+    """
+    length: int
+    edges: List[List[Segment]]
+    
+    @property
+    def edge_count(self) -> int:
+        """Total number of edges in the lattice."""
+        return sum(len(bucket) for bucket in self.edges)
+    
+    @classmethod
+    def from_matches(
+        cls,
+        matches: Dict[Tuple[int, int], List[Segment]],
+        text_length: int,
+    ) -> 'Lattice':
+        """Build a lattice from a ``find_all_matches`` result."""
+        edges: List[List[Segment]] = [[] for _ in range(text_length)]
+        for (start, end), segments in sorted(matches.items()):
+            if segments:
+                edges[start].append(max(segments, key=lambda s: s.score))
+        return cls(length=text_length, edges=edges)
+
+
 # =============================================================================
 # Particles and Scoring Constants
 # =============================================================================
@@ -228,7 +277,13 @@ def get_length_coeff(mora_len: int, coeff_type: str = 'strong') -> float:
         return mora_len * mora_len * 3
 
 
-def calculate_segment_score(surface: str, entry: 'WordEntry') -> float:
+def calculate_segment_score(
+    surface: str,
+    entry: 'WordEntry',
+    exists: Optional[Callable[[str], bool]] = None,
+    classes: Optional[TextClasses] = None,
+    start: int = 0,
+) -> float:
     """
     Calculate score for a segment using KPCL-style scoring.
     
@@ -239,6 +294,17 @@ def calculate_segment_score(surface: str, entry: 'WordEntry') -> float:
     2. Length multiplier based on character type
     3. Conjugation bonuses
     4. Split adjustments for compound words
+    
+    The score depends only on the surface and its record, so the
+    dictionary build stores it with each record (see ``segment_score``).
+    
+    Args:
+        surface: The matched surface form
+        entry: The dictionary record
+        exists: Predicate telling whether a surface is in the dictionary.
+            Defaults to the loaded dictionary; the build passes its own.
+        classes: Character classes of the text the surface was found in,
+            with ``start`` its offset there. Avoids rescanning the surface.
     """
     cost = entry.cost
     length = len(surface)
@@ -246,11 +312,17 @@ def calculate_segment_score(surface: str, entry: 'WordEntry') -> float:
     conj_type = entry.conj_type
     seq = entry.seq
     
+    if classes is None:
+        classes = TextClasses(surface)
+        start = 0
+    end = start + length
+    kanji_p = classes.has_kanji(start, end)
+    
     # === Base Score Components (KPCL style) ===
     base_score = 5.0  # Minimum base
     
     # kanji_p: Has kanji characters -> +5
-    if has_kanji(surface):
+    if kanji_p:
         base_score += 5.0
     
     # common_p: Commonness based on cost (lower cost = more common)
@@ -280,15 +352,12 @@ def calculate_segment_score(surface: str, entry: 'WordEntry') -> float:
         base_score += 5.0
     
     # === Length Multiplier (character-type dependent) ===
-    try:
-        m_len = mora_length(surface)
-    except:
-        m_len = length
+    m_len = classes.mora_length(start, end)
     
     # Choose coefficient type based on character composition
-    if has_kanji(surface) or is_katakana(surface):
+    if kanji_p or classes.is_katakana(start, end):
         coeff_type = 'strong'
-    elif is_hiragana(surface):
+    elif classes.is_hiragana(start, end):
         # Pure hiragana - use weak unless it's a suffix/particle context
         if pos_id in PARTICLE_POS_IDS or conj_type > 0:
             coeff_type = 'tail'
@@ -347,88 +416,147 @@ def calculate_segment_score(surface: str, entry: 'WordEntry') -> float:
         last_char = surface[-1]
         if last_char in SINGLE_CHAR_PARTICLES:
             base_word = surface[:-1]
-            from himotoki_split.dictionary import contains
-            if contains(base_word):
+            if (exists or contains)(base_word):
                 length_score -= 30.0
     
     return length_score
 
 
+def segment_score(
+    surface: str,
+    entry: 'WordEntry',
+    exists: Optional[Callable[[str], bool]] = None,
+    classes: Optional[TextClasses] = None,
+    start: int = 0,
+) -> float:
+    """
+    Get the score of a segment.
+    
+    Uses the score stored in the dictionary record when present and falls
+    back to computing it for dictionaries in the legacy record format.
+    """
+    if entry.score is not None:
+        return entry.score
+    return calculate_segment_score(surface, entry, exists, classes, start)
+
+
 # =============================================================================
 # Find Word Matches
 # =============================================================================
 
-def find_sticky_positions(text: str) -> List[int]:
+def find_sticky_positions(text: str, classes: Optional[TextClasses] = None) -> List[int]:
     """
     Find positions where words cannot start or end.
     Small kana (っ, ゃ, etc.) can't start words and sokuon can't end words.
+    
+    Args:
+        text: The text to scan
+        classes: Precomputed character classes of the text, if available
     """
+    if classes is None:
+        classes = TextClasses(text)
+    
     sticky = []
+    last = len(text) - 1
     
-    for i, char in enumerate(text):
-        char_class = get_char_class(char)
+    for i, flags in enumerate(classes.flags):
+        if not flags & (MODIFIER | SOKUON):
+            continue
         
         # Modifiers (small kana, long vowel) can't start words
-        if char_class in MODIFIER_CLASSES:
+        if flags & MODIFIER:
             sticky.append(i)
         
         # Sokuon (っ) - word can't end here
-        if char_class == 'sokuon' and i < len(text) - 1:
+        if flags & SOKUON and i < last:
             sticky.append(i + 1)  # Next char can't be start of new word
     
     return sticky
 
 
-def find_all_matches(text: str) -> Dict[Tuple[int, int], List[Segment]]:
+def _iter_matches(text: str, dictionary: Optional[Dictionary] = None):
     """
-    Find all word matches in the text.
+    Yield ``(start, end, segments)`` for every dictionary word in the text.
     
-    Returns:
-        Dict mapping (start, end) positions to list of matching Segments
+    Spans are produced in order of start offset, then end offset.
     """
-    matches: Dict[Tuple[int, int], List[Segment]] = {}
-    sticky = set(find_sticky_positions(text))
+    classes = TextClasses(text)
+    sticky = set(find_sticky_positions(text, classes))
     text_len = len(text)
     
-    # Ensure dictionary is loaded
-    load_dictionary()
+    # Ensure dictionary is loaded, and bind its methods once for the loop
+    if dictionary is None:
+        dictionary = get_default_dictionary()
+    dictionary.open()
+    lookup_prefixes = dictionary.lookup_prefixes
+    exists = dictionary.contains
+    cancel = current_token()
     
     for start in range(text_len):
         # Skip if this position can't start a word
         if start in sticky:
             continue
+        if cancel is not None:
+            cancel.check()
         
-        # Try all possible lengths
-        for end in range(start + 1, min(start + MAX_WORD_LENGTH + 1, text_len + 1)):
+        # One common-prefix search yields every word starting here
+        window = text[start:start + MAX_WORD_LENGTH]
+        for surface, entries in lookup_prefixes(window):
+            end = start + len(surface)
+            
             # Skip if this position can't end a word
             if end in sticky:
                 continue
             
-            substring = text[start:end]
-            
-            # Check if any words have this as prefix (early termination)
-            if not has_prefix(substring):
-                break
-            
-            # Look up in dictionary
-            entries = lookup(substring)
-            if entries:
-                key = (start, end)
-                if key not in matches:
-                    matches[key] = []
-                
-                for entry in entries:
-                    score = calculate_segment_score(substring, entry)
-                    
-                    matches[key].append(Segment(
-                        surface=substring,
-                        start=start,
-                        end=end,
-                        entry=entry,
-                        score=score,
-                    ))
-    
-    return matches
+            yield start, end, [
+                Segment(
+                    surface=surface,
+                    start=start,
+                    end=end,
+                    entry=entry,
+                    score=segment_score(surface, entry, exists, classes, start),
+                    dictionary=dictionary,
+                )
+                for entry in entries
+            ]
+
+
+def find_all_matches(
+    text: str,
+    dictionary: Optional[Dictionary] = None,
+) -> Dict[Tuple[int, int], List[Segment]]:
+    """
+    Find all word matches in the text.
+    
+    Args:
+        text: The text to match
+        dictionary: Dictionary to use (default dictionary if None)
+    
+    Returns:
+        Dict mapping (start, end) positions to list of matching Segments
+    """
+    return {
+        (start, end): segments
+        for start, end, segments in _iter_matches(text, dictionary)
+    }
+
+
+def build_lattice(text: str, dictionary: Optional[Dictionary] = None) -> Lattice:
+    """
+    Build the word lattice for a piece of text.
+    
+    Only the best-scoring entry is kept for each (start, end) span, since
+    that is the only one the path search can ever choose.
+    
+    Args:
+        text: The text to build the lattice for
+        dictionary: Dictionary to use (default dictionary if None)
+    """
+    edges: List[List[Segment]] = [[] for _ in range(len(text))]
+    for start, _end, segments in _iter_matches(text, dictionary):
+        if segments:
+            edges[start].append(max(segments, key=lambda s: s.score))
+    return Lattice(length=len(text), edges=edges)
 
 
 # =============================================================================
@@ -439,17 +567,152 @@ def find_all_matches(text: str) -> Dict[Tuple[int, int], List[Segment]]:
 UNKNOWN_CHAR_PENALTY = -50.0
 
 
+def _viterbi_forward(
+    lattice: Lattice,
+    allow_gaps: bool = True,
+) -> Tuple[List[float], List[int], List[Optional[Segment]]]:
+    """
+    Run the Viterbi forward pass over a lattice.
+    
+    Returns per-node arrays ``(best, back_pos, back_seg)``: the best score
+    of any path from 0 to each node, the node it came from, and the edge
+    taken (None for a gap). Unreachable nodes keep ``-inf`` and ``-1``.
+    
+    When ``allow_gaps`` is set, a node no edge reaches is connected to the
+    nearest reachable node before it with UNKNOWN_CHAR_PENALTY per char.
+    """
+    length = lattice.length
+    edges = lattice.edges
+    neg_inf = float('-inf')
+    
+    best = [neg_inf] * (length + 1)
+    back_pos = [-1] * (length + 1)
+    back_seg: List[Optional[Segment]] = [None] * (length + 1)
+    best[0] = 0.0
+    last_reachable = 0
+    cancel = current_token()
+    
+    for pos in range(length + 1):
+        if cancel is not None:
+            cancel.check()
+        score = best[pos]
+        if score == neg_inf:
+            if not allow_gaps:
+                continue
+            # Gap/skip transition from the nearest reachable position
+            score = best[last_reachable] + UNKNOWN_CHAR_PENALTY * (pos - last_reachable)
+            best[pos] = score
+            back_pos[pos] = last_reachable
+        last_reachable = pos
+        
+        if pos == length:
+            break
+        
+        for seg in edges[pos]:
+            new_score = score + seg.score
+            end = seg.end
+            if new_score > best[end]:
+                best[end] = new_score
+                back_pos[end] = pos
+                back_seg[end] = seg
+    
+    return best, back_pos, back_seg
+
+
+def _backtrack(
+    back_pos: List[int],
+    back_seg: List[Optional[Segment]],
+    end: int,
+) -> List[Segment]:
+    """Reconstruct the best path ending at a node (gaps are omitted)."""
+    path = []
+    pos = end
+    while pos > 0:
+        seg = back_seg[pos]
+        if seg is not None:
+            path.append(seg)
+        pos = back_pos[pos]
+    path.reverse()
+    return path
+
+
+def _kbest_backward(
+    lattice: Lattice,
+    best: List[float],
+    back_pos: List[int],
+    back_seg: List[Optional[Segment]],
+    limit: int,
+) -> List[Tuple[List[Segment], float]]:
+    """
+    Enumerate the ``limit`` best distinct paths by backward A* search.
+    
+    The search starts at the end node and walks incoming edges towards 0.
+    The forward Viterbi scores are an exact heuristic for the remaining
+    prefix, so every node popped from the heap is on the next-best path
+    and complete paths come out in score order.
+    """
+    length = lattice.length
+    neg_inf = float('-inf')
+    
+    # Incoming edges per node: (prev_pos, segment or None for a gap, weight)
+    incoming: List[List[Tuple[int, Optional[Segment], float]]] = [
+        [] for _ in range(length + 1)
+    ]
+    for pos in range(length):
+        if best[pos] == neg_inf:
+            continue
+        for seg in lattice.edges[pos]:
+            incoming[seg.end].append((pos, seg, seg.score))
+    for pos in range(1, length + 1):
+        if back_seg[pos] is None and back_pos[pos] >= 0:
+            prev = back_pos[pos]
+            incoming[pos].append((prev, None, UNKNOWN_CHAR_PENALTY * (pos - prev)))
+    
+    # Heap entries: (-estimate, tiebreak, node, suffix_score, suffix)
+    # where suffix is a linked list (segment, rest) from node to the end.
+    counter = 0
+    heap = [(-best[length], counter, length, 0.0, None)]
+    results = []
+    cancel = current_token()
+    
+    while heap and len(results) < limit:
+        if cancel is not None:
+            cancel.check()
+        _, _, node, suffix_score, suffix = heapq.heappop(heap)
+        if node == 0:
+            path = []
+            while suffix is not None:
+                seg, suffix = suffix
+                if seg is not None:
+                    path.append(seg)
+            results.append((path, suffix_score))
+            continue
+        
+        for prev, seg, weight in incoming[node]:
+            score = suffix_score + weight
+            counter += 1
+            heapq.heappush(
+                heap, (-(best[prev] + score), counter, prev, score, (seg, suffix))
+            )
+    
+    return results
+
+
 def find_best_path(
-    matches: Dict[Tuple[int, int], List[Segment]],
+    matches,
     text_length: int,
     limit: int = 5,
     allow_gaps: bool = True,
 ) -> List[Tuple[List[Segment], float]]:
     """
-    Find the best segmentation path(s) using dynamic programming.
+    Find the best segmentation path(s) over the lattice.
+    
+    The single best path comes from a Viterbi pass linear in the number
+    of lattice edges. With ``limit`` > 1, a backward A* search over the
+    same lattice enumerates the ``limit`` best distinct segmentations.
     
     Args:
-        matches: Dict mapping (start, end) to list of Segments
+        matches: A Lattice, or a dict mapping (start, end) to Segments
         text_length: Total length of text
         limit: Maximum number of paths to return
         allow_gaps: If True, allow "unknown" segments for gaps in coverage
@@ -457,112 +720,23 @@ def find_best_path(
     Returns:
         List of (path, score) tuples, sorted by score descending
     """
-    if not matches:
-        return []
+    if isinstance(matches, Lattice):
+        lattice = matches
+    else:
+        lattice = Lattice.from_matches(matches, text_length)
     
-    # dp[i] = list of (best_score, prev_end, segment) for paths ending at position i
-    dp: Dict[int, List[Tuple[float, Optional[int], Optional[Segment]]]] = {0: [(0.0, None, None)]}
-    
-    # Process positions in order
-    for pos in range(text_length + 1):
-        if pos not in dp:
-            # If allow_gaps and we have a reachable previous position, create a skip
-            if allow_gaps:
-                # Find nearest reachable position before this
-                for prev_pos in range(pos - 1, -1, -1):
-                    if prev_pos in dp:
-                        # Create a gap/skip transition with penalty
-                        for prev_score, _, _ in dp[prev_pos]:
-                            gap_penalty = UNKNOWN_CHAR_PENALTY * (pos - prev_pos)
-                            new_score = prev_score + gap_penalty
-                            if pos not in dp:
-                                dp[pos] = []
-                            # Create a fake "unknown" segment for the gap
-                            dp[pos].append((new_score, prev_pos, None))
-                        break
-            if pos not in dp:
-                continue
-        
-        # Try all segments starting at this position
-        for (start, end), segments in matches.items():
-            if start != pos:
-                continue
-            
-            # Get best segment for this span
-            best_seg = max(segments, key=lambda s: s.score)
-            
-            # Calculate new score
-            for prev_score, _, _ in dp[pos]:
-                new_score = prev_score + best_seg.score
-                
-                if end not in dp:
-                    dp[end] = []
-                
-                # Keep top candidates
-                dp[end].append((new_score, pos, best_seg))
-                dp[end] = sorted(dp[end], key=lambda x: -x[0])[:limit * 2]
-    
-    # Backtrack from end
-    if text_length not in dp:
-        # Try to reach the end with gaps
-        if allow_gaps:
-            for prev_pos in range(text_length - 1, -1, -1):
-                if prev_pos in dp:
-                    for prev_score, _, _ in dp[prev_pos]:
-                        gap_penalty = UNKNOWN_CHAR_PENALTY * (text_length - prev_pos)
-                        new_score = prev_score + gap_penalty
-                        if text_length not in dp:
-                            dp[text_length] = []
-                        dp[text_length].append((new_score, prev_pos, None))
-                    break
-        if text_length not in dp:
-            return []
+    if lattice.edge_count == 0:
+        return []
     
-    results = []
-    for final_score, prev_pos, last_seg in dp[text_length]:
-        # Reconstruct path
-        path = []
-        current_pos = text_length
-        current_entry = (final_score, prev_pos, last_seg)
-        
-        # Track gaps for later conversion to unknown segments
-        gaps = []  # List of (start, end) for gap ranges
-        
-        while True:
-            seg = current_entry[2]
-            prev = current_entry[1]
-            
-            if seg is not None:
-                path.append(seg)
-            else:
-                # This was a gap - record it
-                if prev is not None and current_pos > prev:
-                    gaps.append((prev, current_pos))
-            
-            if prev is None or prev == 0:
-                break
-            
-            # Find the entry that ends at prev_pos
-            found = False
-            for entry in dp.get(prev, []):
-                current_entry = entry
-                current_pos = prev
-                found = True
-                break
-            if not found:
-                break
-        
-        path.reverse()
-        gaps.reverse()
-        
-        if path or gaps:
-            results.append((path, final_score, gaps))
+    best, back_pos, back_seg = _viterbi_forward(lattice, allow_gaps)
+    length = lattice.length
+    if back_pos[length] < 0 and length > 0:
+        return []
     
-    # Sort by score and return top results
-    results.sort(key=lambda x: -x[1])
+    if limit == 1:
+        return [(_backtrack(back_pos, back_seg, length), best[length])]
     
-    # Return in original format (path, score)
-    return [(r[0], r[1]) for r in results[:limit]]
+    return _kbest_backward(lattice, best, back_pos, back_seg, limit)
 
 
 # =============================================================================
@@ -648,6 +822,48 @@ MULTI_TOKEN_MERGES = [
 TE_FORM_ENDINGS = frozenset(['て', 'で', 'って', 'んで', 'いて', 'いで'])
 
 
+# Compiled forms of the tables above
+_TE_AUXILIARIES = frozenset(TE_FORM_MERGE_PATTERNS)
+_PASSIVE_AUXILIARIES = frozenset(PASSIVE_MERGE_PATTERNS)
+_SURU_CONTINUATIONS = frozenset(SURU_CONTINUATION_PATTERNS)
+
+# Longest patterns first, so the longest match wins
+_MULTI_TOKEN_RULES = SurfaceTrie(
+    sorted(MULTI_TOKEN_MERGES, key=lambda x: -len(x[0]))
+)
+
+
+def _merge_compound_verb(window):
+    """Rewrite rule for merge_compound_verbs."""
+    if len(window) < 2:
+        return None
+    current, next_token = window[0], window[1]
+    surface = next_token.surface
+    
+    # Pattern 1: て-form + auxiliary
+    # Pattern 2: Noun + する continuation (勉強 + しています), never
+    #            onto punctuation (。 + しています stays split)
+    # Pattern 3: Passive/potential stem + ている (され + ている)
+    if not (
+        (surface in _TE_AUXILIARIES and current.surface.endswith(('て', 'で')))
+        or (surface in _SURU_CONTINUATIONS and current.pos != 'punc')
+        or (surface in _PASSIVE_AUXILIARIES
+            and current.surface.endswith(PASSIVE_STEM_ENDINGS))
+    ):
+        return None
+    
+    from himotoki_split import Token
+    return 2, [Token(
+        surface=current.surface + surface,
+        reading=current.reading + next_token.reading,
+        pos=current.pos,
+        base_form=current.base_form,
+        base_form_id=current.base_form_id,
+        start=current.start,
+        end=next_token.end,
+    )]
+
+
 def merge_compound_verbs(tokens: list) -> list:
     """
     Merge compound verb patterns into single tokens.
@@ -655,96 +871,34 @@ def merge_compound_verbs(tokens: list) -> list:
     Patterns merged:
     - て/で + いる/しまう/ください/おく/くる etc.
     - noun + しています/し続けている etc. (する compounds)
+    
+    Merged tokens are merged again with their neighbours where a pattern
+    applies (勉強 + して + います → 勉強しています).
     """
     if len(tokens) < 2:
         return tokens
+    return rewrite_to_fixpoint(tokens, _merge_compound_verb, 2, 'compound_verbs')
+
+
+def _merge_multi_token(window):
+    """Rewrite rule for apply_multi_token_merges."""
+    hit = _MULTI_TOKEN_RULES.match(window)
+    if hit is None:
+        return None
     
-    result = []
-    i = 0
-    
-    while i < len(tokens):
-        current = tokens[i]
-        
-        # Check if we can merge with next token(s)
-        merged = False
-        
-        if i + 1 < len(tokens):
-            next_token = tokens[i + 1]
-            
-            # Pattern 1: て-form + auxiliary
-            # Check if current ends with て/で form
-            if current.surface.endswith(('て', 'で')):
-                # Check if next is a mergeable auxiliary
-                for pattern in TE_FORM_MERGE_PATTERNS:
-                    if next_token.surface == pattern:
-                        # Merge them
-                        merged_surface = current.surface + next_token.surface
-                        merged_reading = current.reading + next_token.reading
-                        
-                        # Create merged token
-                        from himotoki_split import Token
-                        result.append(Token(
-                            surface=merged_surface,
-                            reading=merged_reading,
-                            pos=current.pos,
-                            base_form=current.base_form,
-                            base_form_id=current.base_form_id,
-                            start=current.start,
-                            end=next_token.end,
-                        ))
-                        i += 2
-                        merged = True
-                        break
-            
-            # Pattern 2: Noun + する continuation (勉強 + しています)
-            # Check if next token starts with し and is a する compound pattern
-            if not merged:
-                for suru_pattern in SURU_CONTINUATION_PATTERNS:
-                    if next_token.surface == suru_pattern:
-                        # Merge noun + する compound
-                        merged_surface = current.surface + next_token.surface
-                        merged_reading = current.reading + next_token.reading
-                        
-                        from himotoki_split import Token
-                        result.append(Token(
-                            surface=merged_surface,
-                            reading=merged_reading,
-                            pos=current.pos,
-                            base_form=current.base_form,
-                            base_form_id=current.base_form_id,
-                            start=current.start,
-                            end=next_token.end,
-                        ))
-                        i += 2
-                        merged = True
-                        break
-            
-            # Pattern 3: Passive/potential stem + ている (され + ている)
-            if not merged and current.surface.endswith(PASSIVE_STEM_ENDINGS):
-                for pattern in PASSIVE_MERGE_PATTERNS:
-                    if next_token.surface == pattern:
-                        merged_surface = current.surface + next_token.surface
-                        merged_reading = current.reading + next_token.reading
-                        
-                        from himotoki_split import Token
-                        result.append(Token(
-                            surface=merged_surface,
-                            reading=merged_reading,
-                            pos=current.pos,
-                            base_form=current.base_form,
-                            base_form_id=current.base_form_id,
-                            start=current.start,
-                            end=next_token.end,
-                        ))
-                        i += 2
-                        merged = True
-                        break
-        
-        if not merged:
-            result.append(current)
-            i += 1
-    
-    return result
+    from himotoki_split import Token
+    pattern_len, merged_text = hit
+    first_token = window[0]
+    last_token = window[pattern_len - 1]
+    return pattern_len, [Token(
+        surface=merged_text,
+        reading=''.join(t.reading for t in window[:pattern_len]),
+        pos=first_token.pos,
+        base_form=merged_text,
+        base_form_id=first_token.base_form_id,
+        start=first_token.start,
+        end=last_token.end,
+    )]
 
 
 def apply_multi_token_merges(tokens: list) -> list:
@@ -757,83 +911,306 @@ def apply_multi_token_merges(tokens: list) -> list:
     """
     if len(tokens) < 2:
         return tokens
+    return rewrite_to_fixpoint(
+        tokens, _merge_multi_token, _MULTI_TOKEN_RULES.max_length, 'multi_token_merges'
+    )
+
+
+# =============================================================================
+# Long Input Chunking
+# =============================================================================
+
+# Brackets a window may end before (opening) or after (closing)
+OPENING_BRACKETS = frozenset('「『（(【〈《［[｛{〔“‘')
+CLOSING_BRACKETS = frozenset('」』）)】〉》］]｝}〕”’')
+
+
+def is_safe_boundary(text: str, i: int) -> bool:
+    """
+    Check whether a word is unlikely to span position ``i`` of ``text``.
+    
+    Safe boundaries are next to whitespace or brackets, between Japanese
+    and non-Japanese characters, and at the edges of katakana runs.
+    """
+    before = text[i - 1]
+    after = text[i]
+    if before.isspace() or after.isspace():
+        return True
+    if after in OPENING_BRACKETS or before in CLOSING_BRACKETS:
+        return True
+    before_flags = char_flags(before)
+    after_flags = char_flags(after)
+    if not before_flags or not after_flags:
+        return bool(before_flags or after_flags)
+    if after_flags & MODIFIER:
+        return False  # Long vowel marks and small kana continue a word
+    return bool((before_flags ^ after_flags) & KATAKANA and
+                (before_flags | after_flags) & KANA)
+
+
+def _window_end(text: str, start: int) -> int:
+    """Pick where the window beginning at ``start`` ends, preferring a safe boundary."""
+    end = start + MAX_SEGMENT_LENGTH
+    if end >= len(text):
+        return len(text)
+    for i in range(end, end - CHUNK_OVERLAP, -1):
+        if is_safe_boundary(text, i):
+            return i
+    return end
+
+
+def _search_run(
+    text: str,
+    dictionary: Optional[Dictionary],
+    stats: Optional[CallStats],
+    lap: Optional[float],
+) -> Tuple[Optional[List[Segment]], Optional[float]]:
+    """
+    Build the lattice for a punctuation-free run and find its best path.
     
+    Returns:
+        (best path or None, updated lap time)
+    """
+    lattice = build_lattice(text, dictionary)
+    if stats is not None:
+        lap = stats.lap('lattice', lap)
+        stats.count('segments')
+        stats.count('lattice_nodes', lattice.length + 1)
+        stats.count('lattice_edges', lattice.edge_count)
+    
+    paths = find_best_path(lattice, len(text), limit=1)
+    if stats is not None:
+        lap = stats.lap('path', lap)
+    
+    return (paths[0][0] if paths else None), lap
+
+
+def _unknown_token(text: str, start: int):
+    """Create a token for text not covered by any dictionary word."""
     from himotoki_split import Token
     
-    # Sort patterns by length (longest first) to match greedily
-    sorted_patterns = sorted(MULTI_TOKEN_MERGES, key=lambda x: -len(x[0]))
+    return Token(
+        surface=text,
+        reading=as_hiragana(text) if is_kana(text) else text,
+        pos="unk",
+        base_form=text,
+        base_form_id=0,
+        start=start,
+        end=start + len(text),
+    )
+
+
+def _append_path_tokens(
+    out: List,
+    text: str,
+    offset: int,
+    path: Optional[List[Segment]],
+    end: int,
+) -> None:
+    """
+    Append tokens for ``text[:end]`` following ``path``.
     
-    result = []
-    i = 0
+    Path segments ending after ``end`` are dropped, and uncovered text
+    becomes unknown tokens.
+    """
+    if not path:
+        # No segmentation found - the whole span is one unknown token
+        out.append(_unknown_token(text[:end], offset))
+        return
+    
+    last_end = 0
+    for seg in path:
+        if seg.end > end:
+            break
+        if seg.start > last_end:
+            out.append(_unknown_token(text[last_end:seg.start], offset + last_end))
+        out.append(segment_to_token(seg, offset))
+        last_end = seg.end
+    
+    if last_end < end:
+        out.append(_unknown_token(text[last_end:end], offset + last_end))
+
+
+def _append_path_spans(
+    out: List[Tuple[int, int]],
+    text: str,
+    offset: int,
+    path: Optional[List[Segment]],
+    end: int,
+) -> None:
+    """Like ``_append_path_tokens``, but append (start, end) spans."""
+    if not path:
+        out.append((offset, offset + end))
+        return
+    
+    last_end = 0
+    for seg in path:
+        if seg.end > end:
+            break
+        if seg.start > last_end:
+            out.append((offset + last_end, offset + seg.start))
+        out.append((offset + seg.start, offset + seg.end))
+        last_end = seg.end
+    
+    if last_end < end:
+        out.append((offset + last_end, offset + end))
+
+
+def _tokenize_long_run(
+    out: List,
+    text: str,
+    offset: int,
+    dictionary: Optional[Dictionary],
+    stats: Optional[CallStats],
+    lap: Optional[float],
+    append_path=_append_path_tokens,
+) -> Optional[float]:
+    """
+    Tokenize a punctuation-free run longer than MAX_SEGMENT_LENGTH.
+    
+    The run is searched in windows of at most MAX_SEGMENT_LENGTH
+    characters, ending at a safe boundary where one is near. Only the part
+    of each window's best path that ends before the last CHUNK_OVERLAP
+    characters is committed; the next window starts at the last committed
+    word boundary, so the windows stitch together without gaps and every
+    word is decided with context on both sides. Cost is linear in the
+    length of the run.
+    
+    ``append_path`` turns each committed part of a path into output
+    (``_append_path_tokens`` or ``_append_path_spans``).
     
-    while i < len(tokens):
-        matched = False
+    Returns:
+        Updated lap time
+    """
+    start = 0
+    while start < len(text):
+        end = _window_end(text, start)
+        window = text[start:end]
+        path, lap = _search_run(window, dictionary, stats, lap)
         
-        # Try each pattern
-        for pattern_tokens, merged_text in sorted_patterns:
-            pattern_len = len(pattern_tokens)
-            
-            if i + pattern_len <= len(tokens):
-                # Check if tokens match
-                surfaces = [tokens[i + j].surface for j in range(pattern_len)]
-                
-                if surfaces == pattern_tokens:
-                    # Merge tokens
-                    first_token = tokens[i]
-                    last_token = tokens[i + pattern_len - 1]
-                    merged_reading = ''.join(tokens[i + j].reading for j in range(pattern_len))
-                    
-                    result.append(Token(
-                        surface=merged_text,
-                        reading=merged_reading,
-                        pos=first_token.pos,
-                        base_form=merged_text,
-                        base_form_id=first_token.base_form_id,
-                        start=first_token.start,
-                        end=last_token.end,
-                    ))
-                    i += pattern_len
-                    matched = True
-                    break
+        if end == len(text):
+            append_path(out, window, offset + start, path, len(window))
+            break
         
-        if not matched:
-            result.append(tokens[i])
-            i += 1
+        # Commit up to the last word boundary before the overlap
+        limit = len(window) - CHUNK_OVERLAP
+        commit = 0
+        for seg in path or ():
+            if seg.end > limit:
+                break
+            commit = seg.end
+        if commit == 0:
+            commit = limit
+        
+        append_path(out, window, offset + start, path, commit)
+        start += commit
     
-    return result
+    return lap
 
 
 # =============================================================================
 # Public API
 # =============================================================================
 
+def segment_to_token(seg: Segment, offset: int = 0):
+    """Convert a lattice Segment to a Token, shifting positions by offset."""
+    from himotoki_split import Token
+    
+    return Token(
+        surface=seg.surface,
+        reading=seg.reading,
+        pos=seg.pos,
+        base_form=seg.base_form,
+        base_form_id=seg.base_form_id,
+        start=offset + seg.start,
+        end=offset + seg.end,
+    )
+
+
 # Punctuation characters that should be treated as word separators
 PUNCTUATION_SEPARATORS = frozenset(['、', '。', '！', '？', '，', '．', '…', '・'])
 
 
-def tokenize_text(text: str) -> List:
+def tokenize_text(text: str, dictionary: Optional[Dictionary] = None) -> List:
     """
     Tokenize text into a list of Token objects.
     
-    This is the main entry point for tokenization.
+    This is the main entry point for tokenization. Per-stage timings and
+    counters are recorded when instrumentation is enabled (see
+    ``himotoki_split.instrumentation``).
+    
+    Args:
+        text: The text to tokenize
+        dictionary: Dictionary to use (default dictionary if None)
     """
+    return _run_instrumented(_tokenize_text, text, dictionary)
+
+
+def segment_text(
+    text: str,
+    dictionary: Optional[Dictionary] = None,
+    postprocess: bool = True,
+) -> List[Tuple[int, int]]:
+    """
+    Get the word boundaries of text as (start, end) spans.
+    
+    With ``postprocess=False`` only the punctuation split, lattice and
+    best-path search run: no Token objects, readings, base forms or POS
+    names are produced, and the merge and suffix-splitting passes are
+    skipped, so spans follow the raw dictionary segmentation. With
+    ``postprocess=True`` the spans are exactly those of ``tokenize_text``.
+    
+    Args:
+        text: The text to segment
+        dictionary: Dictionary to use (default dictionary if None)
+        postprocess: Apply the post-processing passes
+    """
+    if postprocess:
+        return [(t.start, t.end) for t in tokenize_text(text, dictionary)]
+    return _run_instrumented(_segment_text, text, dictionary)
+
+
+def _run_instrumented(pipeline, text: str, dictionary: Optional[Dictionary]) -> List:
+    """Run ``pipeline(text, dictionary, stats)``, recording stats if enabled."""
+    call = start_call(len(text))
+    if call is None:
+        return pipeline(text, dictionary, None)
+    
+    started = perf_counter()
+    stats = call[0]
+    # Lookups and cache misses are counted by the dictionary as they happen
+    stats.count('dictionary_lookups', 0)
+    stats.count('lookup_cache_misses', 0)
+    try:
+        tokens = pipeline(text, dictionary, stats)
+    finally:
+        counters = stats.counters
+        counters['lookup_cache_hits'] = (
+            counters['dictionary_lookups'] - counters['lookup_cache_misses']
+        )
+        finish_call(call, started)
+    return tokens
+
+
+def _tokenize_text(
+    text: str,
+    dictionary: Optional[Dictionary],
+    stats: Optional[CallStats],
+) -> List:
+    """Run the tokenization pipeline, recording into ``stats`` if given."""
     from himotoki_split import Token
     
+    lap = perf_counter() if stats is not None else None
+    
     # Split text by punctuation separators first
     # Then tokenize each segment separately
-    segments = []
-    current_start = 0
-    for i, char in enumerate(text):
-        if char in PUNCTUATION_SEPARATORS:
-            # Add the text segment before punctuation
-            if i > current_start:
-                segments.append((text[current_start:i], current_start))
-            # Add the punctuation as its own segment
-            segments.append((char, i))
-            current_start = i + 1
-    # Add remaining text
-    if current_start < len(text):
-        segments.append((text[current_start:], current_start))
+    segments = _split_punctuation(text)
+    if stats is not None:
+        lap = stats.lap('split', lap)
+    
+    cache = get_segment_cache()
+    if cache is not None and dictionary is None:
+        dictionary = get_default_dictionary()
     
     # Tokenize each non-punctuation segment
     all_tokens = []
@@ -851,108 +1228,176 @@ def tokenize_text(text: str) -> List:
             ))
             continue
         
-        matches = find_all_matches(seg_text)
-        paths = find_best_path(matches, len(seg_text), limit=1)
-        
-        if not paths:
-            # No segmentation found - return as single unknown token
-            all_tokens.append(Token(
-                surface=seg_text,
-                reading=as_hiragana(seg_text) if is_kana(seg_text) else seg_text,
-                pos="unk",
-                base_form=seg_text,
-                base_form_id=0,
-                start=seg_start,
-                end=seg_start + len(seg_text),
-            ))
+        if cache is not None:
+            # Post-process segment by segment so results can be cached
+            lap = _tokenize_segment_cached(
+                all_tokens, seg_text, seg_start, dictionary, cache, stats, lap
+            )
             continue
         
-        # Convert segments to tokens with adjusted positions
-        # Also fill in gaps with unknown tokens
-        path, score = paths[0]
-        last_end = 0
-        for seg in path:
-            # Check for gap before this segment
-            if seg.start > last_end:
-                # Add unknown token for the gap
-                gap_text = seg_text[last_end:seg.start]
-                all_tokens.append(Token(
-                    surface=gap_text,
-                    reading=as_hiragana(gap_text) if is_kana(gap_text) else gap_text,
-                    pos="unk",
-                    base_form=gap_text,
-                    base_form_id=0,
-                    start=seg_start + last_end,
-                    end=seg_start + seg.start,
-                ))
-            all_tokens.append(Token(
-                surface=seg.surface,
-                reading=seg.reading,
-                pos=seg.pos,
-                base_form=seg.base_form,
-                base_form_id=seg.base_form_id,
-                start=seg_start + seg.start,
-                end=seg_start + seg.end,
-            ))
-            last_end = seg.end
+        if len(seg_text) > MAX_SEGMENT_LENGTH:
+            lap = _tokenize_long_run(all_tokens, seg_text, seg_start, dictionary, stats, lap)
+            continue
         
-        # Check for gap at the end
-        if last_end < len(seg_text):
-            gap_text = seg_text[last_end:]
-            all_tokens.append(Token(
-                surface=gap_text,
-                reading=as_hiragana(gap_text) if is_kana(gap_text) else gap_text,
-                pos="unk",
-                base_form=gap_text,
-                base_form_id=0,
-                start=seg_start + last_end,
-                end=seg_start + len(seg_text),
-            ))
+        path, lap = _search_run(seg_text, dictionary, stats, lap)
+        _append_path_tokens(all_tokens, seg_text, seg_start, path, len(seg_text))
     
     tokens = all_tokens
+    if cache is None:
+        tokens, lap = _post_process(tokens, dictionary, stats, lap)
+    if stats is not None:
+        stats.count('tokens', len(tokens))
+    
+    return tokens
+
+
+def _split_punctuation(text: str) -> List[Tuple[str, int]]:
+    """Split text into (segment, start) pairs, each punctuation mark on its own."""
+    segments = []
+    current_start = 0
+    for i, char in enumerate(text):
+        if char in PUNCTUATION_SEPARATORS:
+            # Add the text segment before punctuation
+            if i > current_start:
+                segments.append((text[current_start:i], current_start))
+            # Add the punctuation as its own segment
+            segments.append((char, i))
+            current_start = i + 1
+    # Add remaining text
+    if current_start < len(text):
+        segments.append((text[current_start:], current_start))
+    return segments
+
+
+def _segment_text(
+    text: str,
+    dictionary: Optional[Dictionary],
+    stats: Optional[CallStats],
+) -> List[Tuple[int, int]]:
+    """Run the lattice stages only, returning spans instead of tokens."""
+    lap = perf_counter() if stats is not None else None
+    
+    segments = _split_punctuation(text)
+    if stats is not None:
+        lap = stats.lap('split', lap)
+    
+    spans = []
+    for seg_text, seg_start in segments:
+        if seg_text in PUNCTUATION_SEPARATORS:
+            spans.append((seg_start, seg_start + 1))
+        elif len(seg_text) > MAX_SEGMENT_LENGTH:
+            lap = _tokenize_long_run(
+                spans, seg_text, seg_start, dictionary, stats, lap, _append_path_spans
+            )
+        else:
+            path, lap = _search_run(seg_text, dictionary, stats, lap)
+            _append_path_spans(spans, seg_text, seg_start, path, len(seg_text))
     
-    # Apply compound verb merging iteratively until no more changes
-    prev_len = -1
-    while len(tokens) != prev_len:
-        prev_len = len(tokens)
-        tokens = merge_compound_verbs(tokens)
+    if stats is not None:
+        stats.count('tokens', len(spans))
+    return spans
+
+
+def _post_process(
+    tokens: List,
+    dictionary: Optional[Dictionary],
+    stats: Optional[CallStats],
+    lap: Optional[float],
+) -> Tuple[List, Optional[float]]:
+    """
+    Apply the merge and suffix-splitting passes to lattice tokens.
     
-    # Apply multi-token merges for complex patterns
-    prev_len = -1
-    while len(tokens) != prev_len:
-        prev_len = len(tokens)
-        tokens = apply_multi_token_merges(tokens)
+    No rule merges a punctuation token with its neighbours, so running
+    this per segment gives the same tokens as running it over the whole
+    text (the segment cache and streaming rely on this).
+    
+    Returns:
+        (tokens, updated lap time)
+    """
+    # Apply compound verb merging, then multi-token merges for complex patterns
+    checkpoint()
+    tokens = merge_compound_verbs(tokens)
+    if stats is not None:
+        lap = stats.lap('merge_verbs', lap)
+    tokens = apply_multi_token_merges(tokens)
+    if stats is not None:
+        lap = stats.lap('merge_multi', lap)
     
     # Apply suffix splitting to match himotoki's behavior
     # This splits particles, copulas, conditionals, and explanatory ん
     from himotoki_split.suffix_splitting import post_process_splits
-    tokens = post_process_splits(tokens)
+    tokens = post_process_splits(tokens, dictionary)
+    if stats is not None:
+        lap = stats.lap('postprocess', lap)
     
-    return tokens
+    return tokens, lap
 
 
-def analyze_text(text: str, limit: int = 5) -> List[Tuple[List, float]]:
+def _tokenize_segment_cached(
+    out: List,
+    text: str,
+    offset: int,
+    dictionary: Dictionary,
+    cache,
+    stats: Optional[CallStats],
+    lap: Optional[float],
+) -> Optional[float]:
     """
-    Analyze text and return multiple segmentation candidates.
+    Append the post-processed tokens of one segment, using the segment cache.
+    
+    Runs too long to be searched as one lattice are tokenized but not cached.
+    
+    Returns:
+        Updated lap time
     """
-    from himotoki_split import Token
+    cacheable = len(text) <= MAX_SEGMENT_LENGTH
+    if cacheable:
+        cached = cache.get(dictionary, text, offset)
+        if cached is not None:
+            out.extend(cached)
+            if stats is not None:
+                stats.count('segment_cache_hits')
+            return lap
+        if stats is not None:
+            stats.count('segment_cache_misses')
+    
+    tokens = []
+    if cacheable:
+        path, lap = _search_run(text, dictionary, stats, lap)
+        _append_path_tokens(tokens, text, offset, path, len(text))
+    else:
+        lap = _tokenize_long_run(tokens, text, offset, dictionary, stats, lap)
+    tokens, lap = _post_process(tokens, dictionary, stats, lap)
     
-    matches = find_all_matches(text)
-    paths = find_best_path(matches, len(text), limit=limit)
+    if cacheable:
+        cache.put(dictionary, text, offset, tokens)
+    out.extend(tokens)
+    return lap
+
+
+def analyze_text(
+    text: str,
+    limit: int = 5,
+    dictionary: Optional[Dictionary] = None,
+) -> List[Tuple[List, float]]:
+    """
+    Analyze text and return multiple segmentation candidates.
+    
+    Builds the same lattice as ``tokenize_text`` and enumerates the
+    ``limit`` best distinct segmentations of it. The lattice covers the
+    whole text, so ``himotoki_split.analyze`` caps its input length (see
+    ``configure_limits``).
+    
+    Args:
+        text: The text to analyze
+        limit: Maximum number of candidates
+        dictionary: Dictionary to use (default dictionary if None)
+    """
+    lattice = build_lattice(text, dictionary)
+    paths = find_best_path(lattice, len(text), limit=limit)
     
     results = []
     for path, score in paths:
-        tokens = []
-        for seg in path:
-            tokens.append(Token(
-                surface=seg.surface,
-                reading=seg.reading,
-                pos=seg.pos,
-                base_form=seg.base_form,
-                base_form_id=seg.base_form_id,
-                start=seg.start,
-                end=seg.end,
-            ))
-        results.append((tokens, score))
+        results.append(([segment_to_token(seg) for seg in path], score))
     
     return results
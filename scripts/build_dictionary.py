@@ -6,8 +6,12 @@ This script builds the binary dictionary from JMdict XML.
 It parses the XML, generates all conjugated forms, and saves
 everything to a compact marisa_trie.RecordTrie file.
 
+Conjugation and scoring run in a process pool, and generated entries
+are spilled to temporary files instead of being held in memory, so peak
+memory is bounded by the number of JMdict entries (see ``build_all``).
+
 Usage:
-    python scripts/build_dictionary.py [--jmdict PATH] [--output PATH]
+    python scripts/build_dictionary.py [--jmdict PATH] [--output PATH] [--workers N]
     
 Requirements:
     pip install himotoki-split[build]  # Installs SQLAlchemy for building
@@ -16,13 +20,16 @@ Requirements:
 import argparse
 import csv
 import logging
+import multiprocessing
+import os
 import struct
 import sys
+import tempfile
 import time
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -34,8 +41,12 @@ from lxml import etree
 from himotoki_split.dictionary import (
     RECORD_FORMAT,
     POS_ID_MAP,
+    WordEntry,
+    encode_score,
     get_pos_id,
 )
+from himotoki_split.tokenizer import calculate_segment_score
+from himotoki_split.string_store import StringStoreWriter, write_string_store
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -237,6 +248,12 @@ COP_CONJUGATE_SEQ = {2089020}
 # JMDict Parsing
 # ============================================================================
 
+# One parsed JMdict entry: (seq, readings, POS names, primary kana reading).
+# Readings are (text, ord, common, is_kanji) tuples.
+Reading = Tuple[str, int, Optional[int], bool]
+ParsedEntry = Tuple[int, List[Reading], List[str], str]
+
+
 def node_text(elem) -> str:
     """Get all text from element."""
     return ''.join(elem.itertext())
@@ -258,28 +275,14 @@ def calculate_cost(common: Optional[int], ord_num: int) -> int:
     return min(base, 255)  # Clamp to uint8 range
 
 
-def parse_entries(xml_path: Path) -> Tuple[List[DictEntry], Dict[int, str]]:
+def iter_jmdict(xml_path: Path) -> Iterator[ParsedEntry]:
     """
-    Parse JMdict XML and generate all entries including conjugations.
+    Parse JMdict XML entry by entry.
     
-    Returns:
-        Tuple of (list of DictEntry, dict mapping seq -> base_form text)
+    Yields:
+        (seq, readings, POS names, primary kana reading) for each entry
+        with at least one usable reading
     """
-    logger.info(f"Loading conjugation rules...")
-    load_pos_index()
-    load_conj_rules()
-    
-    logger.info(f"Parsing entity definitions...")
-    parse_entity_definitions(xml_path)
-    
-    entries: List[DictEntry] = []
-    base_forms: Dict[int, str] = {}  # seq -> primary reading
-    kana_readings: Dict[int, str] = {}  # seq -> primary kana reading
-    seq_readings: Dict[int, List[Tuple[str, int, int, bool]]] = {}  # seq -> [(text, ord, common, is_kanji)]
-    seq_pos: Dict[int, Set[str]] = {}  # seq -> set of POS
-    
-    logger.info(f"Parsing JMdict entries...")
-    
     context = etree.iterparse(
         str(xml_path),
         events=('end',),
@@ -289,7 +292,6 @@ def parse_entries(xml_path: Path) -> Tuple[List[DictEntry], Dict[int, str]]:
         no_network=True
     )
     
-    count = 0
     for event, elem in context:
         seq_elem = elem.find('ent_seq')
         if seq_elem is None:
@@ -348,19 +350,14 @@ def parse_entries(xml_path: Path) -> Tuple[List[DictEntry], Dict[int, str]]:
             elem.clear()
             continue
         
-        seq_readings[seq] = readings
-        
-        # Store primary reading as base form
-        base_forms[seq] = readings[0][0]
-        
-        # Store primary kana reading (first non-kanji reading)
+        # Primary kana reading (first non-kanji reading)
         for text, ord_num, common, is_kanji in readings:
             if not is_kanji:
-                kana_readings[seq] = text
+                kana_reading = text
                 break
         else:
             # If no kana reading, use the first reading (fallback)
-            kana_readings[seq] = readings[0][0]
+            kana_reading = readings[0][0]
         
         # Parse POS
         pos_set = set()
@@ -369,176 +366,193 @@ def parse_entries(xml_path: Path) -> Tuple[List[DictEntry], Dict[int, str]]:
                 pos_text = fix_entity_value(node_text(pos_elem))
                 pos_set.add(pos_text)
         
-        seq_pos[seq] = pos_set
-        
-        # Create base entries
-        for text, ord_num, common, is_kanji in readings:
-            cost = calculate_cost(common, ord_num)
-            
-            # Get primary POS for this entry
-            primary_pos = 'unk'
-            primary_pos_id = 0
-            for pos in pos_set:
-                if pos in POS_ID_MAP:
-                    primary_pos = pos
-                    primary_pos_id = POS_ID_MAP[pos]
-                    break
-            
-            entries.append(DictEntry(
-                surface=text,
-                seq=seq,
-                cost=cost,
-                pos_id=primary_pos_id,
-                conj_type=0,  # Root form
-                base_seq=seq,  # Self-reference for root
-                base_form=readings[0][0],
-            ))
-        
-        count += 1
-        if count % 10000 == 0:
-            logger.info(f"  Parsed {count} entries...")
-        
         elem.clear()
         while elem.getprevious() is not None:
             del elem.getparent()[0]
+        
+        # The set's iteration order decides the primary POS and the order
+        # conjugations are numbered in, so it is fixed here once
+        yield seq, readings, list(pos_set), kana_reading
+
+
+def make_base_entries(seq: int, readings: List[Reading], pos_list: List[str]) -> List[DictEntry]:
+    """Create the dictionary-form entries of a parsed JMdict entry."""
+    # Get primary POS for this entry
+    primary_pos_id = 0
+    for pos in pos_list:
+        if pos in POS_ID_MAP:
+            primary_pos_id = POS_ID_MAP[pos]
+            break
     
-    logger.info(f"Parsed {count} base entries with {len(entries)} surface forms")
-    
-    # Generate conjugations
-    logger.info("Generating conjugated forms...")
+    return [
+        DictEntry(
+            surface=text,
+            seq=seq,
+            cost=calculate_cost(common, ord_num),
+            pos_id=primary_pos_id,
+            conj_type=0,  # Root form
+            base_seq=seq,  # Self-reference for root
+            base_form=readings[0][0],
+        )
+        for text, ord_num, common, is_kanji in readings
+    ]
+
+
+# ============================================================================
+# Conjugation Generation
+# ============================================================================
+
+# Conjugation types that need te-form (conj_type 3)
+# 5 = potential (会える)
+# 6 = passive (会われる)
+# 7 = causative (会わせる)
+# 8 = causative-passive (会わせられる)
+NEEDS_TE_FORM = {5, 6, 7, 8}
+
+# POS ID for v1 (ichidan verbs) - the conjugated forms are always v1
+V1_POS_ID = 28
+
+# A generated entry with the kana reading stored under its seq, if any.
+# Generated entries are numbered by the parent process, so their seq is 0
+# until then.
+Generated = Tuple[DictEntry, Optional[str]]
+
+
+def conjugate_entry(entry: ParsedEntry) -> List[Generated]:
+    """Generate the conjugated forms of a parsed JMdict entry."""
+    seq, readings, pos_list, kana_reading = entry
+    generated = []
     
-    conj_count = 0
-    next_seq = max(seq_readings.keys()) + 1
-    
-    for seq, readings in seq_readings.items():
-        pos_set = seq_pos.get(seq, set())
-        
-        for pos in pos_set:
-            if pos in DO_NOT_CONJUGATE:
-                continue
-            if pos == 'cop' and seq not in COP_CONJUGATE_SEQ:
-                continue
-            if pos not in POS_WITH_CONJ:
-                continue
-            
-            # Get POS ID for conjo.csv lookup
-            csv_pos_id = _POS_INDEX.get(pos)
-            if csv_pos_id is None:
-                continue
-            
-            rules = _CONJ_RULES.get(csv_pos_id, [])
-            if not rules:
-                continue
-            
-            for text, ord_num, common, is_kanji in readings:
-                for rule in rules:
+    for pos in pos_list:
+        if pos in DO_NOT_CONJUGATE:
+            continue
+        if pos == 'cop' and seq not in COP_CONJUGATE_SEQ:
+            continue
+        if pos not in POS_WITH_CONJ:
+            continue
+        
+        # Get POS ID for conjo.csv lookup
+        csv_pos_id = _POS_INDEX.get(pos)
+        if csv_pos_id is None:
+            continue
+        
+        rules = _CONJ_RULES.get(csv_pos_id, [])
+        if not rules:
+            continue
+        
+        for text, ord_num, common, is_kanji in readings:
+            for rule in rules:
+                try:
+                    conj_text = construct_conjugation(text, rule)
+                except Exception:
+                    continue
+                
+                if conj_text == text:
+                    continue
+                
+                cost = calculate_cost(common, ord_num) + 5  # Small penalty for conjugated
+                
+                # Kanji surfaces get the conjugated kana reading stored
+                # under their own seq; kana surfaces are their own reading
+                conj_kana = None
+                if is_kanji:
                     try:
-                        conj_text = construct_conjugation(text, rule)
+                        conj_kana = construct_conjugation(kana_reading, rule)
                     except Exception:
-                        continue
-                    
-                    if conj_text == text:
-                        continue
-                    
-                    cost = calculate_cost(common, ord_num) + 5  # Small penalty for conjugated
-                    
-                    entries.append(DictEntry(
-                        surface=conj_text,
-                        seq=next_seq,
-                        cost=cost,
-                        pos_id=get_pos_id(pos),
-                        conj_type=rule.conj_type,
-                        base_seq=seq,
-                        base_form=readings[0][0],
-                    ))
-                    
-                    conj_count += 1
-                    next_seq += 1
-        
-        if conj_count % 50000 == 0 and conj_count > 0:
-            logger.info(f"  Generated {conj_count} conjugated forms...")
-    
-    logger.info(f"Generated {conj_count} conjugated forms")
-    
-    # Generate secondary conjugations (te-form of conjugated forms)
-    # This handles patterns like 会える → 会えて (te-form of potential)
-    logger.info("Generating secondary conjugations...")
-    
-    secondary_count = 0
-    secondary_entries = []
-    
-    # Conjugation types that need te-form (conj_type 3)
-    # 5 = potential (会える)
-    # 6 = passive (会われる)
-    # 7 = causative (会わせる)
-    # 8 = causative-passive (会わせられる)
-    NEEDS_TE_FORM = {5, 6, 7, 8}
-    
-    # POS ID for v1 (ichidan verbs) - the conjugated forms are always v1
-    V1_POS_ID = 28
-    V1_RULES = _CONJ_RULES.get(V1_POS_ID, [])
+                        pass
+                
+                generated.append((DictEntry(
+                    surface=conj_text,
+                    seq=0,
+                    cost=cost,
+                    pos_id=get_pos_id(pos),
+                    conj_type=rule.conj_type,
+                    base_seq=seq,
+                    base_form=readings[0][0],
+                ), conj_kana))
+    
+    return generated
+
+
+def te_form_entries(conjugated: DictEntry, kana: Optional[str]) -> List[Generated]:
+    """
+    Generate secondary te-forms of a conjugated form.
+    
+    This handles patterns like 会える → 会えて (te-form of potential).
+    """
+    # Only process conjugated forms that need te-form
+    if conjugated.conj_type not in NEEDS_TE_FORM:
+        return []
+    
+    # Skip if already short forms
+    if len(conjugated.surface) < 2:
+        return []
+    
+    # Verify it ends in る (ichidan verb pattern)
+    if not conjugated.surface.endswith('る'):
+        return []
     
     # Find te-form rules for v1
-    v1_te_rules = [r for r in V1_RULES if r.conj_type == 3 and not r.neg and not r.fml]
+    v1_te_rules = [
+        r for r in _CONJ_RULES.get(V1_POS_ID, [])
+        if r.conj_type == 3 and not r.neg and not r.fml
+    ]
     
-    for entry in entries:
-        # Only process conjugated forms that need te-form
-        if entry.conj_type not in NEEDS_TE_FORM:
+    generated = []
+    for rule in v1_te_rules:
+        try:
+            conj_text = construct_conjugation(conjugated.surface, rule)
+        except Exception:
             continue
         
-        # Skip if already short forms
-        if len(entry.surface) < 2:
+        if conj_text == conjugated.surface:
             continue
         
-        # Verify it ends in る (ichidan verb pattern)
-        if not entry.surface.endswith('る'):
-            continue
-        
-        # Generate te-form using v1 rules
-        for rule in v1_te_rules:
+        te_kana = None
+        if kana is not None:
             try:
-                conj_text = construct_conjugation(entry.surface, rule)
+                te_kana = construct_conjugation(kana, rule)
             except Exception:
-                continue
-            
-            if conj_text == entry.surface:
-                continue
-            
-            secondary_entries.append(DictEntry(
-                surface=conj_text,
-                seq=next_seq,
-                cost=entry.cost + 3,  # Small additional penalty
-                pos_id=entry.pos_id,
-                conj_type=3,  # Te-form
-                base_seq=entry.base_seq,
-                base_form=entry.base_form,
-            ))
-            
-            secondary_count += 1
-            next_seq += 1
-    
-    entries.extend(secondary_entries)
-    logger.info(f"Generated {secondary_count} secondary conjugations")
-    
-    # Add custom suru verb entries (entries not in JMdict but needed for accuracy)
-    logger.info("Adding custom suru verb entries...")
-    custom_count = 0
-    custom_entries = add_custom_suru_verb_entries(next_seq, base_forms)
-    entries.extend(custom_entries)
-    next_seq += len(custom_entries)
-    custom_count = len(custom_entries)
-    logger.info(f"Added {custom_count} custom suru verb entries")
-    
-    # Add compound word entries (common expressions that should be single tokens)
-    logger.info("Adding compound word entries...")
-    compound_entries = add_compound_word_entries(next_seq, base_forms)
-    entries.extend(compound_entries)
-    next_seq += len(compound_entries)
-    logger.info(f"Added {len(compound_entries)} compound word entries")
+                pass
+        
+        generated.append((DictEntry(
+            surface=conj_text,
+            seq=0,
+            cost=conjugated.cost + 3,  # Small additional penalty
+            pos_id=conjugated.pos_id,
+            conj_type=3,  # Te-form
+            base_seq=conjugated.base_seq,
+            base_form=conjugated.base_form,
+        ), te_kana))
     
-    logger.info(f"Total entries: {len(entries)}")
+    return generated
+
+
+def _init_worker() -> None:
+    """Load the conjugation tables in a build worker process."""
+    load_pos_index()
+    load_conj_rules()
+
+
+def _conjugate_shard(shard: List[ParsedEntry]) -> Tuple[bytes, int, bytes, int]:
+    """
+    Generate the conjugations and secondary te-forms of a shard of entries.
     
-    return entries, base_forms, kana_readings
+    Returns:
+        (packed conjugations, count, packed secondary te-forms, count), in
+        the order they are numbered
+    """
+    conjugations = bytearray()
+    secondary = bytearray()
+    n_conj = n_secondary = 0
+    for entry in shard:
+        for conjugated, kana in conjugate_entry(entry):
+            conjugations += pack_spill_record(conjugated, kana)
+            n_conj += 1
+            for te_form, te_kana in te_form_entries(conjugated, kana):
+                secondary += pack_spill_record(te_form, te_kana)
+                n_secondary += 1
+    return bytes(conjugations), n_conj, bytes(secondary), n_secondary
 
 
 def add_custom_suru_verb_entries(start_seq: int, base_forms: Dict[int, str]) -> List[DictEntry]:
@@ -837,80 +851,355 @@ def add_compound_word_entries(start_seq: int, base_forms: Dict[int, str]) -> Lis
     return entries
 
 
+# ============================================================================
+# Entry Spill
+# ============================================================================
+# Generated entries are written to chunk files in a temporary directory as
+# they are produced instead of being kept in lists, so build memory is
+# bounded by the JMdict entries rather than the millions of generated forms.
+
+# seq, cost, pos_id, conj_type, base_seq, surface bytes, kana bytes + 1
+# (0 = no kana reading)
+_SPILL_RECORD = struct.Struct('<IhBBIHH')
+
+# Approximate number of records per spill chunk (one scoring task each)
+SPILL_CHUNK_RECORDS = 50_000
+
+# Parsed entries per conjugation task
+CONJUGATION_SHARD_SIZE = 500
+
+
+def pack_spill_record(entry: DictEntry, kana: Optional[str] = None) -> bytes:
+    """Pack an entry and its optional kana reading as a spill record."""
+    surface = entry.surface.encode('utf-8')
+    kana_bytes = b'' if kana is None else kana.encode('utf-8')
+    return _SPILL_RECORD.pack(
+        entry.seq, entry.cost, entry.pos_id, entry.conj_type, entry.base_seq,
+        len(surface), 0 if kana is None else len(kana_bytes) + 1,
+    ) + surface + kana_bytes
+
+
+def iter_spill_records(path: Path) -> Iterator[Tuple[int, int, int, int, int, str, Optional[str]]]:
+    """
+    Read a spill chunk.
+    
+    Yields:
+        (seq, cost, pos_id, conj_type, base_seq, surface, kana reading or None)
+    """
+    data = path.read_bytes()
+    pos = 0
+    while pos < len(data):
+        seq, cost, pos_id, conj_type, base_seq, surface_len, kana_len = (
+            _SPILL_RECORD.unpack_from(data, pos)
+        )
+        pos += _SPILL_RECORD.size
+        surface = data[pos:pos + surface_len].decode('utf-8')
+        pos += surface_len
+        kana = None
+        if kana_len:
+            kana = data[pos:pos + kana_len - 1].decode('utf-8')
+            pos += kana_len - 1
+        yield seq, cost, pos_id, conj_type, base_seq, surface, kana
+
+
+class SpillWriter:
+    """
+    Append packed records to a series of chunk files.
+    
+    Args:
+        directory: Directory for the chunk files
+        name: Chunk file name prefix
+    """
+    
+    def __init__(self, directory: Path, name: str):
+        self.directory = directory
+        self.name = name
+        self.chunks: List[Tuple[Path, int]] = []  # (path, records)
+        self.count = 0
+        self._file = None
+        self._chunk_count = 0
+    
+    def write(self, data: bytes, n: int = 1) -> None:
+        """Append ``n`` packed records."""
+        if not n:
+            return
+        if self._file is None:
+            path = self.directory / f"{self.name}-{len(self.chunks):05d}.spill"
+            self._file = open(path, 'wb')
+            self._chunk_count = 0
+        self._file.write(data)
+        self._chunk_count += n
+        self.count += n
+        if self._chunk_count >= SPILL_CHUNK_RECORDS:
+            self._finish_chunk()
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._finish_chunk()
+    
+    def _finish_chunk(self) -> None:
+        self._file.close()
+        self.chunks.append((Path(self._file.name), self._chunk_count))
+        self._file = None
+
+
+def _numbered_chunks(writer: SpillWriter, first_seq: Optional[int]) -> List[Tuple[Path, Optional[int]]]:
+    """
+    Pair each chunk with the seq of its first record.
+    
+    ``first_seq`` None means the records carry their own seqs.
+    """
+    chunks = []
+    for path, count in writer.chunks:
+        chunks.append((path, first_seq))
+        if first_seq is not None:
+            first_seq += count
+    return chunks
+
+
 # ============================================================================
 # Dictionary Building
 # ============================================================================
 
-def build_dictionary(entries: List[DictEntry], output_path: Path):
-    """Build and save the binary dictionary."""
+_SURFACES: Optional[marisa_trie.Trie] = None
+_SURFACES_PATH: Optional[str] = None
+
+
+def _surface_exists(trie_path: str):
+    """Get a membership test for the surface trie, mapping it once per process."""
+    global _SURFACES, _SURFACES_PATH
+    if _SURFACES_PATH != trie_path:
+        _SURFACES = marisa_trie.Trie()
+        _SURFACES.mmap(trie_path)
+        _SURFACES_PATH = trie_path
+    return _SURFACES.__contains__
+
+
+def _score_chunk(task: Tuple[Path, Optional[int], str]) -> Tuple[List[Tuple[str, bytes]], List[Tuple[int, str]]]:
+    """
+    Number and score the records of a spill chunk.
+    
+    Returns:
+        (trie items of surface and packed record, (seq, kana reading) pairs)
+    """
+    path, first_seq, trie_path = task
+    exists = _surface_exists(trie_path)
+    record = struct.Struct(RECORD_FORMAT)
+    
+    items = []
+    kana_readings = []
+    for i, (seq, cost, pos_id, conj_type, base_seq, surface, kana) in enumerate(
+        iter_spill_records(path)
+    ):
+        if first_seq is not None:
+            seq = first_seq + i
+        word = WordEntry(
+            surface=surface,
+            seq=seq,
+            cost=cost,
+            pos_id=pos_id,
+            conj_type=conj_type,
+            base_seq=base_seq,
+        )
+        score = encode_score(calculate_segment_score(surface, word, exists))
+        items.append((surface, record.pack(seq, cost, pos_id, conj_type, base_seq, score)))
+        if kana is not None:
+            kana_readings.append((seq, kana))
+    return items, kana_readings
+
+
+def build_all(
+    xml_path: Path,
+    output_path: Path,
+    base_forms_path: Path,
+    kana_readings_path: Path,
+    workers: Optional[int] = None,
+    tmp_dir: Optional[Path] = None,
+) -> None:
+    """
+    Build the dictionary and string stores from JMdict XML.
+    
+    The build streams in three stages:
+    
+    1. The XML is parsed; dictionary forms are spilled as they are read
+       and conjugations are generated in a process pool, one shard of
+       entries per task, and spilled in shard order.
+    2. A trie of every surface is built from the spill. Scoring needs to
+       know which surfaces exist, so this has to finish before any record
+       is scored.
+    3. Spill chunks are numbered and scored in the pool and streamed into
+       the RecordTrie, and kana readings into their store, in seq order.
+    
+    The output is the same as building from in-memory lists: conjugations
+    are numbered in JMdict order and the trie does not depend on the order
+    records are added in.
+    
+    Args:
+        xml_path: JMdict XML file
+        output_path: Output dictionary path
+        base_forms_path: Output base forms path
+        kana_readings_path: Output kana readings path
+        workers: Worker processes (default: CPU count; 1 builds in-process)
+        tmp_dir: Directory for the temporary spill files
+    """
+    logger.info(f"Loading conjugation rules...")
+    load_pos_index()
+    load_conj_rules()
+    
+    logger.info(f"Parsing entity definitions...")
+    parse_entity_definitions(xml_path)
+    
+    workers = workers or os.cpu_count() or 1
+    pool = multiprocessing.Pool(workers, _init_worker) if workers > 1 else None
+    imap = pool.imap if pool is not None else map
+    
+    try:
+        with tempfile.TemporaryDirectory(prefix='himotoki-build-', dir=tmp_dir) as tmp:
+            tmp = Path(tmp)
+            _build(xml_path, output_path, base_forms_path, kana_readings_path, imap, tmp)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def _build(
+    xml_path: Path,
+    output_path: Path,
+    base_forms_path: Path,
+    kana_readings_path: Path,
+    imap,
+    tmp: Path,
+) -> None:
+    """Run the build stages of ``build_all`` with ``imap`` as the task runner."""
+    base_forms: Dict[int, str] = {}  # seq -> primary reading
+    kana_readings: Dict[int, str] = {}  # seq -> primary kana reading
+    base_spill = SpillWriter(tmp, 'base')
+    conj_spill = SpillWriter(tmp, 'conj')
+    secondary_spill = SpillWriter(tmp, 'secondary')
+    
+    # Stage 1: parse, spilling dictionary forms and queueing conjugation shards
+    logger.info(f"Parsing JMdict entries...")
+    shards: List[List[ParsedEntry]] = [[]]
+    count = 0
+    max_seq = 0
+    for parsed in iter_jmdict(xml_path):
+        seq, readings, pos_list, kana_reading = parsed
+        base_forms[seq] = readings[0][0]
+        kana_readings[seq] = kana_reading
+        max_seq = max(max_seq, seq)
+        for entry in make_base_entries(seq, readings, pos_list):
+            base_spill.write(pack_spill_record(entry))
+        
+        if len(shards[-1]) >= CONJUGATION_SHARD_SIZE:
+            shards.append([])
+        shards[-1].append(parsed)
+        
+        count += 1
+        if count % 10000 == 0:
+            logger.info(f"  Parsed {count} entries...")
+    
+    logger.info(f"Parsed {count} base entries with {base_spill.count} surface forms")
+    
+    logger.info("Generating conjugated forms...")
+    for conjugations, n_conj, secondary, n_secondary in imap(_conjugate_shard, shards):
+        conj_spill.write(conjugations, n_conj)
+        secondary_spill.write(secondary, n_secondary)
+    del shards
+    conj_spill.close()
+    secondary_spill.close()
+    logger.info(f"Generated {conj_spill.count} conjugated forms")
+    logger.info(f"Generated {secondary_spill.count} secondary conjugations")
+    
+    # Conjugations are numbered after every JMdict seq, then the secondary
+    # te-forms, then the custom entries
+    conj_seq = max_seq + 1
+    secondary_seq = conj_seq + conj_spill.count
+    next_seq = secondary_seq + secondary_spill.count
+    
+    # Add custom suru verb entries (entries not in JMdict but needed for accuracy)
+    logger.info("Adding custom suru verb entries...")
+    custom_entries = add_custom_suru_verb_entries(next_seq, base_forms)
+    next_seq += len(custom_entries)
+    logger.info(f"Added {len(custom_entries)} custom suru verb entries")
+    
+    # Add compound word entries (common expressions that should be single tokens)
+    logger.info("Adding compound word entries...")
+    compound_entries = add_compound_word_entries(next_seq, base_forms)
+    logger.info(f"Added {len(compound_entries)} compound word entries")
+    
+    # Every base_seq must resolve to base form text at runtime; generated
+    # forms point at JMdict seqs, which already do
+    for entry in custom_entries + compound_entries:
+        base_forms.setdefault(entry.base_seq, entry.base_form)
+        base_spill.write(pack_spill_record(entry))
+    base_spill.close()
+    
+    chunks = (
+        _numbered_chunks(base_spill, None)
+        + _numbered_chunks(conj_spill, conj_seq)
+        + _numbered_chunks(secondary_spill, secondary_seq)
+    )
+    total = base_spill.count + conj_spill.count + secondary_spill.count
+    logger.info(f"Total entries: {total}")
+    
+    # Stage 2: trie of every surface, for the static score's
+    # dictionary-membership check
+    logger.info("Building surface trie...")
+    surfaces = marisa_trie.Trie(
+        surface
+        for path, _ in chunks
+        for _, _, _, _, _, surface, _ in iter_spill_records(path)
+    )
+    logger.info(f"  Unique surface forms: {len(surfaces)}")
+    trie_path = tmp / 'surfaces.marisa'
+    surfaces.save(str(trie_path))
+    del surfaces
+    
+    # Stage 3: score records and stream them into the dictionary trie. Only
+    # generated forms carry kana readings, and chunks arrive in seq order
     logger.info("Building marisa_trie.RecordTrie...")
+    kana_writer = StringStoreWriter(kana_readings_path)
+    for seq, text in sorted(kana_readings.items()):
+        kana_writer.add(seq, text)
+    del kana_readings
     
-    # marisa_trie.RecordTrie expects iterable of (key, record_tuple) pairs
-    # Multiple records for same key will be stored and returned as list
     def generate_items():
-        for entry in entries:
-            record = (
-                entry.seq,
-                entry.cost,
-                entry.pos_id,
-                entry.conj_type,
-                entry.base_seq,
-            )
-            yield (entry.surface, record)
-    
-    # Count unique surfaces for logging
-    unique_surfaces = set(e.surface for e in entries)
-    logger.info(f"  Unique surface forms: {len(unique_surfaces)}")
-    
-    # Build trie from generator
-    trie = marisa_trie.RecordTrie(RECORD_FORMAT, generate_items())
-    
-    # Save
+        tasks = [(path, first_seq, str(trie_path)) for path, first_seq in chunks]
+        for items, chunk_kana in imap(_score_chunk, tasks):
+            for seq, text in chunk_kana:
+                kana_writer.add(seq, text)
+            yield from items
+    
+    # Records are packed by the workers, so they are added as raw bytes;
+    # the file is identical to a RecordTrie built from record tuples
+    trie = marisa_trie.BytesTrie(generate_items())
     output_path.parent.mkdir(parents=True, exist_ok=True)
     trie.save(str(output_path))
     
     file_size = output_path.stat().st_size / (1024 * 1024)
     logger.info(f"Saved dictionary to {output_path} ({file_size:.1f} MB)")
     
-    return trie
+    # Save base forms
+    save_base_forms(base_forms, base_forms_path)
+    
+    # Save kana readings
+    logger.info("Saving kana readings mapping...")
+    kana_writer.close()
+    file_size = kana_readings_path.stat().st_size / (1024 * 1024)
+    logger.info(f"Saved kana readings to {kana_readings_path} ({file_size:.1f} MB)")
 
 
 def save_base_forms(base_forms: Dict[int, str], output_path: Path):
-    """Save base forms mapping to binary file."""
+    """Save base forms mapping to an indexed string store."""
     logger.info("Saving base forms mapping...")
     
-    # Simple format: count (4 bytes), then seq (4 bytes) + len (2 bytes) + text for each
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'wb') as f:
-        f.write(struct.pack('<I', len(base_forms)))
-        for seq, text in sorted(base_forms.items()):
-            text_bytes = text.encode('utf-8')
-            f.write(struct.pack('<IH', seq, len(text_bytes)))
-            f.write(text_bytes)
+    write_string_store(base_forms, output_path)
     
     file_size = output_path.stat().st_size / (1024 * 1024)
     logger.info(f"Saved base forms to {output_path} ({file_size:.1f} MB)")
 
 
-def save_kana_readings(kana_readings: Dict[int, str], output_path: Path):
-    """Save kana readings mapping to binary file."""
-    logger.info("Saving kana readings mapping...")
-    
-    # Simple format: count (4 bytes), then seq (4 bytes) + len (2 bytes) + text for each
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'wb') as f:
-        f.write(struct.pack('<I', len(kana_readings)))
-        for seq, text in sorted(kana_readings.items()):
-            text_bytes = text.encode('utf-8')
-            f.write(struct.pack('<IH', seq, len(text_bytes)))
-            f.write(text_bytes)
-    
-    file_size = output_path.stat().st_size / (1024 * 1024)
-    logger.info(f"Saved kana readings to {output_path} ({file_size:.1f} MB)")
-
-
 # ============================================================================
 # Main
 # ============================================================================
@@ -943,26 +1232,37 @@ def main():
         default=DEFAULT_KANA_READINGS,
         help=f"Output kana readings path (default: {DEFAULT_KANA_READINGS})"
     )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help="Worker processes for conjugation and scoring (default: CPU count)"
+    )
+    parser.add_argument(
+        '--tmp-dir',
+        type=Path,
+        default=None,
+        help="Directory for temporary spill files (default: system temp)"
+    )
     
     args = parser.parse_args()
     
     if not args.jmdict.exists():
         logger.error(f"JMdict file not found: {args.jmdict}")
         sys.exit(1)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
     
     start_time = time.time()
     
-    # Parse and generate entries
-    entries, base_forms, kana_readings = parse_entries(args.jmdict)
-    
-    # Build dictionary
-    build_dictionary(entries, args.output)
-    
-    # Save base forms
-    save_base_forms(base_forms, args.base_forms)
-    
-    # Save kana readings
-    save_kana_readings(kana_readings, args.kana_readings)
+    build_all(
+        args.jmdict,
+        args.output,
+        args.base_forms,
+        args.kana_readings,
+        workers=args.workers,
+        tmp_dir=args.tmp_dir,
+    )
     
     elapsed = time.time() - start_time
     logger.info(f"Build completed in {elapsed:.1f} seconds")
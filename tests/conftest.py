@@ -0,0 +1,83 @@
+"""
+Shared fixtures for the himotoki-split tests.
+
+The packaged dictionary is built from JMdict and not checked in, so the
+tests run against a small dictionary built here, with the side stores
+next to it.
+"""
+
+import marisa_trie
+import pytest
+
+from himotoki_split import dictionary as dictionary_module
+from himotoki_split.dictionary import LEGACY_RECORD_FORMAT, Dictionary, get_pos_id
+from himotoki_split.string_store import write_string_store
+
+# (surface, seq, cost, pos, conj_type, base_seq)
+WORDS = [
+    ('今日', 1186220, 10, 'n', 0, 1186220),
+    ('今日は', 1289400, 10, 'int', 0, 1289400),
+    ('は', 2028920, 10, 'prt', 0, 2028920),
+    ('天気', 1434050, 10, 'n', 0, 1434050),
+    ('が', 2028930, 10, 'prt', 0, 2028930),
+    ('いい', 1605820, 10, 'adj-ix', 0, 1605820),
+    ('です', 1628500, 10, 'cop', 0, 1628500),
+    ('ね', 2029080, 10, 'prt', 0, 2029080),
+    ('食べ', 3000001, 15, 'v1', 13, 1358280),
+    ('食べる', 1358280, 10, 'v1', 0, 1358280),
+    ('食べた', 3000002, 15, 'v1', 2, 1358280),
+    ('ました', 3000003, 15, 'aux-v', 2, 1000000),
+    ('ます', 1000000, 10, 'aux-v', 0, 1000000),
+    ('の', 1469800, 10, 'prt', 0, 1469800),
+    ('を', 2029010, 10, 'prt', 0, 2029010),
+    ('に', 2028990, 10, 'prt', 0, 2028990),
+    ('日本語', 1464530, 10, 'n', 0, 1464530),
+    ('見せて', 3000004, 15, 'v1', 3, 1259290),
+    ('見せる', 1259290, 10, 'v1', 0, 1259290),
+    ('て', 2086960, 20, 'prt', 0, 2086960),
+    ('いる', 1577980, 10, 'v1', 0, 1577980),
+    ('して', 3000005, 12, 'vs', 3, 1157170),
+    ('し', 3000006, 12, 'vs', 13, 1157170),
+    ('ている', 3000007, 12, 'aux-v', 0, 3000007),
+    ('勉強', 1403100, 10, 'n', 0, 1403100),
+    ('しています', 3000008, 12, 'vs', 0, 1157170),
+    ('くだ', 1000020, 90, 'n', 0, 1000020),
+    ('さい', 1000030, 90, 'n', 0, 1000030),
+    ('ください', 1184270, 10, 'aux-v', 0, 1184270),
+    ('待って', 3000011, 15, 'v5t', 3, 1460180),
+    ('東京', 1440500, 10, 'n', 0, 1440500),
+    ('行きたい', 3000012, 15, 'v5k-s', 1, 1578850),
+    ('行き', 3000013, 15, 'v5k-s', 13, 1578850),
+    ('たい', 2017560, 10, 'aux-adj', 0, 2017560),
+]
+
+READINGS = {
+    1186220: 'きょう', 1434050: 'てんき', 1358280: 'たべる', 1464530: 'にほんご',
+    1259290: 'みせる', 1403100: 'べんきょう', 1460180: 'まつ', 1440500: 'とうきょう',
+    1578850: 'いく', 1157170: 'する',
+}
+
+BASE_FORMS = {
+    1358280: '食べる', 1259290: '見せる', 1460180: '待つ', 1578850: '行く',
+    1157170: 'する', 1000000: 'ます',
+}
+
+
+@pytest.fixture(scope='session')
+def dictionary(tmp_path_factory):
+    """A small Dictionary, installed as the process-wide default."""
+    directory = tmp_path_factory.mktemp('dictionary')
+    # Legacy records, so segment scores are computed at runtime
+    trie = marisa_trie.RecordTrie(LEGACY_RECORD_FORMAT, [
+        (surface, (seq, cost, get_pos_id(pos), conj_type, base_seq))
+        for surface, seq, cost, pos, conj_type, base_seq in WORDS
+    ])
+    trie.save(str(directory / 'himotoki.dic'))
+    write_string_store(BASE_FORMS, directory / 'base_forms.bin')
+    write_string_store(READINGS, directory / 'kana_readings.bin')
+
+    dic = Dictionary(directory / 'himotoki.dic')
+    previous = dictionary_module.set_default_dictionary(dic)
+    yield dic
+    dictionary_module.set_default_dictionary(previous)
+    dic.close()
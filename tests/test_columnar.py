@@ -0,0 +1,28 @@
+"""Tests for columnar token output."""
+
+import pytest
+
+import himotoki_split
+from himotoki_split.columnar import tokenize_columnar
+
+
+@pytest.fixture
+def max_text_length():
+    himotoki_split.configure_limits(max_text_length=10)
+    yield 10
+    himotoki_split.configure_limits(max_text_length=None)
+
+
+def test_columnar_matches_tokenize(dictionary):
+    texts = ["今日は天気がいいですね。", " ", "勉強しています"]
+    batch = tokenize_columnar(texts)
+    assert batch.num_texts == 3
+    assert batch.tokens(0) == himotoki_split.tokenize(texts[0])
+    assert batch.tokens(1) == []
+    assert batch.tokens(2) == himotoki_split.tokenize(texts[2])
+
+
+def test_columnar_enforces_max_text_length(dictionary, max_text_length):
+    tokenize_columnar(["今日は天気がいいですね"[:max_text_length]])
+    with pytest.raises(himotoki_split.TextTooLongError):
+        tokenize_columnar(["今日は天気がいいですね。"])
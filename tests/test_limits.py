@@ -0,0 +1,45 @@
+"""Tests for configure_limits."""
+
+import pytest
+
+import himotoki_split
+from himotoki_split import tokenizer
+
+
+@pytest.fixture(autouse=True)
+def restore_limits():
+    segment_length = tokenizer.MAX_SEGMENT_LENGTH
+    yield
+    himotoki_split.configure_limits(
+        max_text_length=None,
+        max_segment_length=segment_length,
+        max_analyze_length=himotoki_split.DEFAULT_MAX_ANALYZE_LENGTH,
+    )
+
+
+@pytest.mark.parametrize('value', [None, 120, 1.5e3, '256', True])
+def test_invalid_max_segment_length(value):
+    with pytest.raises(ValueError, match="max_segment_length must be an int > 120"):
+        himotoki_split.configure_limits(max_segment_length=value)
+
+
+@pytest.mark.parametrize('name', ['max_text_length', 'max_analyze_length'])
+@pytest.mark.parametrize('value', [0, 2.5, '10'])
+def test_invalid_text_limits(name, value):
+    with pytest.raises(ValueError, match=name):
+        himotoki_split.configure_limits(**{name: value})
+
+
+def test_unpassed_limits_keep_their_values():
+    himotoki_split.configure_limits(max_segment_length=200, max_text_length=50)
+    himotoki_split.configure_limits(max_analyze_length=None)
+    assert tokenizer.MAX_SEGMENT_LENGTH == 200
+    assert himotoki_split._max_text_length == 50
+
+
+def test_max_text_length_is_opt_in(dictionary):
+    text = "今日は天気がいいですね。" * 100
+    assert himotoki_split.tokenize(text)
+    himotoki_split.configure_limits(max_text_length=100)
+    with pytest.raises(himotoki_split.TextTooLongError):
+        himotoki_split.tokenize(text)
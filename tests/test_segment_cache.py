@@ -0,0 +1,47 @@
+"""Tests for the segment result cache."""
+
+import pytest
+
+import himotoki_split
+from scripts.test_sentences import get_all_sentences
+
+# Post-processing rules next to punctuation
+PUNCTUATION_CASES = [
+    "勉強。しています",
+    "日本語を勉強。しています。",
+    "勉強、しています",
+    "勉強！しています？勉強しています",
+    "見せて。いる",
+    "くだ。さい、くださいくだ",
+    "待って、ください。",
+    "食べ…たい・行き．たい",
+]
+
+
+@pytest.fixture
+def segment_cache():
+    himotoki_split.configure_segment_cache(1024)
+    yield
+    himotoki_split.configure_segment_cache(0)
+
+
+@pytest.mark.parametrize('text', get_all_sentences() + PUNCTUATION_CASES)
+def test_cached_tokens_match_uncached(dictionary, segment_cache, text):
+    himotoki_split.configure_segment_cache(0)
+    expected = himotoki_split.tokenize(text)
+
+    himotoki_split.configure_segment_cache(1024)
+    assert himotoki_split.tokenize(text) == expected  # fills the cache
+    assert himotoki_split.tokenize(text) == expected  # served from it
+
+
+def test_suru_continuation_does_not_merge_onto_punctuation(dictionary):
+    surfaces = [token.surface for token in himotoki_split.tokenize("勉強。しています")]
+    assert surfaces == ['勉強', '。', 'しています']
+
+
+def test_repeated_segments_hit_the_cache(dictionary, segment_cache):
+    himotoki_split.tokenize("勉強しています。勉強しています。")
+    info = himotoki_split.segment_cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
@@ -0,0 +1,32 @@
+"""Tests for streaming tokenization."""
+
+import io
+
+import himotoki_split
+from himotoki_split.streaming import iter_sentences
+from scripts.test_sentences import get_all_sentences
+
+MULTI_SENTENCE = "日本語を勉強。しています。今日は天気がいいですね！食べました？待って、ください"
+
+
+def _chunks(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+def test_iter_sentences_offsets():
+    text = "今日は。 食べました！\nいい"
+    sentences = list(iter_sentences(_chunks(text, 3)))
+    assert sentences == [("今日は。", 0), ("食べました！", 5), ("いい", 12)]
+    for sentence, offset in sentences:
+        assert text[offset:offset + len(sentence)] == sentence
+
+
+def test_stream_matches_tokenize(dictionary):
+    expected = himotoki_split.tokenize(MULTI_SENTENCE)
+    assert list(himotoki_split.tokenize_stream(io.StringIO(MULTI_SENTENCE))) == expected
+
+
+def test_stream_matches_tokenize_over_test_sentences(dictionary):
+    text = ''.join(sentence.strip() for sentence in get_all_sentences())
+    expected = himotoki_split.tokenize(text)
+    assert list(himotoki_split.tokenize_stream(_chunks(text, 7))) == expected
@@ -0,0 +1,35 @@
+"""Tests for the seq -> string stores."""
+
+import struct
+
+from himotoki_split.dictionary import get_base_forms_path
+from himotoki_split.string_store import STORE_MAGIC, StringStore, write_string_store
+
+MAPPING = {1358280: '食べる', 1000000: 'ます', 1578850: '行く'}
+
+
+def test_packaged_base_forms_are_indexed():
+    with open(get_base_forms_path(), 'rb') as f:
+        assert f.read(len(STORE_MAGIC)) == STORE_MAGIC
+
+
+def test_indexed_round_trip(tmp_path):
+    path = tmp_path / 'store.bin'
+    write_string_store(MAPPING, path)
+    store = StringStore.open(path)
+    assert dict(store.items()) == MAPPING
+    assert store.get(1) is None
+    store.close()
+
+
+def test_legacy_layout_is_still_read(tmp_path):
+    path = tmp_path / 'legacy.bin'
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<I', len(MAPPING)))
+        for seq, text in MAPPING.items():
+            encoded = text.encode('utf-8')
+            f.write(struct.pack('<IH', seq, len(encoded)))
+            f.write(encoded)
+    store = StringStore.open(path)
+    assert dict(store.items()) == MAPPING
+    store.close()